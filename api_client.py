@@ -0,0 +1,233 @@
+"""
+api_client.py
+-------------
+
+Fetch product data straight from the site's JSON backend, without a
+browser.
+
+Every other scraper in this project loads one product page per SKU,
+either in Chrome or over HTTP.  The storefront itself gets its data
+from JSON endpoints (see :mod:`xhr_capture`); calling those directly
+with the authenticated cookies is the cheapest possible steady state:
+no rendering, no HTML parsing, and many SKUs per request when the
+backend offers a batch lookup.
+
+:class:`PacificApiClient` has no built-in endpoint paths: read them off
+a ``--capture`` run and pass them in, or set ``PACIFIC_API_PRODUCT_PATH``
+(and ``PACIFIC_API_BATCH_PATH``) for the command line.  A guessed path
+on a client-rendered site answers 404, or 200 with the storefront HTML,
+so both are reported as :class:`ApiError` rather than read as "item not
+found".  A batch that fails comes back as failed items (empty fields)
+and the other batches carry on; only when every batch fails is the
+error raised.  :mod:`api_standin` serves a local stand-in API for
+testing.  Records are mapped to :class:`~pacificgiftware_scraper.ProductInfo` with the same
+field matching as :mod:`xhr_capture`, so differently named JSON keys are
+handled in one place.
+
+Example
+-------
+::
+
+    from api_client import PacificApiClient
+
+    client = PacificApiClient.from_session_file(product_path="/api/products/{item}")
+    products = client.get_products(["12238", "11358", "11982"])
+
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+from urllib.parse import quote
+
+import requests
+
+from http_handoff import build_http_session, is_logged_out, session_from_file
+from pacificgiftware_scraper import ProductInfo
+from session_store import DEFAULT_SESSION_FILE
+from xhr_capture import find_product_record, product_from_record
+
+DEFAULT_API_BASE = "https://www.pacificgiftware.com"
+
+
+class ApiError(Exception):
+    """Raised when the product API rejects a request."""
+
+
+def _empty(item_number: str) -> ProductInfo:
+    return ProductInfo(item_number=item_number, product_name="", unit_price=None, case_quantity=None)
+
+
+class PacificApiClient:
+    """
+    Client for the product JSON endpoints.
+
+    Parameters
+    ----------
+    product_path : str
+        Path of the single-product endpoint; ``{item}`` is replaced by
+        the item number.
+    session : requests.Session, optional
+        An authenticated, pooled session (see
+        :func:`http_handoff.build_http_session`).  An anonymous one is
+        created when omitted.
+    base_url : str, optional
+        Scheme and host of the API.
+    batch_path : str, optional
+        Path of the batch endpoint, which takes ``{"items": [...]}`` as
+        a JSON POST body.  Single lookups are used when omitted.
+    batch_size : int, optional
+        Maximum number of items per batch request.
+    workers : int, optional
+        Number of requests in flight at once.
+    timeout : float, optional
+        Per-request timeout in seconds.
+    """
+
+    def __init__(
+        self,
+        product_path: str,
+        session: Optional[requests.Session] = None,
+        base_url: str = DEFAULT_API_BASE,
+        batch_path: Optional[str] = None,
+        batch_size: int = 50,
+        workers: int = 4,
+        timeout: float = 15,
+    ) -> None:
+        self.session = session or build_http_session([], pool_size=workers)
+        self.session.headers["Accept"] = "application/json"
+        self.base_url = base_url.rstrip("/")
+        self.product_path = product_path
+        self.batch_path = batch_path
+        self.batch_size = batch_size
+        self.workers = workers
+        self.timeout = timeout
+
+    @classmethod
+    def from_session_file(cls, path: str = DEFAULT_SESSION_FILE, **kwargs: Any) -> "PacificApiClient":
+        """
+        Build a client from the cookies saved by :mod:`session_store`.
+
+        Raises
+        ------
+        ApiError
+            If there is no saved session to authenticate with.
+        """
+        session = session_from_file(path, pool_size=kwargs.get("workers", 4))
+        if session is None:
+            raise ApiError(f"No saved login session at '{path}'. Log in once with the browser first.")
+        return cls(session=session, **kwargs)
+
+    def _check(self, response: requests.Response) -> Any:
+        """
+        Return the JSON body of a response.
+
+        Raises
+        ------
+        ApiError
+            If the session was rejected, the endpoint does not exist
+            (404), the request failed, or the body is not JSON.
+        """
+        if is_logged_out(response):
+            raise ApiError("The API rejected the session; log in again.")
+        if response.status_code == 404:
+            raise ApiError(f"No API endpoint at {response.url} (404); check the configured API paths.")
+        try:
+            response.raise_for_status()
+        except requests.HTTPError as exc:
+            raise ApiError(str(exc)) from exc
+        try:
+            return response.json()
+        except ValueError:
+            kind = response.headers.get("Content-Type", "unknown content type")
+            raise ApiError(f"{response.url} did not answer with JSON ({kind}); check the configured API paths.")
+
+    def get_product(self, item_number: str) -> ProductInfo:
+        """
+        Fetch one product.  Items missing from the answer come back
+        with empty fields.
+
+        Raises
+        ------
+        ApiError
+            See :meth:`_check`.
+        """
+        # Item numbers such as "#10002" must not turn into a fragment.
+        url = self.base_url + self.product_path.format(item=quote(item_number, safe=""))
+        response = self.session.get(url, timeout=self.timeout)
+        record = find_product_record(self._check(response), item_number)
+        return product_from_record(record, item_number) if record else _empty(item_number)
+
+    def _get_batch(self, items: List[str]) -> List[ProductInfo]:
+        """Fetch one batch, falling back to single lookups if unsupported."""
+        if self.batch_path is None:
+            return [self.get_product(item) for item in items]
+        url = self.base_url + self.batch_path
+        response = self.session.post(url, json={"items": items}, timeout=self.timeout)
+        if response.status_code in (405, 501):
+            # No batch endpoint; remember that and use single lookups.
+            self.batch_path = None
+            return [self.get_product(item) for item in items]
+        data = self._check(response)
+        results = []
+        for item in items:
+            record = find_product_record(data, item)
+            results.append(product_from_record(record, item) if record else _empty(item))
+        return results
+
+    def get_products(
+        self,
+        item_numbers: List[str],
+        on_result: Optional[Callable[[str, ProductInfo], None]] = None,
+    ) -> List[ProductInfo]:
+        """
+        Fetch many products, in input order.
+
+        Items are split into batches of ``batch_size`` and up to
+        ``workers`` batches are requested concurrently over the shared
+        connection pool.
+
+        Parameters
+        ----------
+        item_numbers : List[str]
+            Item numbers to fetch.
+        on_result : Callable[[str, ProductInfo], None], optional
+            Called for every item as its batch finishes, from the thread
+            that fetched it, e.g. to journal it (see :mod:`run_journal`).
+
+        Returns
+        -------
+        List[ProductInfo]
+            One entry per item.  Items of a batch that failed have empty
+            fields, so a resumed run fetches them again.
+
+        Raises
+        ------
+        ApiError
+            If every batch failed, so nothing was fetched at all.
+        """
+        batches = [item_numbers[i:i + self.batch_size] for i in range(0, len(item_numbers), self.batch_size)]
+        errors: List[Exception] = []
+
+        def get_batch(batch: List[str]) -> List[ProductInfo]:
+            try:
+                results = self._get_batch(batch)
+            except (ApiError, requests.RequestException) as exc:
+                print(f"API request for {len(batch)} item(s) from {batch[0]} failed: {exc}")
+                errors.append(exc)
+                results = [_empty(item) for item in batch]
+            if on_result is not None:
+                for item, info in zip(batch, results):
+                    on_result(item, info)
+            return results
+
+        if self.workers <= 1 or len(batches) <= 1:
+            chunks = [get_batch(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                chunks = list(executor.map(get_batch, batches))
+        if batches and len(errors) == len(batches):
+            error = errors[0]
+            raise error if isinstance(error, ApiError) else ApiError(str(error)) from error
+        return [info for chunk in chunks for info in chunk]
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+api_standin.py
+--------------
+
+A local stand-in for the Pacific Giftware product API, so that
+:class:`api_client.PacificApiClient` can be exercised and benchmarked
+offline, without credentials and without load on the real site.
+
+Endpoints
+~~~~~~~~~
+
+``GET /api/products/{item}``
+    ``{"product": {...}}`` for a known item, ``{"product": null}``
+    otherwise.  A 404 only means the path is wrong, as
+    :class:`api_client.PacificApiClient` expects.
+``POST /api/products/batch``
+    Body ``{"items": ["12238", ...]}``; answers
+    ``{"products": [{...}, ...]}`` with the known items only.
+
+Records use the field names ``itemNumber``, ``productName``,
+``unitPrice``, ``casePack`` and ``notes``.  When started with a session
+cookie value, requests without that cookie get a 401, like an expired
+login on the real site.  An artificial per-request latency makes
+benchmarks closer to a real network round trip.
+
+Usage
+-----
+::
+
+    python api_standin.py --port 8765                 # serve a synthetic catalog
+    python api_standin.py --catalog complete_results.csv
+    python api_standin.py --bench 5000 --latency 50   # serve and benchmark the client
+
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import unquote
+
+Catalog = Dict[str, Dict[str, Any]]
+
+# Endpoint paths to pass to PacificApiClient.
+PRODUCT_PATH = "/api/products/{item}"
+BATCH_PATH = "/api/products/batch"
+
+_PRODUCT_PATH = re.compile(r"^/api/products/([^/?#]+)$")
+
+
+def make_catalog(size: int = 10_000, start: int = 10_000) -> Catalog:
+    """Build a deterministic synthetic catalog of ``size`` items."""
+    catalog: Catalog = {}
+    for n in range(start, start + size):
+        case_pack = (6, 12, 24, 36, 48)[n % 5]
+        item = str(n)
+        catalog[item] = {
+            "itemNumber": item,
+            "productName": f"STAND-IN PRODUCT {item} C/{case_pack}",
+            "unitPrice": round(2 + (n % 97) * 0.25, 2),
+            "casePack": case_pack,
+            "notes": f"CASE PACK: {case_pack}",
+        }
+    return catalog
+
+
+def load_catalog(path: str) -> Catalog:
+    """
+    Build a catalog from a results CSV written by one of the scrapers
+    (columns ``Item Number``, ``Product Name``, ``Unit Price``,
+    ``Case Quantity``).
+    """
+    catalog: Catalog = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            row = {k.strip(): (v or "").strip() for k, v in row.items() if k}
+            item = row.get("Item Number") or row.get("Item")
+            if not item:
+                continue
+            price = row.get("Unit Price") or row.get("Unit price") or ""
+            case_pack = row.get("Case Quantity") or row.get("Case Qty") or ""
+            catalog[item] = {
+                "itemNumber": item,
+                "productName": row.get("Product Name", ""),
+                "unitPrice": price if price.startswith("$") else None,
+                "casePack": case_pack if case_pack.isdigit() else None,
+                "notes": f"CASE PACK: {case_pack}" if case_pack.isdigit() else "",
+            }
+    return catalog
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Request handler; configuration lives on the server object."""
+
+    server: "StandInServer"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorised(self) -> bool:
+        cookie = self.server.session_cookie
+        if cookie is None:
+            return True
+        name, value = cookie
+        return f"{name}={value}" in (self.headers.get("Cookie") or "")
+
+    def _prepare(self) -> bool:
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self.server.count_request()
+        if not self._authorised():
+            self._send_json(401, {"error": "login required"})
+            return False
+        return True
+
+    def do_GET(self) -> None:  # noqa: N802
+        if not self._prepare():
+            return
+        match = _PRODUCT_PATH.match(self.path)
+        if not match or match.group(1) == "batch":
+            self._send_json(404, {"error": "not found"})
+            return
+        self._send_json(200, {"product": self.server.catalog.get(unquote(match.group(1)))})
+
+    def do_POST(self) -> None:  # noqa: N802
+        if not self._prepare():
+            return
+        if self.path != BATCH_PATH:
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            items = json.loads(self.rfile.read(length) or b"{}").get("items", [])
+        except (ValueError, AttributeError):
+            self._send_json(400, {"error": "expected {\"items\": [...]}"})
+            return
+        catalog = self.server.catalog
+        self._send_json(200, {"products": [catalog[str(i)] for i in items if str(i) in catalog]})
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server holding the catalog and test settings.
+
+    Parameters
+    ----------
+    address : Tuple[str, int]
+        Host and port; port ``0`` picks a free one.
+    catalog : Catalog
+        Items served by the API.
+    latency : float, optional
+        Seconds of artificial delay per request.
+    session_cookie : Tuple[str, str], optional
+        ``(name, value)`` every request must carry, or ``None`` to
+        accept anonymous requests.
+    verbose : bool, optional
+        Log each request to stderr.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        catalog: Catalog,
+        latency: float = 0.0,
+        session_cookie: Optional[Tuple[str, str]] = None,
+        verbose: bool = False,
+    ) -> None:
+        super().__init__(address, StandInHandler)
+        self.catalog = catalog
+        self.latency = latency
+        self.session_cookie = session_cookie
+        self.verbose = verbose
+        self.requests_served = 0
+        self._count_lock = threading.Lock()
+
+    def count_request(self) -> None:
+        with self._count_lock:
+            self.requests_served += 1
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def serve_in_background(catalog: Optional[Catalog] = None, **kwargs: Any) -> StandInServer:
+    """
+    Start a stand-in server on a free local port in a daemon thread.
+
+    Call ``server.shutdown()`` when done.
+    """
+    server = StandInServer(("127.0.0.1", 0), catalog if catalog is not None else make_catalog(), **kwargs)
+    threading.Thread(target=server.serve_forever, name="api-standin", daemon=True).start()
+    return server
+
+
+def bench(items: int, latency: float, batch_size: int, workers: int) -> None:
+    """Benchmark :class:`api_client.PacificApiClient` against a stand-in."""
+    from api_client import PacificApiClient
+    from http_handoff import build_http_session
+
+    cookie = ("pg_session", "bench")
+    server = serve_in_background(make_catalog(items), latency=latency, session_cookie=cookie)
+    try:
+        session = build_http_session(
+            [{"name": cookie[0], "value": cookie[1], "domain": "127.0.0.1"}], pool_size=workers
+        )
+        client = PacificApiClient(
+            PRODUCT_PATH, session=session, base_url=server.base_url, batch_path=BATCH_PATH,
+            batch_size=batch_size, workers=workers,
+        )
+        item_numbers = list(server.catalog)
+        start = time.perf_counter()
+        products = client.get_products(item_numbers)
+        elapsed = time.perf_counter() - start
+        priced = sum(1 for p in products if p.unit_price)
+        print(
+            f"{len(products)} items ({priced} priced) in {elapsed:.2f}s "
+            f"= {len(products) / elapsed:.0f} items/s over {server.requests_served} requests "
+            f"(batch {batch_size}, {workers} workers, {latency * 1000:.0f} ms latency)"
+        )
+    finally:
+        server.shutdown()
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local stand-in for the Pacific Giftware product API")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765)")
+    parser.add_argument("--catalog", help="Results CSV to serve instead of a synthetic catalog")
+    parser.add_argument("--size", type=int, default=10_000, help="Size of the synthetic catalog")
+    parser.add_argument("--latency", type=float, default=0.0, help="Artificial latency per request in ms")
+    parser.add_argument("--cookie", help="Require this NAME=VALUE session cookie on every request")
+    parser.add_argument("--bench", type=int, metavar="N", help="Benchmark the API client over N items and exit")
+    parser.add_argument("--batch-size", type=int, default=50, help="Client batch size for --bench")
+    parser.add_argument("--workers", type=int, default=4, help="Client concurrency for --bench")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    latency = args.latency / 1000
+    if args.bench:
+        bench(args.bench, latency, args.batch_size, args.workers)
+        return
+
+    catalog = load_catalog(args.catalog) if args.catalog else make_catalog(args.size)
+    cookie = tuple(args.cookie.split("=", 1)) if args.cookie else None
+    server = StandInServer(("127.0.0.1", args.port), catalog, latency=latency,
+                           session_cookie=cookie, verbose=args.verbose)  # type: ignore[arg-type]
+    print(f"Serving {len(catalog)} products on {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
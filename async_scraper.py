@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Asyncio Product Information Scraper
+===================================
+
+Concurrent version of simple_scraper.process_items_simple. All product pages
+are fetched over one shared aiohttp connection pool with at most
+`concurrency` requests in flight, instead of one blocking requests.get per
+item. Parsing reuses simple_scraper.parse_product_basic, so the output rows
+are identical to the blocking scraper's.
+
+Usage: python async_scraper.py input.csv output.csv [--concurrency N]
+"""
+
+import asyncio
+import os
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from product_cache import ProductCache, validator_headers
+from simple_scraper import (
+    HEADERS,
+    PAGE_KIND,
+    PRODUCT_URL,
+    error_result,
+    page_has_product,
+    parse_product_basic,
+    read_items_from_csv,
+    save_results,
+)
+
+DEFAULT_CONCURRENCY = 8
+
+async def fetch_product(session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                        item_number: str, cache: Optional[ProductCache] = None) -> Dict[str, str]:
+    """
+    Fetch and parse one product page, never raising.
+    With a cache, unchanged pages (304) that showed the product reuse
+    the stored result.
+    """
+    url = PRODUCT_URL.format(item_number)
+    page = cache.page(url, PAGE_KIND) if cache is not None else None
+    if page is not None and not page_has_product(page.result):
+        page = None
+    async with semaphore:
+        try:
+            async with session.get(url, headers=validator_headers(page)) as response:
+                if response.status == 304 and page is not None:
+                    cache.touch_page(url, PAGE_KIND)
+                    return dict(page.result, **{'Item Number': item_number})
+                response.raise_for_status()
+                content = await response.read()
+                headers = response.headers
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return error_result(item_number, f'Network Error: {str(e) or type(e).__name__}')
+
+    try:
+        result = parse_product_basic(item_number, content)
+    except Exception as e:
+        return error_result(item_number, f'Parse Error: {str(e)}')
+    if cache is not None and page_has_product(result):
+        cache.put_page(url, PAGE_KIND, headers, result)
+    return result
+
+async def scrape_many(items: List[str], concurrency: int = DEFAULT_CONCURRENCY,
+                      timeout: float = 10, cache: Optional[ProductCache] = None) -> List[Dict[str, str]]:
+    """
+    Scrape all items concurrently and return results in input order.
+    `concurrency` bounds both in-flight requests and pooled connections.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=concurrency)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+
+    done = 0
+
+    async def tracked(item: str) -> Dict[str, str]:
+        nonlocal done
+        result = await fetch_product(session, semaphore, item, cache)
+        done += 1
+        print(f"[{done}/{len(items)}] {item}: {result['Status']}")
+        return result
+
+    async with aiohttp.ClientSession(connector=connector, headers=HEADERS,
+                                     timeout=client_timeout) as session:
+        # gather() returns results in input order regardless of finish order
+        return await asyncio.gather(*(tracked(item) for item in items))
+
+def process_items_async(input_file: str, output_file: str,
+                        concurrency: int = DEFAULT_CONCURRENCY):
+    """Process items using concurrent HTTP scraping."""
+    print("Asyncio Product Information Scraper")
+    print("=" * 40)
+    print(f"Input file: {input_file}")
+    print(f"Output file: {output_file}")
+    print(f"Concurrency: {concurrency}")
+    print()
+    
+    items = read_items_from_csv(input_file)
+    if not items:
+        print("No items found in input file.")
+        return
+    
+    print(f"Found {len(items)} items to process")
+    with ProductCache() as cache:
+        results = asyncio.run(scrape_many(items, concurrency=concurrency, cache=cache))
+        print(cache.report())
+    print()
+    
+    return save_results(results, output_file)
+
+def main():
+    """Main function for the asyncio scraper."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Concurrent HTTP scraper for Pacific Giftware product pages")
+    parser.add_argument("input", help="CSV file with item numbers in the first column")
+    parser.add_argument("output", help="Output CSV file")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Maximum number of requests in flight (default: {DEFAULT_CONCURRENCY})")
+    args = parser.parse_args()
+    
+    if not os.path.exists(args.input):
+        print(f"Input file not found: {args.input}")
+        return
+    
+    process_items_async(args.input, args.output, concurrency=args.concurrency)
+
+if __name__ == "__main__":
+    main()
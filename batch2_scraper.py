@@ -13,6 +13,9 @@ from selenium.webdriver.chrome.options import Options
 import time
 import os
 
+from browser_host import apply_chrome_binary, chromedriver_service
+from selector_stats import selector_registry
+
 def setup_chrome_driver():
     """Set up Chrome driver with options"""
     chrome_options = Options()
@@ -22,7 +25,8 @@ def setup_chrome_driver():
     chrome_options.add_argument("--disable-gpu")
     chrome_options.add_argument("--window-size=1920,1080")
     
-    driver = webdriver.Chrome(options=chrome_options)
+    apply_chrome_binary(chrome_options)
+    driver = webdriver.Chrome(service=chromedriver_service(), options=chrome_options)
     return driver
 
 def login_to_pacific_giftware(driver):
@@ -93,14 +97,14 @@ def scrape_item_data(driver, item_number):
             "span:contains('$')"
         ]
         
-        for selector in price_selectors:
-            try:
-                price_element = driver.find_element(By.CSS_SELECTOR, selector)
-                if price_element and '$' in price_element.text:
-                    unit_price = price_element.text.strip()
-                    break
-            except:
-                continue
+        def price_text(selector):
+            price_element = driver.find_element(By.CSS_SELECTOR, selector)
+            if price_element and '$' in price_element.text:
+                return price_element.text.strip()
+        
+        found = selector_registry().first("product.price", price_selectors, price_text, by_hits=False)
+        if found:
+            unit_price = found[1]
         
         # Extract case quantity
         case_quantity = "Case info not found"
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+browser_host.py
+---------------
+
+Keep one Chromium running between scraper runs and attach to it.
+
+Every script used to launch a fresh Chromium and ChromeDriver, probe a
+list of hard-coded nix-store paths to find them, and quit the browser
+at the end.  For the small repeated runs made through ``quick_run.py``
+that cold start is most of the run time, and the browser's cache and
+login are thrown away each time.
+
+This module provides two things:
+
+* **Cached discovery.**  :func:`find_chrome_binary` and
+  :func:`find_chromedriver` probe the candidate locations once and
+  remember the result in a small JSON file, revalidated with a single
+  ``os.path.exists`` on later runs.  All driver factories use them.
+* **A browser host.**  ``python browser_host.py start`` launches
+  Chromium with remote debugging and a persistent profile, detached
+  from the terminal.  Scripts started with ``--attach`` then connect to
+  it through ChromeDriver's ``debuggerAddress`` option with
+  :func:`attach_driver`, reusing its warm profile, HTTP cache and
+  cookies.  Quitting an attached driver leaves the browser running.
+
+Usage
+-----
+::
+
+    python browser_host.py start [--port 9222] [--visible]
+    python browser_host.py status
+    python browser_host.py stop
+
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import signal
+import subprocess
+import time
+from typing import Any, Dict, List, Optional
+
+CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "pacific-scraper",
+)
+DISCOVERY_FILE = os.path.join(CACHE_DIR, "browser_paths.json")
+HOST_STATE_FILE = os.path.join(CACHE_DIR, "browser_host.json")
+HOST_PROFILE_DIR = os.path.join(CACHE_DIR, "host-profile")
+
+DEFAULT_PORT = 9222
+
+CHROME_CANDIDATES = [
+    "/nix/store/qa9cnw4v5xkxyip6mb9kxqfq1z4x2dx1-chromium-138.0.7204.100/bin/chromium-browser",
+    "/usr/bin/chromium-browser",
+    "/usr/bin/chromium",
+    "/usr/bin/google-chrome",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+]
+CHROME_NAMES = ["chromium-browser", "chromium", "google-chrome", "chrome"]
+
+CHROMEDRIVER_CANDIDATES = [
+    "/nix/store/8zj50jw4w0hby47167kqqsaqw4mm5bkd-chromedriver-unwrapped-138.0.7204.100/bin/chromedriver",
+    "/usr/bin/chromedriver",
+]
+
+
+def _read_json(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_json(path: str, data: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _discover(key: str, names: List[str], candidates: List[str]) -> Optional[str]:
+    """Return a cached path for ``key`` or probe and cache a new one."""
+    cache = _read_json(DISCOVERY_FILE)
+    cached = cache.get(key)
+    if cached and os.path.exists(cached):
+        return cached
+
+    found = None
+    for name in names:
+        found = shutil.which(name)
+        if found:
+            break
+    if not found:
+        found = next((path for path in candidates if os.path.exists(path)), None)
+
+    if found:
+        cache[key] = found
+        try:
+            _write_json(DISCOVERY_FILE, cache)
+        except OSError:
+            pass
+    return found
+
+
+def find_chrome_binary() -> Optional[str]:
+    """
+    Locate the Chrome/Chromium executable.
+
+    ``PACIFIC_CHROME_BINARY`` overrides discovery.  Returns ``None``
+    when nothing is found, in which case Selenium's own lookup is used.
+    """
+    return os.environ.get("PACIFIC_CHROME_BINARY") or _discover("chrome", CHROME_NAMES, CHROME_CANDIDATES)
+
+
+def find_chromedriver() -> Optional[str]:
+    """
+    Locate the ChromeDriver executable.
+
+    ``PACIFIC_CHROMEDRIVER`` overrides discovery.  Returns ``None`` when
+    nothing is found, in which case Selenium Manager is left to fetch one.
+    """
+    return os.environ.get("PACIFIC_CHROMEDRIVER") or _discover(
+        "chromedriver", ["chromedriver"], CHROMEDRIVER_CANDIDATES
+    )
+
+
+def apply_chrome_binary(options: Any) -> Any:
+    """Point ``options`` at the discovered browser, if any; returns it."""
+    binary = find_chrome_binary()
+    if binary:
+        options.binary_location = binary
+    return options
+
+
+def chromedriver_service() -> Any:
+    """A ChromeDriver ``Service`` for the discovered executable."""
+    from selenium.webdriver.chrome.service import Service
+
+    path = find_chromedriver()
+    return Service(executable_path=path) if path else Service()
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _devtools_ready(port: int, timeout: float = 1.0) -> bool:
+    # urllib.request pulls in ssl; only load it when probing a browser.
+    import urllib.request
+
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/json/version", timeout=timeout) as response:
+            return response.status == 200
+    except OSError:
+        return False
+
+
+def host_status() -> Optional[Dict[str, Any]]:
+    """Return the running host's state (``pid``, ``port``...), or ``None``."""
+    state = _read_json(HOST_STATE_FILE)
+    if not state or not _pid_alive(int(state.get("pid", 0))):
+        return None
+    if not _devtools_ready(int(state["port"])):
+        return None
+    return state
+
+
+def start_host(port: int = DEFAULT_PORT, headless: bool = True, wait: float = 15.0) -> Dict[str, Any]:
+    """
+    Launch the long-lived browser, unless one is already running.
+
+    The browser runs in its own session so it outlives the calling
+    process and the terminal.
+
+    Raises
+    ------
+    RuntimeError
+        If no browser executable is found or DevTools does not come up
+        within ``wait`` seconds.
+    """
+    state = host_status()
+    if state:
+        return state
+
+    binary = find_chrome_binary()
+    if not binary:
+        raise RuntimeError("Chrome/Chromium not found; set PACIFIC_CHROME_BINARY.")
+    os.makedirs(HOST_PROFILE_DIR, exist_ok=True)
+    args = [
+        binary,
+        f"--remote-debugging-port={port}",
+        f"--user-data-dir={HOST_PROFILE_DIR}",
+        "--no-first-run",
+        "--no-default-browser-check",
+        "--no-sandbox",
+        "--disable-dev-shm-usage",
+        "--disable-gpu",
+        "--window-size=1920,1080",
+    ]
+    if headless:
+        args.append("--headless=new")
+    process = subprocess.Popen(
+        args,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+    deadline = time.monotonic() + wait
+    while not _devtools_ready(port):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            raise RuntimeError(f"Browser host did not open DevTools on port {port}.")
+        time.sleep(0.2)
+
+    state = {"pid": process.pid, "port": port, "profile": HOST_PROFILE_DIR, "started_at": time.time()}
+    _write_json(HOST_STATE_FILE, state)
+    return state
+
+
+def stop_host() -> bool:
+    """Terminate the browser host.  Returns ``False`` if none was running."""
+    state = _read_json(HOST_STATE_FILE)
+    pid = int(state.get("pid", 0)) if state else 0
+    stopped = False
+    if pid and _pid_alive(pid):
+        os.kill(pid, signal.SIGTERM)
+        stopped = True
+    if os.path.exists(HOST_STATE_FILE):
+        os.remove(HOST_STATE_FILE)
+    return stopped
+
+
+def attach_driver(start: bool = True, options: Any = None) -> Any:
+    """
+    Return a WebDriver attached to the browser host.
+
+    Parameters
+    ----------
+    start : bool, optional
+        Launch the host first if it is not running.
+    options : ChromeOptions, optional
+        Options carrying extra capabilities, such as the performance
+        log.  Browser command-line arguments in them have no effect,
+        since the browser is already running.
+
+    Raises
+    ------
+    RuntimeError
+        If no host is running and ``start`` is ``False``.
+    """
+    from selenium import webdriver
+
+    state = host_status()
+    if state is None:
+        if not start:
+            raise RuntimeError("No browser host is running; start one with 'python browser_host.py start'.")
+        state = start_host()
+
+    options = options or webdriver.ChromeOptions()
+    options.debugger_address = f"127.0.0.1:{state['port']}"
+    return webdriver.Chrome(service=chromedriver_service(), options=options)
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Manage the long-lived browser used by --attach runs")
+    parser.add_argument("command", choices=["start", "stop", "status"])
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"DevTools port (default: {DEFAULT_PORT})")
+    parser.add_argument("--visible", action="store_true", help="Show the browser window instead of running headless")
+    args = parser.parse_args()
+
+    if args.command == "start":
+        state = start_host(port=args.port, headless=not args.visible)
+        print(f"Browser host running (pid {state['pid']}, port {state['port']}, profile {state['profile']})")
+    elif args.command == "stop":
+        print("Browser host stopped." if stop_host() else "No browser host was running.")
+    else:
+        state = host_status()
+        if state:
+            print(f"Browser host running (pid {state['pid']}, port {state['port']})")
+        else:
+            print("No browser host running.")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,31 +4,47 @@ Comprehensive Pacific Giftware Data Filler
 Reads Excel/CSV with item numbers and fills in Case Qty, Unit Price, and URL
 """
 
-import pandas as pd
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
 import time
+import itertools
 import os
 import re
+import sys
+
+from browser_host import apply_chrome_binary, chromedriver_service
+from field_rules import COMPREHENSIVE_RULES, scanner
+from item_keys import stream_items
+from item_reader import iter_item_numbers
+from product_cache import ProductCache
+from url_index import ROUTES, UrlIndex, clean_item_number
+from readiness import use_eager_loading, wait_until_ready
+from result_sinks import CsvSink, TeeSink, XlsxSink
+from run_journal import RunJournal, journal_path
+from selector_stats import selector_registry
 
 def setup_chrome_driver():
     """Set up Chrome driver for scraping"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    
     chrome_options = Options()
     chrome_options.add_argument("--headless")
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
     chrome_options.add_argument("--disable-gpu")
     chrome_options.add_argument("--window-size=1920,1080")
+    use_eager_loading(chrome_options)
     
-    driver = webdriver.Chrome(options=chrome_options)
+    apply_chrome_binary(chrome_options)
+    driver = webdriver.Chrome(service=chromedriver_service(), options=chrome_options)
     return driver
 
 def login_to_pacific_giftware(driver):
     """Attempt login for wholesale pricing access"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+    
     try:
         print("Attempting login for pricing access...")
         driver.get("https://www.pacificgiftware.com/login")
@@ -88,26 +104,35 @@ def login_to_pacific_giftware(driver):
         print(f"Login error: {str(e)}")
         return False
 
-def extract_comprehensive_data(driver, item_number, with_login=False):
-    """Extract comprehensive data for an item"""
+def extract_comprehensive_data(driver, item_number, with_login=False, url_index=None):
+    """Extract comprehensive data for an item
+
+    With a ``url_index.UrlIndex``, the URL that worked last time is tried
+    first and items recently found missing are skipped.
+    """
+    from selenium.webdriver.common.by import By
+    
     try:
-        # Clean item number
-        clean_item = str(item_number).strip().replace('Y', '').replace('#', '')
-        
-        # Try both URL patterns
-        urls_to_try = [
-            f"https://www.pacificgiftware.com/product/{clean_item}",
-            f"https://www.pacificgiftware.com/item/{clean_item}"
-        ]
+        # Try both URL patterns, the remembered one first
+        if url_index is None:
+            urls_to_try = [route.format(clean_item_number(item_number)) for route in ROUTES]
+        elif url_index.is_missing(item_number):
+            print("    Skipping: not found on a recent run")
+            urls_to_try = []
+        else:
+            urls_to_try = url_index.candidates(item_number)
         
         working_url = None
         product_data = None
+        probe_failed = False
         
         for url in urls_to_try:
             try:
                 print(f"    Trying: {url}")
                 driver.get(url)
-                time.sleep(2)
+                # Don't stop the page yet: the case pack and price are
+                # read from it below
+                wait_until_ready(driver, ("title",), timeout=2, stop_loading=False)
                 
                 page_title = driver.title
                 
@@ -117,8 +142,26 @@ def extract_comprehensive_data(driver, item_number, with_login=False):
                     break
                     
             except Exception as e:
+                # A timeout or a dead browser says nothing about the item
+                probe_failed = True
+                print(f"    Could not check {url}: {e}")
                 continue
         
+        # A miss is only remembered when every route was checked and
+        # judged not found; otherwise the next run tries again
+        if url_index is not None and urls_to_try and (working_url or not probe_failed):
+            url_index.put(item_number, working_url)
+        
+        if not working_url and probe_failed:
+            return {
+                'Item Number': item_number,
+                'Product Name': 'Could not be checked',
+                'Case Qty': 'N/A',
+                'Unit Price': 'N/A',
+                'URL': 'Item not checked',
+                'Status': 'Error: page could not be loaded'
+            }
+        
         if not working_url:
             return {
                 'Item Number': item_number,
@@ -129,6 +172,9 @@ def extract_comprehensive_data(driver, item_number, with_login=False):
                 'Status': 'Not Found'
             }
         
+        # Give the fields read below time to load before stopping the page
+        wait_until_ready(driver, ("title", "price", "notes") if with_login else ("title", "notes"), timeout=2)
+        
         # Extract product name
         product_name = "Name not available"
         try:
@@ -150,6 +196,7 @@ def extract_comprehensive_data(driver, item_number, with_login=False):
         
         # Extract case quantity
         case_quantity = "Not specified"
+        found = None
         try:
             # Look in product name first
             case_match = re.search(r'C/(\d+)', product_name)
@@ -157,20 +204,10 @@ def extract_comprehensive_data(driver, item_number, with_login=False):
                 case_quantity = case_match.group(1)
             else:
                 # Search page source
-                page_source = driver.page_source
-                case_patterns = [
-                    r'C/(\d+)',
-                    r'Case of (\d+)',
-                    r'Pack of (\d+)',
-                    r'(\d+) per case',
-                    r'Quantity[:\s]*(\d+)'
-                ]
-                
-                for pattern in case_patterns:
-                    matches = re.findall(pattern, page_source, re.IGNORECASE)
-                    if matches:
-                        case_quantity = matches[0]
-                        break
+                # One pass finds the price as well, for the fallback below
+                found = scanner(COMPREHENSIVE_RULES).scan(driver.page_source)
+                if 'case' in found:
+                    case_quantity = found['case'].value
                         
         except Exception as e:
             pass
@@ -190,32 +227,22 @@ def extract_comprehensive_data(driver, item_number, with_login=False):
                     "span:contains('$')"
                 ]
                 
-                for selector in price_selectors:
-                    try:
-                        elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                        for element in elements:
-                            if element and '$' in element.text:
-                                unit_price = element.text.strip()
-                                break
-                        if unit_price != "Login required for pricing":
-                            break
-                    except:
-                        continue
+                def price_text(selector):
+                    for element in driver.find_elements(By.CSS_SELECTOR, selector):
+                        if element and '$' in element.text:
+                            return element.text.strip()
+                
+                found_price = selector_registry().first(
+                    "product.price", price_selectors, price_text, by_hits=False)
+                if found_price:
+                    unit_price = found_price[1]
                 
                 # Also search page source for price patterns
                 if unit_price == "Login required for pricing":
-                    page_source = driver.page_source
-                    price_patterns = [
-                        r'\$(\d+\.\d{2})',
-                        r'Price[:\s]*\$(\d+\.\d{2})',
-                        r'Wholesale[:\s]*\$(\d+\.\d{2})'
-                    ]
-                    
-                    for pattern in price_patterns:
-                        matches = re.findall(pattern, page_source)
-                        if matches:
-                            unit_price = f"${matches[0]}"
-                            break
+                    if found is None:
+                        found = scanner(COMPREHENSIVE_RULES).scan(driver.page_source, ['price'])
+                    if 'price' in found:
+                        unit_price = f"${found['price'].value}"
                             
             except Exception as e:
                 pass
@@ -245,71 +272,87 @@ def extract_comprehensive_data(driver, item_number, with_login=False):
             'Status': f'Error: {str(e)}'
         }
 
-def fill_comprehensive_data(input_file):
-    """Main function to fill comprehensive data"""
+def fill_comprehensive_data(input_file, resume=False):
+    """Main function to fill comprehensive data
+
+    Each item is journaled next to the input file as it finishes; with
+    ``resume`` the items of an interrupted run are not scraped again.
+    """
     
-    # Read input file
+    # Stream item numbers from the file; scraping starts while the rest
+    # of a large sheet is still being read
     try:
-        if input_file.endswith('.xlsx'):
-            df = pd.read_excel(input_file)
-        else:
-            df = pd.read_csv(input_file)
-        
-        print(f"Input file columns: {list(df.columns)}")
-        print(f"Total items: {len(df)}")
-        
+        values = iter_item_numbers(input_file)
+        first = next(values, None)
     except Exception as e:
         print(f"Error reading input file: {e}")
         return
     
-    # Find item number column
-    item_column = None
-    possible_columns = ['Item Number', 'Item', 'Item#', 'Item #', 'SKU', 'Product Code', 'Number']
-    
-    for col in df.columns:
-        if any(possible_col.lower() in col.lower() for possible_col in possible_columns):
-            item_column = col
-            break
-    
-    if not item_column:
-        print(f"Could not find item number column. Available columns: {list(df.columns)}")
+    if first is None:
+        print("No item numbers found in the input file.")
         return
     
-    print(f"Using column '{item_column}' for item numbers")
-    
-    # Get item numbers
-    item_numbers = df[item_column].astype(str).tolist()
-    print(f"Processing {len(item_numbers)} items...")
+    # Repeated SKUs are scraped once
+    plan, item_numbers = stream_items(itertools.chain([first], values))
     
     # Setup browser
     driver = setup_chrome_driver()
+    url_index = UrlIndex()
+    # Products scraped in the last day (by any of the scrapers) are reused
+    cache = ProductCache()
+    journal = RunJournal(journal_path(input_file), resume=resume)
+    journaled = journal.completed()
+    if resume:
+        print(f"{len(journaled)} items already done in {journal.path}")
     
     try:
         # Attempt login for pricing
         logged_in = login_to_pacific_giftware(driver)
         
-        # Process all items
-        results = []
-        for i, item_number in enumerate(item_numbers, 1):
-            print(f"\n📦 Processing item {i}/{len(item_numbers)}: {item_number}")
-            result = extract_comprehensive_data(driver, item_number, with_login=logged_in)
-            results.append(result)
-        
-        # Create output DataFrame
-        output_df = pd.DataFrame(results)
-        
-        # Save results
+        # Results are written as they come, so create the output files first
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # Create output folder
         folder_name = f"Comprehensive_Results_{timestamp}"
         os.makedirs(folder_name, exist_ok=True)
         
         csv_file = os.path.join(folder_name, f"filled_data_{timestamp}.csv")
         excel_file = os.path.join(folder_name, f"filled_data_{timestamp}.xlsx")
         
-        output_df.to_csv(csv_file, index=False)
-        output_df.to_excel(excel_file, index=False)
+        # Process all items
+        def process_all():
+            for i, item_number in enumerate(item_numbers, 1):
+                print(f"\n📦 Processing item {i}: {item_number}")
+                product = cache.get(item_number)
+                if product is not None:
+                    print(f"    ✓ Cached: {product.name}")
+                    yield {
+                        'Item Number': item_number,
+                        'Product Name': product.name,
+                        'Case Qty': product.case_quantity or 'Not specified',
+                        'Unit Price': product.price or 'Login required for pricing',
+                        'URL': product.url or 'N/A',
+                        'Status': 'Found'
+                    }
+                    continue
+                if item_number in journaled:
+                    print(f"    ✓ Done in an earlier run: {journaled[item_number]['Product Name']}")
+                    yield journaled[item_number]
+                    continue
+                result = extract_comprehensive_data(driver, item_number, with_login=logged_in, url_index=url_index)
+                journal.record(item_number, result, ok=result['Status'] == 'Found')
+                # The cache keeps only results that have a price
+                if result['Status'] == 'Found':
+                    cache.put(item_number, result['Product Name'], result['Unit Price'], result['Case Qty'], result['URL'])
+                yield result
+        
+        # Write one row per input row, keeping the first few to show
+        found_items = 0
+        sample = []
+        with TeeSink(CsvSink(csv_file), XlsxSink(excel_file)) as sink:
+            for row in plan.fan_out_stream(process_all(), lambda result, row: {**result, 'Item Number': row}):
+                sink.write(row)
+                found_items += row['Status'] == 'Found'
+                if len(sample) < 5:
+                    sample.append(row)
         
         print(f"\n🎉 Processing completed!")
         print(f"📁 Results saved to: {folder_name}/")
@@ -317,28 +360,42 @@ def fill_comprehensive_data(input_file):
         print(f"   📊 Excel: {os.path.basename(excel_file)}")
         
         # Display summary
-        print(f"\n📊 Summary:")
-        found_items = len(output_df[output_df['Status'] == 'Found'])
-        print(f"   ✅ Successfully processed: {found_items}/{len(item_numbers)} items")
+        print(f"\n📊 Summary: {plan.summary()}")
+        print(f"   ✅ Successfully processed: {found_items}/{sink.rows} rows")
         
         # Display sample results
-        print(f"\n📋 Sample Results:")
-        print(output_df[['Item Number', 'Product Name', 'Case Qty', 'Unit Price']].head().to_string(index=False))
+        if sample:
+            import pandas as pd
+            
+            print(f"\n📋 Sample Results:")
+            print(pd.DataFrame(sample)[['Item Number', 'Product Name', 'Case Qty', 'Unit Price']].to_string(index=False))
         
-        return output_df, folder_name
+        return (csv_file, excel_file), folder_name
         
+    except KeyboardInterrupt:
+        print("\n" + journal.resume_hint())
+        sys.exit(130)
     finally:
+        journal.close()
+        url_index.save()
+        print(cache.report())
+        cache.close()
         driver.quit()
 
-if __name__ == "__main__":
-    import sys
+def main():
+    """Command line entry point: input file and an optional --resume"""
+    args = [arg for arg in sys.argv[1:] if arg != '--resume']
+    resume = '--resume' in sys.argv[1:]
     
-    if len(sys.argv) > 1:
-        input_file = sys.argv[1]
+    if args:
+        input_file = args[0]
     else:
         input_file = input("Enter input file (CSV/Excel): ").strip()
     
     if os.path.exists(input_file):
-        fill_comprehensive_data(input_file)
+        fill_comprehensive_data(input_file, resume=resume)
     else:
-        print(f"File not found: {input_file}")
\ No newline at end of file
+        print(f"File not found: {input_file}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
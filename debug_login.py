@@ -3,14 +3,13 @@
 Debug login page to understand the current structure
 """
 
-import os
 import time
-import shutil
 from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 
+from browser_host import apply_chrome_binary, chromedriver_service
+
 def build_driver():
     opts = Options()
     opts.add_argument("--headless=new")
@@ -19,30 +18,8 @@ def build_driver():
     opts.add_argument("--disable-gpu")
     opts.add_argument("--window-size=1280,960")
     
-    chrome_paths = [
-        "/usr/bin/chromium-browser",
-        "/nix/store/qa9cnw4v5xkxyip6mb9kxqfq1z4x2dx1-chromium-138.0.7204.100/bin/chromium-browser"
-    ]
-    
-    for path in chrome_paths:
-        if os.path.exists(path):
-            opts.binary_location = path
-            break
-    
-    chromedriver_paths = [
-        shutil.which("chromedriver"),
-        "/usr/bin/chromedriver",
-        "/nix/store/8zj50jw4w0hby47167kqqsaqw4mm5bkd-chromedriver-unwrapped-138.0.7204.100/bin/chromedriver"
-    ]
-    
-    chromedriver_path = None
-    for path in chromedriver_paths:
-        if path and os.path.exists(path):
-            chromedriver_path = path
-            break
-    
-    svc = Service(chromedriver_path)
-    return webdriver.Chrome(service=svc, options=opts)
+    apply_chrome_binary(opts)
+    return webdriver.Chrome(service=chromedriver_service(), options=opts)
 
 def debug_login_pages():
     """Debug different login page URLs"""
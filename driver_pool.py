@@ -0,0 +1,235 @@
+"""
+driver_pool.py
+--------------
+
+A pool of authenticated Selenium sessions that scrape a list of item
+numbers in parallel.
+
+:func:`pacificgiftware_scraper.process_items` drives a single Chrome
+session through the item list one item at a time.  Each page load is
+dominated by network and render time rather than local CPU, so running
+several browsers side by side scales almost linearly until the machine
+runs out of memory.
+
+Every worker thread owns one driver built with
+:func:`pacificgiftware_scraper.start_driver`.  Browsers start
+concurrently; authentication goes through
+:func:`session_store.restore_or_login` one worker at a time, so only the
+first worker fills in the login form (and only if no saved session is
+still valid) while the others reuse the session it saved.  Workers
+pull ``(index, item_number)`` pairs from one shared queue, so scraping
+begins as soon as the first worker is ready and slower workers simply
+take fewer items.  Results are written into a
+list slot chosen by the input index, which keeps the output in the
+same order as the input file.
+
+Example
+-------
+::
+
+    from driver_pool import DriverPool
+
+    pool = DriverPool(4, credentials=lambda: ("me@example.com", "secret"), headless=True)
+    products = pool.run(["12238", "11358", "11982"])
+
+"""
+
+from __future__ import annotations
+
+import queue
+import shutil
+import tempfile
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from driver_recycling import RecyclingDriver
+from pacificgiftware_scraper import ProductInfo, login, scrape_item, start_driver
+from request_blocking import BlockingTotal
+from session_store import restore_or_login
+
+# Fresh browsers a worker starts for an item whose browser died, before
+# it hands the item back and stops.
+RESTART_ATTEMPTS = 2
+
+
+class DriverPool:
+    """
+    Scrape items with ``workers`` concurrent, independently logged-in
+    browser sessions.
+
+    Parameters
+    ----------
+    workers : int
+        Number of browser sessions to run.  Must be at least one.
+    credentials : Callable[[], Tuple[str, str]]
+        Returns ``(email, password)``.  Only called when the saved
+        session cannot be reused; calls are serialised, so it may
+        prompt on the terminal.
+    headless : bool, optional
+        Run every browser without a GUI.
+    driver_kwargs : Dict[str, Any], optional
+        Extra keyword arguments for
+        :func:`pacificgiftware_scraper.start_driver`, such as
+        ``block``.
+    recycle_kwargs : Dict[str, Any], optional
+        Thresholds for :class:`driver_recycling.RecyclingDriver`, such
+        as ``max_pages`` and ``max_rss_mb``.  A worker's browser is
+        restarted in place, in the same profile, when it crosses them.
+    parse_pool : parse_pool.ParsePool, optional
+        Process pool shared by all workers for parsing pages, so that
+        parsing uses several cores instead of queueing on the GIL.
+    parser : str, optional
+        Extraction backend (see :mod:`product_parsers`).
+    blocking : request_blocking.BlockingTotal, optional
+        Receives each browser's request blocking statistics before it
+        quits; by default the pool keeps its own in :attr:`blocking`.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        credentials: Callable[[], Tuple[str, str]],
+        headless: bool = False,
+        driver_kwargs: Optional[Dict[str, Any]] = None,
+        recycle_kwargs: Optional[Dict[str, Any]] = None,
+        parse_pool: Optional[Any] = None,
+        parser: str = "html.parser",
+        blocking: Optional[BlockingTotal] = None,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("DriverPool needs at least one worker.")
+        self.workers = workers
+        self.credentials = credentials
+        self.headless = headless
+        self.driver_kwargs = dict(driver_kwargs or {})
+        self.recycle_kwargs = dict(recycle_kwargs or {})
+        self.parse_pool = parse_pool
+        self.parser = parser
+        self.blocking = blocking if blocking is not None else BlockingTotal()
+        self._login_lock = threading.Lock()
+
+    def run(
+        self,
+        item_numbers: List[str],
+        on_result: Optional[Callable[[str, ProductInfo], None]] = None,
+    ) -> List[ProductInfo]:
+        """
+        Scrape every item and return the results in input order.
+
+        Parameters
+        ----------
+        item_numbers : List[str]
+            Item numbers to scrape.
+        on_result : Callable[[str, ProductInfo], None], optional
+            Called from the worker thread as each item finishes, e.g.
+            to journal it (see :mod:`run_journal`).
+
+        Returns
+        -------
+        List[ProductInfo]
+            One entry per input item, in the same order.  Items left
+            over when every worker has stopped (their browsers could not
+            be restarted) come back with empty fields and are passed to
+            ``on_result`` like any other failure, so a resumed run
+            scrapes them again.
+
+        Raises
+        ------
+        RuntimeError
+            If no worker managed to start and log in, so no item was
+            processed at all.
+        """
+        work: "queue.Queue[Tuple[int, str]]" = queue.Queue()
+        for index, item in enumerate(item_numbers):
+            work.put((index, item))
+        results: List[Optional[ProductInfo]] = [None] * len(item_numbers)
+
+        threads = [
+            threading.Thread(target=self._worker, args=(n, work, results, on_result), name=f"driver-{n}", daemon=True)
+            for n in range(min(self.workers, len(item_numbers)))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        missing = [i for i, info in enumerate(results) if info is None]
+        if missing and len(missing) == len(item_numbers):
+            raise RuntimeError(
+                f"No browser session could be started; {len(missing)} item(s) were not processed."
+            )
+        if missing:
+            print(f"{len(missing)} item(s) were not scraped because no browser was left to take them; "
+                  "they are written with empty fields.")
+            for index in missing:
+                item = item_numbers[index]
+                results[index] = ProductInfo(item_number=item, product_name="", unit_price=None, case_quantity=None)
+                if on_result is not None:
+                    on_result(item, results[index])
+        return results  # type: ignore[return-value]
+
+    def _start_session(self, profile_dir: str) -> Any:
+        """Start and log in one driver using its own Chrome profile."""
+        driver = start_driver(headless=self.headless, user_data_dir=profile_dir, **self.driver_kwargs)
+        try:
+            # Serialising authentication means the first worker performs
+            # the form login and saves the session; every later worker
+            # finds that session on disk and restores it instead.
+            with self._login_lock:
+                restore_or_login(driver, lambda: login(driver, *self.credentials()))
+        except Exception:
+            driver.quit()
+            raise
+        return driver
+
+    def _worker(
+        self,
+        number: int,
+        work: "queue.Queue[Tuple[int, str]]",
+        results: List[Optional[ProductInfo]],
+        on_result: Optional[Callable[[str, ProductInfo], None]] = None,
+    ) -> None:
+        """Thread body: start a session, then drain the shared queue."""
+        # Chrome locks its profile directory, so concurrent browsers
+        # cannot share the default one used by ``start_driver``.
+        profile_dir = tempfile.mkdtemp(prefix=f"pacific-worker-{number}-")
+        try:
+            browser = RecyclingDriver(
+                lambda: self._start_session(profile_dir), on_quit=self.blocking.add, **self.recycle_kwargs
+            )
+            try:
+                browser.driver
+            except Exception as exc:
+                print(f"Worker {number} could not start: {exc}")
+                return
+            print(f"Worker {number} logged in.")
+            try:
+                while True:
+                    try:
+                        index, item = work.get_nowait()
+                    except queue.Empty:
+                        break
+                    for attempt in range(RESTART_ATTEMPTS + 1):
+                        try:
+                            results[index] = browser.run(
+                                lambda driver: scrape_item(driver, item, self.parse_pool, self.parser)
+                            )
+                            break
+                        except Exception as exc:
+                            # The browser died and could not be
+                            # restarted; start a fresh one for the item.
+                            print(f"Worker {number}: browser failed on {item} ({exc}); starting a new one...")
+                            browser.quit()
+                    else:
+                        # Hand the item back for any worker still
+                        # running; run() fills in whatever is left.
+                        work.put((index, item))
+                        print(f"Worker {number} stopped: no browser could be started.")
+                        return
+                    if on_result is not None:
+                        on_result(item, results[index])
+                print(f"Worker {number}: {browser.report()}")
+            finally:
+                browser.quit()
+        finally:
+            shutil.rmtree(profile_dir, ignore_errors=True)
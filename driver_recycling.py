@@ -0,0 +1,301 @@
+"""
+driver_recycling.py
+-------------------
+
+Keep long scraping runs fast by recycling the browser before it bloats.
+
+A Chrome session that visits thousands of product pages slowly piles
+up renderer memory (detached DOM trees, the single-page app's caches,
+the back/forward cache) and each page load gets a little slower.  Over
+a 10k-item run the slowdown is large, and eventually the renderer can
+crash outright.
+
+:class:`RecyclingDriver` wraps a driver factory and is consulted
+between items.  It counts pages and, every ``check_every`` pages,
+measures the resident memory of the driver's process tree
+(ChromeDriver, the browser and all of its renderer, GPU and utility
+processes).  Past the thresholds it either
+
+* navigates to ``about:blank``, which releases the current page's
+  renderer, when memory crosses ``blank_rss_mb``; or
+* quits the driver and starts a fresh one through the factory when
+  memory stays above ``max_rss_mb`` or ``max_pages`` is reached.  The
+  factory restores the saved login (see :mod:`session_store`), so a
+  restart costs one browser start and no form login.
+
+A restart quits the old driver at once but only starts the new one
+when the next item asks for :attr:`RecyclingDriver.driver`.  A run
+that ends on the page limit does not start a browser it never uses.
+
+Recycling only happens between items.  If the browser dies while an
+item is being scraped, :meth:`RecyclingDriver.run` restarts it and
+scrapes that item again, so no item is lost.
+
+Memory is read from ``/proc``, or through ``psutil`` when it is
+installed.  Where neither works (other platforms, or a driver attached
+to the :mod:`browser_host` browser, which is not a child of
+ChromeDriver) only the page count applies.
+
+Example
+-------
+::
+
+    from driver_recycling import RecyclingDriver
+
+    browser = RecyclingDriver(new_logged_in_driver, max_pages=500, max_rss_mb=1500)
+    try:
+        products = [browser.run(lambda d: scrape_item(d, item)) for item in items]
+    finally:
+        browser.quit()
+
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_MAX_PAGES = 500
+DEFAULT_MAX_RSS_MB = 1500.0
+
+
+def _children_map() -> Dict[int, List[int]]:
+    """Map each pid to its direct children by scanning ``/proc``."""
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name may contain spaces and parentheses, so split
+        # after its closing parenthesis: "<state> <ppid> ...".
+        fields = stat[stat.rfind(b")") + 2:].split()
+        if len(fields) > 1:
+            children.setdefault(int(fields[1]), []).append(int(entry))
+    return children
+
+
+def _proc_rss(pid: int) -> int:
+    """Resident set size of one process in bytes, 0 if it is gone."""
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii", errors="replace") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def process_tree_rss(root_pid: int) -> Optional[int]:
+    """
+    Return the summed RSS in bytes of ``root_pid`` and all descendants.
+
+    Shared pages are counted once per process, so the figure
+    overstates real usage; it is meant as a trend to compare against a
+    threshold.  Returns ``None`` if memory cannot be read here.
+    """
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+
+    if psutil is not None:
+        try:
+            root = psutil.Process(root_pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return None
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+
+    if not os.path.isdir(f"/proc/{root_pid}"):
+        return None
+    children = _children_map()
+    total, stack = 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        total += _proc_rss(pid)
+        stack.extend(children.get(pid, ()))
+    return total
+
+
+def driver_pid(driver: Any) -> Optional[int]:
+    """Pid of the ChromeDriver process behind ``driver``, if it is local."""
+    process = getattr(getattr(driver, "service", None), "process", None)
+    return getattr(process, "pid", None)
+
+
+def is_alive(driver: Any) -> bool:
+    """Return ``True`` if the browser still answers WebDriver commands."""
+    try:
+        driver.current_window_handle
+        return True
+    except Exception:
+        return False
+
+
+class RecyclingDriver:
+    """
+    A driver that is blanked or restarted when it has done too much.
+
+    Parameters
+    ----------
+    factory : Callable[[], Any]
+        Starts a new driver, logged in and ready to scrape.
+    max_pages : int, optional
+        Restart after this many pages.  ``0`` disables the limit.
+    max_rss_mb : float, optional
+        Restart when the process tree uses more than this many MiB.
+        ``None`` disables memory checks.
+    blank_rss_mb : float, optional
+        Navigate to ``about:blank`` above this many MiB.  Defaults to
+        three quarters of ``max_rss_mb``.
+    check_every : int, optional
+        Measure memory every this many pages; reading ``/proc`` for a
+        few dozen Chrome processes takes a few milliseconds.
+    on_quit : Callable[[Any], None], optional
+        Called with each driver just before it is quit, e.g.
+        :meth:`request_blocking.BlockingTotal.add` to keep its
+        statistics.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        max_pages: int = DEFAULT_MAX_PAGES,
+        max_rss_mb: Optional[float] = DEFAULT_MAX_RSS_MB,
+        blank_rss_mb: Optional[float] = None,
+        check_every: int = 10,
+        on_quit: Optional[Callable[[Any], None]] = None,
+    ) -> None:
+        self.factory = factory
+        self.on_quit = on_quit
+        self.max_pages = max_pages
+        self.max_rss = max_rss_mb * 2**20 if max_rss_mb else None
+        if blank_rss_mb is None and max_rss_mb:
+            blank_rss_mb = max_rss_mb * 0.75
+        self.blank_rss = blank_rss_mb * 2**20 if blank_rss_mb else None
+        self.check_every = max(1, check_every)
+        self._driver: Optional[Any] = None
+        self.pages = 0
+        self._checked_at = 0
+        self.total_pages = 0
+        self.restarts = 0
+        self.blanks = 0
+        self.crashes = 0
+        self.peak_rss = 0
+        self.last_rss: Optional[int] = None
+        self.restart_seconds = 0.0
+        self._restart_pending = False
+
+    @property
+    def driver(self) -> Any:
+        """The current driver, started on first use (or after a restart)."""
+        if self._driver is None:
+            start = time.perf_counter()
+            self._driver = self.factory()
+            self.pages = 0
+            self._checked_at = 0
+            if self._restart_pending:
+                self._restart_pending = False
+                self.restarts += 1
+                self.restart_seconds += time.perf_counter() - start
+        return self._driver
+
+    def rss(self) -> Optional[int]:
+        """Current RSS of the driver's process tree in bytes, if known."""
+        pid = driver_pid(self.driver)
+        rss = process_tree_rss(pid) if pid else None
+        self.last_rss = rss
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss, rss)
+        return rss
+
+    def restart(self) -> None:
+        """Quit the current driver; the next :attr:`driver` access starts a new one."""
+        start = time.perf_counter()
+        self.quit()
+        self._restart_pending = True
+        self.restart_seconds += time.perf_counter() - start
+
+    def blank(self) -> None:
+        """Unload the current page to release its renderer memory."""
+        try:
+            self.driver.get("about:blank")
+            self.blanks += 1
+        except Exception:
+            self.restart()
+
+    def maybe_recycle(self) -> None:
+        """Blank or restart the browser if a threshold has been crossed."""
+        if self.max_pages and self.pages >= self.max_pages:
+            self.restart()
+            return
+        if self.max_rss is None or self.pages - self._checked_at < self.check_every:
+            return
+        self._checked_at = self.pages
+        rss = self.rss()
+        if rss is None or self.blank_rss is None or rss < self.blank_rss:
+            return
+        self.blank()
+        if self._driver is None:
+            # Blanking failed and the browser was restarted.
+            return
+        rss = self.rss()
+        if rss is not None and rss >= self.max_rss:
+            self.restart()
+
+    def run(self, task: Callable[[Any], T], pages: int = 1) -> T:
+        """
+        Run ``task(driver)``, then recycle if needed.
+
+        ``pages`` is the number of pages the task loads, for tasks that
+        scrape a batch of items (see :mod:`tab_pipeline`).  When the
+        browser turns out to be dead afterwards (a crashed renderer or a
+        killed process), a fresh driver is started and the task is run
+        once more, so no item is lost.
+        """
+        result = task(self.driver)
+        if not is_alive(self._driver):
+            self.crashes += 1
+            print("Browser stopped responding; restarting and retrying the item...")
+            self.restart()
+            result = task(self.driver)
+        self.pages += pages
+        self.total_pages += pages
+        self.maybe_recycle()
+        return result
+
+    def quit(self) -> None:
+        """Quit the current driver, if one is running."""
+        driver, self._driver = self._driver, None
+        if driver is not None:
+            if self.on_quit is not None:
+                self.on_quit(driver)
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def report(self) -> str:
+        """One-line summary of the recycling done so far."""
+        parts = [f"{self.total_pages} pages", f"{self.restarts} restart(s)", f"{self.blanks} blank(s)"]
+        if self.crashes:
+            parts.append(f"{self.crashes} crash(es)")
+        if self.peak_rss:
+            parts.append(f"peak {self.peak_rss / 2**20:.0f} MiB")
+        if self.restarts:
+            parts.append(f"{self.restart_seconds:.1f}s restarting")
+        return "Driver recycling: " + ", ".join(parts)
@@ -6,6 +6,8 @@ Extract item numbers from the uploaded Excel file
 import pandas as pd
 import os
 
+from item_keys import plan_items
+
 def extract_items_from_excel():
     """Extract item numbers from the uploaded Excel file"""
     
@@ -52,39 +54,20 @@ def extract_items_from_excel():
         print(f"Potential item columns: {item_columns}")
         
         # Extract item numbers
-        items = []
         if item_columns:
             # Use the first item column found
             item_col = item_columns[0]
             print(f"Using column: {item_col}")
-            
-            for value in df[item_col].dropna():
-                # Clean and extract numeric part
-                item_str = str(value).strip()
-                if item_str and item_str != 'nan':
-                    # Try to extract numbers
-                    import re
-                    numbers = re.findall(r'\d+', item_str)
-                    if numbers:
-                        items.append(numbers[0])
-                    else:
-                        items.append(item_str)
         else:
             # Try first column
             print("No specific item column found, using first column")
-            first_col = df.columns[0]
-            for value in df[first_col].dropna():
-                item_str = str(value).strip()
-                if item_str and item_str != 'nan':
-                    import re
-                    numbers = re.findall(r'\d+', item_str)
-                    if numbers:
-                        items.append(numbers[0])
-                    else:
-                        items.append(item_str)
+            item_col = df.columns[0]
         
-        # Remove duplicates and clean
-        items = list(set([item for item in items if item and len(str(item)) > 0]))
+        # Take the first run of digits where there is one, then collapse
+        # duplicates keeping the sheet's order
+        values = df[item_col].dropna().astype(str).str.strip()
+        values = values.str.extract(r'(\d+)', expand=False).fillna(values)
+        items = plan_items(values).unique
         
         print(f"Extracted {len(items)} unique items: {items}")
         
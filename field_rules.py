@@ -0,0 +1,258 @@
+"""
+field_rules.py
+--------------
+
+One place for the text patterns that pull case packs and prices out of
+product pages, and a scanner that finds all of them in a single pass.
+
+The case-quantity logic used to live in four places, each with its own
+list of regular expressions tried one after another with
+``re.findall`` over the full page source:
+
+* ``final_scraper`` — ``case pack``, ``case quantity``, ``case``,
+  ``pack`` and ``qty``;
+* ``comprehensive_filler`` — ``C/NN``, ``Case of``, ``Pack of``,
+  ``per case`` and ``Quantity``, plus three price patterns;
+* ``robust_batch2_scraper`` — ``C/NN``, ``Case of``, ``Pack of`` and
+  ``Qty``;
+* :func:`pacificgiftware_scraper.extract_case_quantity_from_notes` — a
+  line scan for ``CASE PACK``.
+
+A page whose case pack is only found by the last pattern was read five
+times.  Here every pattern is a :class:`Rule` with a field name and a
+priority (its position in the list), and the rule lists of each caller
+are defined below, built from shared rules.  A :class:`FieldScanner`
+walks a text once from left to right over the candidate positions of
+all its rules together, and tries a rule only where it can start.
+
+Most rules begin with a fixed word (``case``, ``c/``, ``$`` ...), given
+as the rule's ``prefix``.  Their candidates come from ``str.find`` on
+the lower-cased text, which runs at memory speed, instead of from the
+regex engine stepping through every character.  Rules without a prefix
+take their candidates from their own ``regex.search``.  A field is
+settled as soon as no rule of higher priority than its best match so
+far is left, and the walk stops once every field is settled.
+
+The result is exactly what the sequential loops returned: for each
+field, the first match of the highest-priority rule that matches
+anywhere.  :class:`FieldMatch` also records which rule that was.
+
+Example
+-------
+::
+
+    from field_rules import COMPREHENSIVE_RULES, scanner
+
+    found = scanner(COMPREHENSIVE_RULES).scan(page_source)
+    if "case" in found:
+        print(found["case"].value, "via", found["case"].rule)
+
+"""
+
+from __future__ import annotations
+
+import functools
+import heapq
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    One pattern for one field.
+
+    Parameters
+    ----------
+    field : str
+        The field the rule extracts, e.g. ``"case"`` or ``"price"``.
+    name : str
+        Short label reported with matches.
+    pattern : str
+        Regular expression.  The value is its first group, or the whole
+        match if it has no groups (as with ``re.findall``).
+    flags : int, optional
+        ``re`` flags for this rule alone; only ``IGNORECASE``,
+        ``MULTILINE``, ``DOTALL`` and ``VERBOSE`` are allowed.
+    value : Callable[[re.Match], Optional[str]], optional
+        Computes the value from a match instead.  Returning ``None``
+        rejects that occurrence, and scanning continues.
+    prefix : str, optional
+        Lower-case text every match starts with, used to find candidate
+        positions quickly.  Leave empty if matches can start with
+        anything.
+    """
+
+    field: str
+    name: str
+    pattern: str
+    flags: int = re.IGNORECASE
+    value: Optional[Callable[["re.Match[str]"], Optional[str]]] = None
+    prefix: str = ""
+
+    @property
+    def regex(self) -> "re.Pattern[str]":
+        return _compile(self.pattern, self.flags)
+
+    def extract(self, match: "re.Match[str]") -> Optional[str]:
+        if self.value is not None:
+            return self.value(match)
+        return match.group(1) if match.re.groups else match.group(0)
+
+
+@dataclass(frozen=True)
+class FieldMatch:
+    """The value found for a field, and the rule and offset that found it."""
+
+    field: str
+    value: str
+    rule: str
+    start: int
+
+
+@functools.lru_cache(maxsize=None)
+def _compile(pattern: str, flags: int) -> "re.Pattern[str]":
+    return re.compile(pattern, flags)
+
+
+# Characters that IGNORECASE matches to an ASCII letter but whose
+# lower case is not that letter.
+_FOLD = str.maketrans({"\u0131": "i", "\u017f": "s"})
+
+
+def _lowered(text: str) -> Optional[str]:
+    """``text`` in lower case for prefix search, if offsets are kept."""
+    lowered = text.lower().translate(_FOLD)
+    # A few characters lower-case to two; positions would shift.
+    return lowered if len(lowered) == len(text) else None
+
+
+class FieldScanner:
+    """
+    Finds every field of a rule list in one pass over a text.
+
+    Rules are prioritised by their order in ``rules``; each field only
+    competes with rules of the same field.
+    """
+
+    def __init__(self, rules: Sequence[Rule]) -> None:
+        if not rules:
+            raise ValueError("FieldScanner needs at least one rule.")
+        self.rules: Tuple[Rule, ...] = tuple(rules)
+        self.fields: Dict[str, List[Tuple[int, Rule]]] = {}
+        for priority, rule in enumerate(self.rules):
+            if rule.prefix != rule.prefix.lower():
+                raise ValueError(f"Rule '{rule.name}' needs a lower-case prefix.")
+            self.fields.setdefault(rule.field, []).append((priority, rule))
+
+    @staticmethod
+    def _candidate(rule: Rule, text: str, lowered: Optional[str], position: int) -> int:
+        """The next position at or after ``position`` where ``rule`` may match, or -1."""
+        if rule.prefix and lowered is not None:
+            return lowered.find(rule.prefix, position)
+        match = rule.regex.search(text, position)
+        return match.start() if match else -1
+
+    def scan(self, text: str, fields: Optional[Iterable[str]] = None) -> Dict[str, FieldMatch]:
+        """
+        Scan ``text`` once and return the match of each field found.
+
+        Parameters
+        ----------
+        text : str
+            Text to scan, typically a page source or a notes block.
+        fields : Iterable[str], optional
+            Only look for these fields.  Defaults to all of them.
+        """
+        text = text or ""
+        wanted = [field for field in (fields or self.fields) if field in self.fields]
+        lowered = _lowered(text) if any(rule.prefix for rule in self.rules) else None
+        # One entry per rule still looking for its first match, ordered
+        # by the position of its next candidate, then by priority.
+        heap = []
+        for field in wanted:
+            for priority, rule in self.fields[field]:
+                position = self._candidate(rule, text, lowered, 0)
+                if position >= 0:
+                    heap.append((position, priority, rule))
+        heapq.heapify(heap)
+        best: Dict[str, Tuple[int, FieldMatch]] = {}
+        while heap:
+            position, priority, rule = heapq.heappop(heap)
+            if rule.field in best and best[rule.field][0] < priority:
+                continue
+            match = rule.regex.match(text, position)
+            value = rule.extract(match) if match else None
+            if value is not None:
+                # A rule's first match is the one reported, and it beats
+                # every later-starting rule of lower priority.
+                best[rule.field] = (priority, FieldMatch(rule.field, value, rule.name, position))
+                continue
+            position = self._candidate(rule, text, lowered, position + 1)
+            if position >= 0:
+                heapq.heappush(heap, (position, priority, rule))
+        return {field: match for field, (_, match) in best.items()}
+
+    def first(self, text: str, field: str) -> Optional[FieldMatch]:
+        """Scan for one field only."""
+        return self.scan(text, [field]).get(field)
+
+
+@functools.lru_cache(maxsize=None)
+def _scanner(rules: Tuple[Rule, ...]) -> FieldScanner:
+    return FieldScanner(rules)
+
+
+def scanner(rules: Sequence[Rule]) -> FieldScanner:
+    """Return the (cached) compiled scanner for a rule list."""
+    return _scanner(tuple(rules))
+
+
+# -- Rules ---------------------------------------------------------------
+
+def _case_pack_line(match: "re.Match[str]") -> Optional[str]:
+    """Case pack from a notes line such as ``CASE PACK: 12``."""
+    for line in match.group(0).splitlines():
+        if "case pack" not in line.lower():
+            continue
+        # Prefer the digits after the first colon; some notes use other
+        # punctuation, so fall back to every digit on the line.
+        parts = line.split(":")
+        if len(parts) >= 2:
+            digits = "".join(ch for ch in parts[1].strip() if ch.isdigit())
+            if digits:
+                return digits
+        digits = "".join(ch for ch in line if ch.isdigit())
+        if digits:
+            return digits
+    return None
+
+
+CASE_PACK_LINE = Rule("case", "CASE PACK line", r"^.*case pack.*$", re.IGNORECASE | re.MULTILINE, _case_pack_line)
+
+CASE_PACK = Rule("case", "case pack", r"case\s*pack[:\s]*(\d+)", prefix="case")
+CASE_QUANTITY = Rule("case", "case quantity", r"case\s*quantity[:\s]*(\d+)", prefix="case")
+CASE_WORD = Rule("case", "case", r"case[:\s]*(\d+)", prefix="case")
+PACK_WORD = Rule("case", "pack", r"pack[:\s]*(\d+)", prefix="pack")
+QTY_WORD = Rule("case", "qty", r"qty[:\s]*(\d+)", prefix="qty")
+
+C_SLASH = Rule("case", "C/NN", r"C/(\d+)", prefix="c/")
+CASE_OF = Rule("case", "Case of", r"Case of (\d+)", prefix="case of")
+PACK_OF = Rule("case", "Pack of", r"Pack of (\d+)", prefix="pack of")
+PER_CASE = Rule("case", "per case", r"(\d+) per case")
+QUANTITY_LABEL = Rule("case", "Quantity", r"Quantity[:\s]*(\d+)", prefix="quantity")
+QTY_LABEL = Rule("case", "Qty", r"Qty[:\s]+(\d+)", prefix="qty")
+
+PRICE_DOLLARS = Rule("price", "$N.NN", r"\$(\d+\.\d{2})", 0, prefix="$")
+PRICE_LABEL = Rule("price", "Price: $N.NN", r"Price[:\s]*\$(\d+\.\d{2})", 0, prefix="price")
+WHOLESALE_LABEL = Rule("price", "Wholesale: $N.NN", r"Wholesale[:\s]*\$(\d+\.\d{2})", 0, prefix="wholesale")
+
+# Rule lists per caller, highest priority first.
+NOTES_RULES = [CASE_PACK_LINE]
+PAGE_CASE_RULES = [CASE_PACK, CASE_QUANTITY, CASE_WORD, PACK_WORD, QTY_WORD]
+COMPREHENSIVE_RULES = [
+    C_SLASH, CASE_OF, PACK_OF, PER_CASE, QUANTITY_LABEL,
+    PRICE_DOLLARS, PRICE_LABEL, WHOLESALE_LABEL,
+]
+BATCH2_RULES = [C_SLASH, CASE_OF, PACK_OF, QTY_LABEL]
@@ -8,33 +8,56 @@ import os
 import sys
 import csv
 import time
-import shutil
-import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+
+from browser_host import apply_chrome_binary, attach_driver, chromedriver_service
+from driver_recycling import RecyclingDriver
+from field_rules import PAGE_CASE_RULES, scanner
+from item_keys import stream_items
+from product_cache import ProductCache
+from readiness import timings, use_eager_loading, wait_until_ready
+from request_blocking import PRESETS, BlockingTotal, enable_network_log, install as install_blocking
+from request_blocking import collect as collect_blocking
+from result_sinks import open_sink, sink_type
+from run_journal import RunJournal, journal_path
+from selector_stats import selector_registry
+from session_store import restore_or_login
+
+RESULT_COLUMNS = ['Item Number', 'Product Name', 'Unit Price', 'Case Quantity', 'Status']
 
 LOGIN_URLS = [
     "https://www.pacificgiftware.com/pages/login"
 ]
 
-def _first_present(driver, selectors, timeout=15):
+def _first_present(driver, selectors, timeout=15, page=None):
+    """Poll for the first selector that matches; with ``page``, try the usual winner first."""
+    from selenium.common.exceptions import TimeoutException, NoSuchElementException
+    
+    stats = selector_registry() if page else None
+    if stats:
+        selectors = stats.order(page, selectors)
     end = time.time() + timeout
     last_err = None
     while time.time() < end:
-        for how, sel in selectors:
+        for i, (how, sel) in enumerate(selectors):
             try:
-                return driver.find_element(how, sel)
+                element = driver.find_element(how, sel)
             except NoSuchElementException as e:
                 last_err = e
+                continue
+            if stats:
+                stats.record(page, selectors[:i], selectors[i])
+            return element
         time.sleep(0.25)
+    if stats:
+        stats.record(page, selectors)
     raise last_err or TimeoutException("Elements not found")
 
 def login(driver, email=None, password=None, wait=20):
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+    
     email = email or os.environ.get("PACIFIC_EMAIL")
     password = password or os.environ.get("PACIFIC_PASSWORD")
     if not email or not password:
@@ -66,7 +89,7 @@ def login(driver, email=None, password=None, wait=20):
         (By.CSS_SELECTOR, 'input[type="email"]'),
         (By.CSS_SELECTOR, 'input[name="email"]'),
         (By.ID, 'email'),
-    ], timeout=10)
+    ], timeout=10, page="login.email")
 
     # Find password field
     pw_el = _first_present(driver, [
@@ -74,7 +97,7 @@ def login(driver, email=None, password=None, wait=20):
         (By.CSS_SELECTOR, 'input[type="password"]'),
         (By.CSS_SELECTOR, 'input[name="password"]'),
         (By.ID, 'password'),
-    ], timeout=10)
+    ], timeout=10, page="login.password")
 
     email_el.clear(); email_el.send_keys(email)
     pw_el.clear(); pw_el.send_keys(password)
@@ -84,7 +107,7 @@ def login(driver, email=None, password=None, wait=20):
             (By.CSS_SELECTOR, 'button[type="submit"]'),
             (By.XPATH, "//button[contains(translate(., 'LOGIN', 'login'),'login') or contains(translate(., 'SIGN IN','sign in'),'sign in')]"),
             (By.CSS_SELECTOR, 'input[type="submit"]'),
-        ], timeout=5)
+        ], timeout=5, page="login.submit")
         submit.click()
     except Exception:
         pw_el.submit()
@@ -101,43 +124,121 @@ def login(driver, email=None, password=None, wait=20):
     except TimeoutException:
         return False
 
-def build_driver():
+def build_driver(block=None, attach=False):
+    """
+    Start headless Chrome; `block` names a request_blocking preset and
+    `attach` connects to the browser_host browser instead of launching one
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    
     opts = Options()
     opts.add_argument("--headless=new")
     opts.add_argument("--no-sandbox")
     opts.add_argument("--disable-dev-shm-usage")
     opts.add_argument("--disable-gpu")
     opts.add_argument("--window-size=1280,960")
+    use_eager_loading(opts)
+    if block and block != "none":
+        enable_network_log(opts)
     
-    # Try different Chrome binary locations for Replit environment
-    chrome_paths = [
-        "/usr/bin/chromium-browser",
-        "/nix/store/qa9cnw4v5xkxyip6mb9kxqfq1z4x2dx1-chromium-138.0.7204.100/bin/chromium-browser"
-    ]
-    
-    for path in chrome_paths:
-        if os.path.exists(path):
-            opts.binary_location = path
-            break
-    
-    # Try different chromedriver paths
-    chromedriver_paths = [
-        shutil.which("chromedriver"),
-        "/usr/bin/chromedriver",
-        "/nix/store/8zj50jw4w0hby47167kqqsaqw4mm5bkd-chromedriver-unwrapped-138.0.7204.100/bin/chromedriver"
-    ]
-    
-    chromedriver_path = None
-    for path in chromedriver_paths:
-        if path and os.path.exists(path):
-            chromedriver_path = path
-            break
-    
-    if not chromedriver_path:
-        raise RuntimeError("ChromeDriver not found")
-    
-    svc = Service(chromedriver_path)
-    return webdriver.Chrome(service=svc, options=opts)
+    if attach:
+        # Reuse the long-lived browser; only capabilities such as the
+        # performance log apply, the launch arguments above do not.
+        driver = attach_driver(options=opts)
+    else:
+        # Cached lookup of the Chrome and ChromeDriver executables
+        apply_chrome_binary(opts)
+        driver = webdriver.Chrome(service=chromedriver_service(), options=opts)
+    if block and block != "none":
+        install_blocking(driver, block)
+    return driver
+
+# Selectors tried in order; the first element whose text qualifies wins
+NAME_XPATHS = [
+    "//h1",
+    "//h2",
+    "//*[@class='product-title']",
+    "//*[@class='product-name']",
+    "//title",
+    "//*[contains(@class, 'title')]"
+]
+
+CASE_XPATHS = [
+    "//*[contains(text(), 'CASE PACK')]",
+    "//*[contains(text(), 'Case Pack')]", 
+    "//*[contains(text(), 'case pack')]",
+    "//*[contains(text(), 'Pack:')]",
+    "//*[contains(text(), 'Quantity:')]"
+]
+
+PRICE_XPATHS = [
+    # Material-UI specific selectors (from testing)
+    "//h5[contains(@class, 'MuiTypography-h5') and contains(text(), '$')]",
+    "//*[contains(@class, 'MuiTypography-h5') and contains(text(), '$')]",
+    # Generic price selectors
+    "//*[contains(@class, 'price')]",
+    "//*[contains(@class, 'money')]", 
+    "//*[contains(@class, 'current-price')]",
+    "//*[contains(@class, 'product-price')]",
+    "//span[contains(text(), '$')]",
+    "//div[contains(text(), '$')]",
+    "//*[@data-testid='price']",
+    # Broad Material-UI typography containing $
+    "//*[contains(@class, 'MuiTypography-root') and contains(text(), '$')]"
+]
+
+# Evaluates every XPath group inside the page and returns the visible text
+# of each match, plus the title and page source, in one WebDriver call.
+# Looping find_elements/element.text from Python costs one round trip per
+# selector and per element (30-60 per item).
+EXTRACT_SCRIPT = """
+var groups = arguments[0];
+function visibleText(el) {
+    // Like WebElement.text: elements that are not rendered have no text
+    if (!el.getClientRects || !el.getClientRects().length) return '';
+    return el.innerText || '';
+}
+function textsFor(xpath) {
+    try {
+        var found = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var texts = [];
+        for (var i = 0; i < found.snapshotLength; i++) texts.push(visibleText(found.snapshotItem(i)));
+        return texts;
+    } catch (e) {
+        return [];
+    }
+}
+var result = {title: document.title, source: document.documentElement.outerHTML};
+for (var key in groups) result[key] = groups[key].map(textsFor);
+return result;
+"""
+
+def _first_text(text_lists, accept):
+    """First text, in selector order, that passes `accept`"""
+    for texts in text_lists:
+        for text in texts:
+            if accept(text):
+                return text
+    return None
+
+def cached_result(item_number, product):
+    """Result row for an item from the product cache (or not in it)"""
+    if product is None:
+        return {
+            'Item Number': item_number,
+            'Product Name': 'Not found',
+            'Unit Price': 'Not found',
+            'Case Quantity': 'Not found',
+            'Status': 'Not cached'
+        }
+    return {
+        'Item Number': item_number,
+        'Product Name': product.name,
+        'Unit Price': product.price or 'Not found',
+        'Case Quantity': product.case_quantity or 'Not found',
+        'Status': 'Found'
+    }
 
 def scrape_product_enhanced(driver, item_number, logged_in=False):
     """Enhanced product scraping with better selectors"""
@@ -146,7 +247,10 @@ def scrape_product_enhanced(driver, item_number, logged_in=False):
     try:
         url = f"https://www.pacificgiftware.com/product/{item_number}"
         driver.get(url)
-        time.sleep(4)  # Wait for JavaScript to load
+        # Wait for the product card to render (never longer than the old fixed 4s).
+        # The case quantity comes from the notes either way, and the wait
+        # stops loading once it returns, so the notes must be in as well.
+        wait_until_ready(driver, ("title", "price", "notes") if logged_in else ("title", "notes"), timeout=4)
         
         result = {
             'Item Number': item_number,
@@ -156,11 +260,16 @@ def scrape_product_enhanced(driver, item_number, logged_in=False):
             'Status': 'Processing'
         }
         
-        # Get page source for analysis
-        page_source = driver.page_source
+        # Everything below works on this one snapshot of the page
+        page = driver.execute_script(EXTRACT_SCRIPT, {
+            'names': NAME_XPATHS,
+            'cases': CASE_XPATHS,
+            'prices': PRICE_XPATHS if logged_in else [],
+        })
+        page_source = page['source']
         
         # Extract product name from page title or meta tags first
-        title = driver.title
+        title = page['title']
         if title and title != "Loading..." and "pacific" in title.lower():
             # Clean up title
             clean_title = title.replace(" | Pacific Trading", "").strip()
@@ -169,102 +278,37 @@ def scrape_product_enhanced(driver, item_number, logged_in=False):
                 result['Status'] = 'Found'
         
         # Try to find product name in page content
-        name_xpath_selectors = [
-            "//h1",
-            "//h2",
-            "//*[@class='product-title']",
-            "//*[@class='product-name']",
-            "//title",
-            "//*[contains(@class, 'title')]"
-        ]
-        
-        for xpath in name_xpath_selectors:
-            try:
-                elements = driver.find_elements(By.XPATH, xpath)
-                for element in elements:
-                    text = element.text.strip()
-                    if text and len(text) > 5 and text != "Loading...":
-                        result['Product Name'] = text
-                        result['Status'] = 'Found'
-                        break
-                if result['Product Name'] != 'Not found':
-                    break
-            except:
-                continue
+        name = _first_text(
+            ([t.strip() for t in texts] for texts in page['names']),
+            lambda text: text and len(text) > 5 and text != "Loading...",
+        )
+        if name:
+            result['Product Name'] = name
+            result['Status'] = 'Found'
         
         # Extract case quantity using multiple methods
         import re
         
         # Method 1: Search in page source
-        case_patterns = [
-            r'case\s*pack[:\s]*(\d+)',
-            r'case\s*quantity[:\s]*(\d+)', 
-            r'case[:\s]*(\d+)',
-            r'pack[:\s]*(\d+)',
-            r'qty[:\s]*(\d+)'
-        ]
-        
-        for pattern in case_patterns:
-            matches = re.findall(pattern, page_source, re.IGNORECASE)
-            if matches:
-                result['Case Quantity'] = matches[0]
-                break
+        case = scanner(PAGE_CASE_RULES).first(page_source, 'case')
+        if case:
+            result['Case Quantity'] = case.value
         
         # Method 2: Look for specific elements
-        case_selectors = [
-            "//*[contains(text(), 'CASE PACK')]",
-            "//*[contains(text(), 'Case Pack')]", 
-            "//*[contains(text(), 'case pack')]",
-            "//*[contains(text(), 'Pack:')]",
-            "//*[contains(text(), 'Quantity:')]"
-        ]
-        
-        for selector in case_selectors:
-            try:
-                elements = driver.find_elements(By.XPATH, selector)
-                for element in elements:
-                    text = element.text
-                    numbers = re.findall(r'\d+', text)
-                    if numbers:
-                        result['Case Quantity'] = numbers[0]
-                        break
-                if result['Case Quantity'] != 'Not found':
-                    break
-            except:
-                continue
+        case_text = _first_text(page['cases'], lambda text: re.search(r'\d+', text))
+        if case_text:
+            result['Case Quantity'] = re.findall(r'\d+', case_text)[0]
         
         # Try to get price (improved selectors for logged-in users)
         if logged_in:
-            price_selectors = [
-                # Material-UI specific selectors (from testing)
-                "//h5[contains(@class, 'MuiTypography-h5') and contains(text(), '$')]",
-                "//*[contains(@class, 'MuiTypography-h5') and contains(text(), '$')]",
-                # Generic price selectors
-                "//*[contains(@class, 'price')]",
-                "//*[contains(@class, 'money')]", 
-                "//*[contains(@class, 'current-price')]",
-                "//*[contains(@class, 'product-price')]",
-                "//span[contains(text(), '$')]",
-                "//div[contains(text(), '$')]",
-                "//*[@data-testid='price']",
-                # Broad Material-UI typography containing $
-                "//*[contains(@class, 'MuiTypography-root') and contains(text(), '$')]"
-            ]
-            
-            for selector in price_selectors:
-                try:
-                    elements = driver.find_elements(By.XPATH, selector)
-                    for element in elements:
-                        text = element.text.strip()
-                        if '$' in text and len(text) < 30 and len(text) > 2:
-                            # Filter out navigation prices or other non-product prices
-                            if not any(word in text.lower() for word in ['cart', 'total', 'shipping', 'tax', 'free']):
-                                result['Unit Price'] = text
-                                break
-                    if result['Unit Price'] != 'Not found':
-                        break
-                except:
-                    continue
+            price = _first_text(
+                ([t.strip() for t in texts] for texts in page['prices']),
+                # Filter out navigation prices or other non-product prices
+                lambda text: '$' in text and 2 < len(text) < 30
+                and not any(word in text.lower() for word in ['cart', 'total', 'shipping', 'tax', 'free']),
+            )
+            if price:
+                result['Unit Price'] = price
         
         print(f"  Name: {result['Product Name']}")
         print(f"  Price: {result['Unit Price']}")
@@ -284,12 +328,33 @@ def scrape_product_enhanced(driver, item_number, logged_in=False):
 
 def main():
     """Main function"""
-    if len(sys.argv) != 3:
-        print("Usage: python final_scraper.py input.csv output.csv")
-        return
+    import argparse
     
-    input_file = sys.argv[1]
-    output_file = sys.argv[2]
+    parser = argparse.ArgumentParser(description="Final Pacific Giftware Scraper")
+    parser.add_argument("input", help="Input CSV with item numbers in the first column")
+    parser.add_argument("output", help="Output CSV")
+    parser.add_argument("--block", choices=list(PRESETS), default="none",
+                        help="Block images, fonts, media and trackers (default: none)")
+    parser.add_argument("--attach", action="store_true",
+                        help="Use the long-lived browser from browser_host.py")
+    parser.add_argument("--recycle-pages", type=int, default=500,
+                        help="Restart the browser after this many pages, 0 to never (default: 500)")
+    parser.add_argument("--recycle-mb", type=float, default=1500,
+                        help="Restart the browser above this much memory in MiB, 0 to never (default: 1500)")
+    parser.add_argument("--cache-hours", type=float, default=24,
+                        help="Reuse products scraped within this many hours, 0 to re-scrape all (default: 24)")
+    parser.add_argument("--cache-only", action="store_true",
+                        help="Don't open a browser; report cached products only")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted run, skipping the items it already finished")
+    args = parser.parse_args()
+    try:
+        sink_type(args.output)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    input_file = args.input
+    output_file = args.output
     
     print("Final Pacific Giftware Scraper")
     print("=" * 40)
@@ -305,42 +370,107 @@ def main():
     
     print(f"Processing {len(items)} items")
     
-    driver = build_driver()
+    # Products scraped recently (by any of the scrapers) are reused.
+    # Rows that repeat an item share its cache entry
+    plan, keys = stream_items(items)
+    unique = list(keys)
+    cache = ProductCache(max_age_hours=None if args.cache_only else args.cache_hours)
+    hits = cache.lookup(unique)
+    cached = {row: hits[unique[code]] for row, code in zip(plan.rows, plan.codes) if unique[code] in hits}
+    print(f"{len(hits)} of {len(unique)} distinct items cached")
+    if args.cache_only or len(hits) == len(unique):
+        with open_sink(output_file, RESULT_COLUMNS) as sink:
+            sink.write_many(cached_result(item, cached.get(item)) for item in items)
+        print(f"\n✓ Cached results saved to: {output_file}")
+        print(cache.report())
+        cache.close()
+        return
+    
+    # Every scraped item is journaled as soon as it is done, so an
+    # interrupted run can pick up where it stopped
+    journal = RunJournal(journal_path(output_file), resume=args.resume)
+    journaled = journal.completed()
+    if args.resume:
+        print(f"{len(journaled)} items already done in {journal.path}")
     
-    # Attempt login before scraping
     login_success = False
-    try:
-        login_success = login(driver)
-        if login_success:
-            print("✓ Login successful - prices will be available")
-        else:
-            print("⚠ Login failed - prices will show 'Login required'")
-    except Exception as e:
-        print(f"⚠ Login error: {e} - prices will show 'Login required'")
+
+    def new_session():
+        # Attempt login before scraping, reusing the saved session if valid
+        nonlocal login_success
+        driver = build_driver(block=args.block, attach=args.attach)
+        try:
+            login_success = restore_or_login(driver, lambda: login(driver))
+            if login_success:
+                print("✓ Login successful - prices will be available")
+            else:
+                print("⚠ Login failed - prices will show 'Login required'")
+        except Exception as e:
+            login_success = False
+            print(f"⚠ Login error: {e} - prices will show 'Login required'")
+        return driver
+    
+    # Restarts the browser (logging in again) once it has served too many
+    # pages or grown too large, so long runs don't slow down
+    # Blocking statistics are added up as each browser quits
+    blocking = BlockingTotal()
+    browser = RecyclingDriver(new_session, max_pages=args.recycle_pages, max_rss_mb=args.recycle_mb or None,
+                              on_quit=blocking.add)
+    browser.driver  # start and log in before the first item
+    
+    # Rows are written as they come; the output file appears when complete
+    sink = open_sink(output_file, RESULT_COLUMNS)
+    found = case_found = 0
+    
+    def scrape(driver, item):
+        result = scrape_product_enhanced(driver, item, login_success)
+        collect_blocking(driver)
+        return result
     
     try:
-        results = []
         for i, item in enumerate(items, 1):
             print(f"\nItem {i}/{len(items)}: {item}")
-            result = scrape_product_enhanced(driver, item, login_success)
-            results.append(result)
+            if item in cached:
+                print("  (cached)")
+                result = cached_result(item, cached[item])
+            elif item in journaled:
+                print("  (done in an earlier run)")
+                result = journaled[item]
+            else:
+                result = browser.run(lambda driver: scrape(driver, item))
+                journal.record(item, result, ok=result['Status'] == 'Found')
+                # The cache keeps only results that have a price
+                if result['Status'] == 'Found':
+                    cache.put(item, result['Product Name'], result['Unit Price'], result['Case Quantity'],
+                              f"https://www.pacificgiftware.com/product/{item}")
+            sink.write(result)
+            found += result['Status'] == 'Found'
+            case_found += result['Case Quantity'] != 'Not found'
         
         # Save results
-        df = pd.DataFrame(results)
-        df.to_csv(output_file, index=False)
+        sink.close()
         
         print(f"\n✓ Final results saved to: {output_file}")
         
         # Summary
-        found = len([r for r in results if r['Status'] == 'Found'])
-        case_found = len([r for r in results if r['Case Quantity'] != 'Not found'])
-        
         print(f"\nSummary:")
-        print(f"Products found: {found}/{len(results)}")
-        print(f"Case quantities found: {case_found}/{len(results)}")
+        print(f"Products found: {found}/{sink.rows}")
+        print(f"Case quantities found: {case_found}/{sink.rows}")
+        print(f"Page waits:\n{timings.report()}")
+        print(cache.report())
+        print(browser.report())
+        browser.quit()
+        if blocking.report() is not None:
+            print(blocking.report())
         
+    except KeyboardInterrupt:
+        print("\n" + journal.resume_hint())
+        sys.exit(130)
     finally:
-        driver.quit()
+        sink.abort()
+        journal.close()
+        browser.quit()
+        cache.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,414 @@
+"""
+http_handoff.py
+---------------
+
+Log in once with Selenium, then scrape product pages over plain HTTP.
+
+The Selenium scrapers pay the full browser render cost for every SKU,
+while :func:`simple_scraper.scrape_product_basic` is fast but anonymous
+and therefore never sees prices.  This module combines the two: the
+login happens in a real browser (or is skipped entirely when
+:mod:`session_store` has a saved session), the resulting cookies and
+browser headers are copied into a pooled :class:`requests.Session`,
+and every product page after that is a single keep-alive HTTP request
+parsed with :func:`pacificgiftware_scraper.parse_product_html`.
+
+The browser is only started again when the site stops accepting the
+cookies (a redirect to the login page or a 401/403 response).  At that
+point :class:`HandoffScraper` logs in afresh, saves the new session and
+retries the request once.
+
+This only works while the product pages' HTML carries the product.
+Where the site renders them client-side, the HTTP response is the
+"Loading..." shell with no name and no price.  The shell also comes
+back, with a 200, once the session has expired, so it cannot be read
+as "not found".  :class:`HandoffScraper` stops fetching over HTTP at
+the first shell page and hands that item and every item after it to
+the ``fallback`` given to :meth:`HandoffScraper.scrape`, normally the
+browser scrapers.  Without a fallback it raises
+:class:`ClientRenderedPage` rather than writing a row of empty fields
+for every item.
+
+With a :class:`product_cache.ProductCache`, pages fetched before are
+requested conditionally, and a ``304 Not Modified`` reuses the result
+parsed last time.
+
+Example
+-------
+::
+
+    from http_handoff import HandoffScraper
+
+    scraper = HandoffScraper(credentials=lambda: ("me@example.com", "secret"))
+    products = scraper.scrape(["12238", "11358"], workers=4)
+
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from pacificgiftware_scraper import ProductInfo, login, parse_product_html, start_driver
+from session_store import DEFAULT_SESSION_FILE, read_session, restore_or_login, save_session
+
+PRODUCT_URL = "https://www.pacificgiftware.com/product/{}"
+
+# Logged-in ProductInfo results, as stored with their pages' validators.
+PAGE_KIND = "product"
+
+# Used when the session file predates user-agent capture.
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36"
+)
+
+
+class SessionExpired(Exception):
+    """Raised when the site rejects a freshly handed-off session."""
+
+
+class ClientRenderedPage(Exception):
+    """Raised when a product page's HTML is only the JavaScript shell."""
+
+
+def build_http_session(
+    cookies: Iterable[Dict[str, Any]],
+    user_agent: Optional[str] = None,
+    pool_size: int = 10,
+) -> requests.Session:
+    """
+    Build a pooled ``requests.Session`` carrying browser cookies.
+
+    Parameters
+    ----------
+    cookies : Iterable[Dict[str, Any]]
+        Cookies in the format returned by Selenium's ``get_cookies``.
+    user_agent : str, optional
+        User-Agent of the browser the cookies came from.  Some session
+        checks are tied to it, so it should match when known.
+    pool_size : int, optional
+        Maximum number of keep-alive connections kept per host; set it
+        to at least the number of threads sharing the session.
+
+    Returns
+    -------
+    requests.Session
+        A session ready to fetch authenticated pages.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=2)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "User-Agent": user_agent or DEFAULT_USER_AGENT,
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "en-US,en;q=0.9",
+    })
+    for cookie in cookies:
+        session.cookies.set(
+            cookie["name"],
+            cookie["value"],
+            domain=cookie.get("domain"),
+            path=cookie.get("path", "/"),
+            secure=cookie.get("secure", False),
+        )
+    return session
+
+
+def session_from_driver(driver: Any, pool_size: int = 10) -> requests.Session:
+    """Copy the cookies and User-Agent of a live driver into a session."""
+    return build_http_session(
+        driver.get_cookies(),
+        user_agent=driver.execute_script("return navigator.userAgent;"),
+        pool_size=pool_size,
+    )
+
+
+def session_from_file(path: str = DEFAULT_SESSION_FILE, pool_size: int = 10) -> Optional[requests.Session]:
+    """
+    Build a session from a saved :mod:`session_store` file.
+
+    Returns ``None`` when no usable session file exists.  No browser is
+    involved, so this is the zero-cost start for a warm run.
+    """
+    state = read_session(path)
+    if not state or not state.get("cookies"):
+        return None
+    return build_http_session(state["cookies"], user_agent=state.get("user_agent"), pool_size=pool_size)
+
+
+def browser_login_session(
+    credentials: Callable[[], Tuple[str, str]],
+    headless: bool = True,
+    session_file: str = DEFAULT_SESSION_FILE,
+    pool_size: int = 10,
+    force: bool = False,
+) -> requests.Session:
+    """
+    Log in with a temporary browser and hand the session off to HTTP.
+
+    Parameters
+    ----------
+    credentials : Callable[[], Tuple[str, str]]
+        Returns ``(email, password)`` when the form login is needed.
+    headless : bool, optional
+        Run the browser without a GUI.
+    session_file : str, optional
+        Location of the saved :mod:`session_store` session, which is
+        updated after a form login.
+    pool_size : int, optional
+        Connection pool size of the returned session.
+    force : bool, optional
+        Skip the saved session and always fill in the login form, for
+        when its cookies were just rejected.
+    """
+    driver = start_driver(headless=headless)
+    try:
+        form_login = lambda: login(driver, *credentials())  # noqa: E731
+        if force:
+            form_login()
+            save_session(driver, session_file)
+        else:
+            restore_or_login(driver, form_login, session_file)
+        return session_from_driver(driver, pool_size)
+    finally:
+        driver.quit()
+
+
+def is_logged_out(response: requests.Response) -> bool:
+    """Return ``True`` if ``response`` shows the session is no longer valid."""
+    if response.status_code in (401, 403):
+        return True
+    return "login" in urlparse(response.url).path.lower()
+
+
+def page_has_product(result: Dict[str, Any]) -> bool:
+    """``True`` if a parsed page result has the product's name and price."""
+    return bool(result.get("product_name")) and result.get("unit_price") is not None
+
+
+class HandoffScraper:
+    """
+    Scrape authenticated product pages over HTTP, using Selenium only
+    to obtain or renew the login.
+
+    Parameters
+    ----------
+    credentials : Callable[[], Tuple[str, str]]
+        Returns ``(email, password)``.  Only called when a browser login
+        is actually needed.
+    headless : bool, optional
+        Run the browser without a GUI when it has to be started.
+    session_file : str, optional
+        Location of the saved :mod:`session_store` session.
+    pool_size : int, optional
+        Connection pool size of the HTTP session.
+    timeout : float, optional
+        Per-request timeout in seconds.
+    parse_pool : parse_pool.ParsePool, optional
+        Parse pages in this process pool rather than in the fetching
+        thread, so several threads' parsing runs on several cores.
+    parser : str, optional
+        Extraction backend (see :mod:`product_parsers`).
+    cache : product_cache.ProductCache, optional
+        Revalidate pages fetched before with ``If-None-Match`` /
+        ``If-Modified-Since`` and reuse the stored result on a 304.
+    """
+
+    def __init__(
+        self,
+        credentials: Callable[[], Tuple[str, str]],
+        headless: bool = True,
+        session_file: str = DEFAULT_SESSION_FILE,
+        pool_size: int = 10,
+        timeout: float = 15,
+        parse_pool: Optional[Any] = None,
+        parser: str = "html.parser",
+        cache: Optional[Any] = None,
+    ) -> None:
+        self.credentials = credentials
+        self.headless = headless
+        self.session_file = session_file
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.parse_pool = parse_pool
+        self.parser = parser
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._generation = 0
+        # Set at the first page whose HTML is only the app shell.
+        self.client_rendered = False
+        self.session: Optional[requests.Session] = session_from_file(session_file, pool_size)
+
+    def _browser_login(self, force: bool) -> None:
+        """Log in with Selenium and replace the HTTP session."""
+        # After a rejection (``force``) the saved cookies must not be
+        # reused, even if the browser probe would accept them.
+        self.session = browser_login_session(
+            self.credentials, self.headless, self.session_file, self.pool_size, force=force
+        )
+        self._generation += 1
+
+    def _current(self) -> Tuple[requests.Session, int]:
+        """Return the active session, logging in if there is none yet."""
+        with self._lock:
+            if self.session is None:
+                print("No saved session; logging in with the browser...")
+                self._browser_login(force=False)
+            return self.session, self._generation  # type: ignore[return-value]
+
+    def _renew(self, seen_generation: int) -> None:
+        """Log in again unless another thread already did so."""
+        with self._lock:
+            if self._generation == seen_generation:
+                print("Session expired; logging in again with the browser...")
+                self._browser_login(force=True)
+
+    def _get(self, url: str, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """GET ``url`` with the login session, renewing it once if rejected."""
+        for attempt in range(2):
+            session, generation = self._current()
+            response = session.get(url, headers=headers, timeout=self.timeout)
+            if not is_logged_out(response):
+                response.raise_for_status()
+                return response
+            if attempt == 0:
+                self._renew(generation)
+        raise SessionExpired(f"Login was not accepted for {url}")
+
+    def fetch_html(self, item_number: str) -> str:
+        """
+        Fetch the product page for ``item_number`` over HTTP.
+
+        Raises
+        ------
+        SessionExpired
+            If the page still requires a login after renewing the
+            session once.
+        requests.RequestException
+            On network errors or unexpected HTTP status codes.
+        """
+        return self._get(PRODUCT_URL.format(item_number)).text
+
+    def get_product_details(self, item_number: str) -> ProductInfo:
+        """
+        Fetch and parse one product page, or reuse it if unchanged.
+
+        A page is only revalidated when its stored result has a name
+        and a price.  Only then did the HTML itself carry the product
+        data that its ``ETag`` / ``Last-Modified`` describe; a shell page
+        whose price arrives by XHR can answer 304 while the price
+        changes.
+
+        Raises
+        ------
+        ClientRenderedPage
+            If the HTML has neither a product name nor a price, i.e. the
+            page is rendered in the browser and HTTP cannot read it.
+        """
+        url = PRODUCT_URL.format(item_number)
+        page = self.cache.page(url, PAGE_KIND) if self.cache is not None else None
+        if page is not None and not page_has_product(page.result):
+            page = None
+        response = self._get(url, page.headers() if page is not None else None)
+        if response.status_code == 304 and page is not None:
+            self.cache.touch_page(url, PAGE_KIND)
+            return ProductInfo(**page.result)
+        if self.parse_pool is not None:
+            info = self.parse_pool.parse(response.text, item_number)
+        else:
+            info = parse_product_html(response.text, item_number, self.parser)
+        if not info.product_name and info.unit_price is None:
+            raise ClientRenderedPage(
+                f"{url} has no product data in its HTML; the page is rendered in the browser, "
+                "so it cannot be scraped over HTTP"
+            )
+        if self.cache is not None and page_has_product(asdict(info)):
+            self.cache.put_page(url, PAGE_KIND, response.headers, asdict(info))
+        return info
+
+    def _scrape_one(self, item_number: str) -> Optional[ProductInfo]:
+        """Scrape one item over HTTP; ``None`` once pages turn out to be client-rendered."""
+        if self.client_rendered:
+            return None
+        print(f"Processing item {item_number}...")
+        try:
+            return self.get_product_details(item_number)
+        except ClientRenderedPage as exc:
+            # Every other item would come back empty too.
+            if not self.client_rendered:
+                self.client_rendered = True
+                print(f"{exc}; no further pages are fetched over HTTP.")
+            return None
+        except Exception as exc:
+            print(f"Failed to process item {item_number}: {exc}")
+            return ProductInfo(item_number=item_number, product_name="", unit_price=None, case_quantity=None)
+
+    def scrape(
+        self,
+        item_numbers: List[str],
+        workers: int = 1,
+        on_result: Optional[Callable[[str, ProductInfo], None]] = None,
+        fallback: Optional[Callable[[List[str]], List[ProductInfo]]] = None,
+    ) -> List[ProductInfo]:
+        """
+        Scrape every item and return the results in input order.
+
+        Parameters
+        ----------
+        item_numbers : List[str]
+            Item numbers to scrape.
+        workers : int, optional
+            Number of threads sharing the pooled session.
+        on_result : Callable[[str, ProductInfo], None], optional
+            Called as each item finishes, from the thread that scraped
+            it, e.g. to journal it (see :mod:`run_journal`).
+        fallback : Callable[[List[str]], List[ProductInfo]], optional
+            Scrapes, in order, the items HTTP could not read because
+            their pages are rendered in the browser.  ``on_result`` is
+            called for its results as well.
+
+        Raises
+        ------
+        ClientRenderedPage
+            If a page is rendered in the browser and there is no
+            ``fallback``.
+        """
+        def scrape_one(item: str) -> Optional[ProductInfo]:
+            info = self._scrape_one(item)
+            if info is not None and on_result is not None:
+                on_result(item, info)
+            return info
+
+        # Make sure the login happens once, up front, rather than in
+        # whichever worker thread happens to run first.
+        self._current()
+        if workers <= 1:
+            results = [scrape_one(item) for item in item_numbers]
+        else:
+            executor = ThreadPoolExecutor(max_workers=workers)
+            try:
+                results = list(executor.map(scrape_one, item_numbers))
+            finally:
+                # On Ctrl+C, drop the queued items instead of waiting for them.
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        left = [index for index, info in enumerate(results) if info is None]
+        if left:
+            if fallback is None:
+                raise ClientRenderedPage(
+                    f"{len(left)} product page(s) are rendered in the browser and cannot be scraped over HTTP"
+                )
+            print(f"Scraping {len(left)} item(s) in the browser instead...")
+            for index, info in zip(left, fallback([item_numbers[index] for index in left])):
+                results[index] = info
+                if on_result is not None:
+                    on_result(item_numbers[index], info)
+        return results  # type: ignore[return-value]
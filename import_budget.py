@@ -0,0 +1,170 @@
+"""
+import_budget.py
+----------------
+
+Guard how long the command line tools take to start.
+
+Heavy libraries (``pandas``, ``bs4``, ``selenium``, ...) are imported
+inside the functions that need them, so ``--help``, cache lookups and
+CSV-only runs start quickly.  A single top-level import can silently
+undo that.  This module imports each entry point in a fresh interpreter
+with ``python -X importtime`` and parses the timings it prints.  An
+entry point fails the check when it:
+
+* takes longer than its budget in ``BUDGETS_MS`` (cumulative time of
+  the module's own import, best of ``runs``), or
+* pulls in any of the ``HEAVY`` packages.
+
+Run it before committing changes to imports::
+
+    python import_budget.py            # every entry point in BUDGETS_MS
+    python import_budget.py final_scraper --top 15
+
+It exits with status 1 when a check fails, so it can gate CI.
+
+Example
+-------
+::
+
+    from import_budget import measure
+
+    timings = measure("product_cache")
+    print(timings["product_cache"].cumulative_ms)
+
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+# Packages that must not load when an entry point is merely imported.
+HEAVY = ("pandas", "numpy", "bs4", "lxml", "selenium", "openpyxl", "xlsxwriter", "requests", "aiohttp")
+
+# Cumulative import time allowed per entry point, in milliseconds.
+BUDGETS_MS: Dict[str, float] = {
+    "pacific_cli": 20,
+    "pacificgiftware_scraper": 60,
+    "final_scraper": 80,
+    "comprehensive_filler": 80,
+    "product_cache": 40,
+    "url_index": 40,
+    "verify_items": 40,
+}
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)\s*$")
+
+
+@dataclass
+class ImportTiming:
+    """One line of ``-X importtime`` output."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+    @property
+    def cumulative_ms(self) -> float:
+        return self.cumulative_us / 1000
+
+
+def parse_importtime(stderr: str) -> Dict[str, ImportTiming]:
+    """Parse ``-X importtime`` output into timings by module name."""
+    timings: Dict[str, ImportTiming] = {}
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            timings[module] = ImportTiming(module, int(self_us), int(cumulative_us), len(indent) // 2)
+    return timings
+
+
+def measure(module: str, runs: int = 3) -> Dict[str, ImportTiming]:
+    """
+    Import ``module`` in ``runs`` fresh interpreters; keep the fastest.
+
+    Raises
+    ------
+    ImportError
+        If the module cannot be imported.
+    """
+    best: Optional[Dict[str, ImportTiming]] = None
+    for _ in range(max(1, runs)):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            raise ImportError(f"import {module} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+        timings = parse_importtime(proc.stderr)
+        if best is None or timings[module].cumulative_us < best[module].cumulative_us:
+            best = timings
+    return best  # type: ignore[return-value]
+
+
+def check(module: str, budget_ms: Optional[float], timings: Dict[str, ImportTiming]) -> List[str]:
+    """Return the problems found in the timings of ``module``."""
+    problems = []
+    heavy = sorted(name for name in timings if name in HEAVY)
+    if heavy:
+        problems.append(f"{module} imports {', '.join(heavy)}")
+    took = timings[module].cumulative_ms
+    if budget_ms is not None and took > budget_ms:
+        problems.append(f"{module} takes {took:.1f} ms to import (budget {budget_ms:g} ms)")
+    return problems
+
+
+def report(module: str, timings: Dict[str, ImportTiming], top: int) -> str:
+    """The ``top`` slowest imports under ``module``, by their own time."""
+    # Children are printed before their parent, indented deeper.
+    ordered = list(timings.values())
+    end = ordered.index(timings[module])
+    start = end
+    while start > 0 and ordered[start - 1].depth > timings[module].depth:
+        start -= 1
+    slowest = sorted(ordered[start:end + 1], key=lambda t: t.self_us, reverse=True)[:top]
+    lines = [f"{module}: {timings[module].cumulative_ms:.1f} ms"]
+    lines += [f"  {t.self_us / 1000:7.1f} ms  {t.module}" for t in slowest]
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check the import time of the command line entry points.")
+    parser.add_argument("modules", nargs="*", help="Modules to check (default: all with a budget).")
+    parser.add_argument("--budget-ms", type=float, help="Budget for every module, overriding the defaults.")
+    parser.add_argument("--runs", type=int, default=3, help="Interpreters started per module (default: 3).")
+    parser.add_argument("--top", type=int, default=0, help="Also list the N slowest imports of each module.")
+    args = parser.parse_args(argv)
+
+    problems = []
+    for module in args.modules or list(BUDGETS_MS):
+        try:
+            timings = measure(module, args.runs)
+        except ImportError as exc:
+            problems.append(str(exc))
+            continue
+        budget = args.budget_ms if args.budget_ms is not None else BUDGETS_MS.get(module)
+        found = check(module, budget, timings)
+        problems += found
+        status = "FAIL" if found else "ok"
+        limit = f" / {budget:g} ms" if budget is not None else ""
+        print(f"{status:4}  {module:<26} {timings[module].cumulative_ms:6.1f} ms{limit}")
+        if args.top:
+            print(report(module, timings, args.top))
+
+    for problem in problems:
+        print(f"  {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
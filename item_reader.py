@@ -0,0 +1,222 @@
+"""
+item_reader.py
+--------------
+
+Stream item numbers out of large CSV and Excel files.
+
+``read_item_numbers`` and the legacy scripts load the whole sheet with
+``pd.read_csv`` / ``pd.read_excel`` before the first page is scraped.
+On a 200k-row workbook that means a long wait and the whole sheet in
+memory.
+
+:func:`iter_item_numbers` reads instead in a stream: CSV files row
+by row with the standard ``csv`` module, so ``pandas`` is not even
+imported, and ``.xlsx`` files with ``openpyxl`` in read-only mode.
+Item numbers are yielded as soon as their rows are read.  Legacy
+``.xls`` files cannot be streamed and are still loaded in one go.
+
+The item column is picked from the header and a sample of the first
+rows (see :func:`detect_item_column`).  A header naming the item
+column is used first, then the column whose sampled values look most
+like item numbers.  Together with :func:`item_keys.stream_items` this
+lets a run start scraping while the input is still being read.
+
+Example
+-------
+::
+
+    from item_reader import iter_item_numbers
+
+    for item in iter_item_numbers("orders.xlsx"):
+        ...
+
+"""
+
+from __future__ import annotations
+
+import csv
+import itertools
+import os
+import re
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+# Header names that mark the item column, compared case-insensitively;
+# an exact match beats a substring match, then earlier names win.
+ITEM_COLUMNS = ["Item Number", "Item #", "Item#", "Item", "SKU", "Product Code", "Number"]
+
+# Rows read ahead to choose the item column.
+SAMPLE_ROWS = 100
+
+# Share of sampled values that must look like item numbers for a
+# column without a telling header to be chosen.
+MIN_ITEM_SHARE = 0.5
+
+_ITEM_LIKE = re.compile(r"^[Y#]?\s*\d+(\.0+)?$", re.IGNORECASE)
+
+CSV_EXTENSIONS = {".csv", ".txt"}
+EXCEL_EXTENSIONS = {".xls", ".xlsx"}
+
+
+def _cell(value: Any) -> str:
+    """A cell value as stripped text; whole-number floats lose their ``.0``."""
+    if value is None or (isinstance(value, float) and value != value):
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def detect_item_column(
+    header: Sequence[str],
+    sample: Sequence[Sequence[str]],
+    first_column_fallback: bool = False,
+) -> Optional[int]:
+    """
+    Return the index of the item column, or ``None`` if none fits.
+
+    Parameters
+    ----------
+    header : Sequence[str]
+        Column names.
+    sample : Sequence[Sequence[str]]
+        The first few rows, as text.
+    first_column_fallback : bool, optional
+        Fall back to the first column holding any value, rather than
+        ``None``, when neither the header nor the values decide.
+    """
+    names = [name.strip().lower() for name in header]
+    for exact in (True, False):
+        for wanted in ITEM_COLUMNS:
+            for index, name in enumerate(names):
+                if wanted.lower() == name if exact else wanted.lower() in name:
+                    return index
+
+    best, best_share = None, 0.0
+    for index in range(len(header)):
+        values = [row[index] for row in sample if index < len(row) and row[index]]
+        if values:
+            share = sum(1 for value in values if _ITEM_LIKE.match(value)) / len(values)
+            if share > best_share:
+                best, best_share = index, share
+    if best is not None and best_share >= MIN_ITEM_SHARE:
+        return best
+
+    if first_column_fallback:
+        for index, name in enumerate(header):
+            if not name.startswith("Unnamed:") or any(index < len(row) and row[index] for row in sample):
+                return index
+    return None
+
+
+def _csv_rows(path: str) -> Tuple[List[str], Iterator[Sequence[Any]]]:
+    def rows() -> Iterator[Sequence[Any]]:
+        # utf-8-sig drops the byte order mark Excel puts on CSV exports.
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            yield from csv.reader(f)
+
+    reader = rows()
+    first = next(reader, None)
+    if first is None:
+        return [], iter(())
+    header = [name.strip() or f"Unnamed: {index}" for index, name in enumerate(first)]
+    return header, reader
+
+
+def _xlsx_rows(path: str) -> Tuple[List[str], Iterator[Sequence[Any]]]:
+    import openpyxl
+
+    book = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    sheet_rows = book.worksheets[0].iter_rows(values_only=True)
+    try:
+        first = next(sheet_rows)
+    except StopIteration:
+        book.close()
+        return [], iter(())
+    header = [_cell(name) or f"Unnamed: {index}" for index, name in enumerate(first)]
+
+    def rows() -> Iterator[Sequence[Any]]:
+        try:
+            yield from sheet_rows
+        finally:
+            book.close()
+
+    return header, rows()
+
+
+def _xls_rows(path: str) -> Tuple[List[str], Iterator[Sequence[Any]]]:
+    import pandas as pd
+
+    df = pd.read_excel(path, dtype=str)
+    return [str(name) for name in df.columns], df.itertuples(index=False, name=None)
+
+
+def open_rows(path: str) -> Tuple[List[str], Iterator[Sequence[Any]]]:
+    """
+    Return the header of a CSV or Excel file and an iterator over its
+    remaining rows.  Cells are raw values; Excel rows may be shorter
+    than the header.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the file does not exist.
+    ValueError
+        If the file extension is not supported.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Input file '{path}' does not exist.")
+    ext = os.path.splitext(path)[1].lower()
+    if ext in CSV_EXTENSIONS:
+        return _csv_rows(path)
+    if ext == ".xlsx":
+        return _xlsx_rows(path)
+    if ext in EXCEL_EXTENSIONS:
+        return _xls_rows(path)
+    raise ValueError(f"Unsupported file extension '{ext}'. Please provide a CSV or Excel file.")
+
+
+def iter_item_numbers(
+    path: str,
+    column: Optional[str] = None,
+    first_column_fallback: bool = False,
+) -> Iterator[str]:
+    """
+    Yield the non-blank item numbers of ``path`` as they are read.
+
+    Parameters
+    ----------
+    path : str
+        CSV or Excel file with a header row.
+    column : str, optional
+        Name of the item column; detected with
+        :func:`detect_item_column` when not given.
+    first_column_fallback : bool, optional
+        Use the first column when detection finds no item column.
+
+    Raises
+    ------
+    ValueError
+        If ``column`` is not in the header, or no item column is found.
+        Raised when iteration starts.
+    """
+    header, rows = open_rows(path)
+    if not header:
+        return
+    if column is not None:
+        if column not in header:
+            raise ValueError(f"Column '{column}' not found. Available columns: {header}")
+        index = header.index(column)
+        print(f"Using column '{column}' for item numbers")
+    else:
+        sample = list(itertools.islice(rows, SAMPLE_ROWS))
+        rows = itertools.chain(sample, rows)
+        text = [[_cell(value) for value in row] for row in sample]
+        index = detect_item_column(header, text, first_column_fallback)
+        if index is None:
+            raise ValueError(f"Could not find item number column. Available columns: {header}")
+        print(f"Using column '{header[index]}' for item numbers")
+    for row in rows:
+        if index < len(row):
+            item = _cell(row[index])
+            if item:
+                yield item
@@ -4,9 +4,9 @@ Pacific Giftware Scraper with Custom Output Folders
 Saves results to user-specified folders for better organization
 """
 
+import itertools
 import os
 import sys
-import pandas as pd
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -15,6 +15,11 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 import time
 
+from browser_host import apply_chrome_binary, chromedriver_service
+from item_keys import stream_items
+from item_reader import iter_item_numbers
+from result_sinks import CsvSink, TeeSink, XlsxSink
+
 def create_output_folder(folder_name=None):
     """Create output folder if it doesn't exist"""
     if folder_name is None:
@@ -42,7 +47,8 @@ def setup_chrome_driver():
     chrome_options.add_argument("--disable-gpu")
     chrome_options.add_argument("--window-size=1920,1080")
     
-    driver = webdriver.Chrome(options=chrome_options)
+    apply_chrome_binary(chrome_options)
+    driver = webdriver.Chrome(service=chromedriver_service(), options=chrome_options)
     return driver
 
 def login_to_pacific_giftware(driver):
@@ -121,20 +127,19 @@ def scrape_item_data(driver, item_number):
         }
 
 def save_results(results, output_folder, base_filename="pacific_giftware_results"):
-    """Save results to CSV and Excel in specified folder"""
-    df = pd.DataFrame(results)
-    
+    """Save results to CSV and Excel in specified folder
+
+    ``results`` may be a generator; rows are written as it yields them.
+    """
     # Create filenames with timestamp
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     csv_file = os.path.join(output_folder, f"{base_filename}_{timestamp}.csv")
     excel_file = os.path.join(output_folder, f"{base_filename}_{timestamp}.xlsx")
     
-    # Save CSV
-    df.to_csv(csv_file, index=False)
+    # Both files are finished (and renamed into place) together
+    with TeeSink(CsvSink(csv_file), XlsxSink(excel_file)) as sink:
+        sink.write_many(results)
     print(f"✓ CSV saved: {csv_file}")
-    
-    # Save Excel
-    df.to_excel(excel_file, index=False)
     print(f"✓ Excel saved: {excel_file}")
     
     return csv_file, excel_file
@@ -151,24 +156,8 @@ def scrape_with_custom_folder(input_file=None, output_folder=None, item_numbers=
     # Get item numbers
     if item_numbers is None:
         if input_file and os.path.exists(input_file):
-            # Read from file
-            if input_file.endswith('.xlsx'):
-                df = pd.read_excel(input_file)
-            else:
-                df = pd.read_csv(input_file)
-            
-            # Try different column names for item numbers
-            item_col = None
-            for col in ['Item Number', 'Item', 'Item#', 'SKU', 'Product Code']:
-                if col in df.columns:
-                    item_col = col
-                    break
-            
-            if item_col:
-                item_numbers = df[item_col].astype(str).tolist()
-            else:
-                print("❌ Could not find item number column in file")
-                return
+            # Stream from file, so large sheets start scraping straight away
+            item_numbers = iter_item_numbers(input_file)
         else:
             # Manual input
             print("Enter item numbers (one per line, press Enter twice to finish):")
@@ -179,11 +168,20 @@ def scrape_with_custom_folder(input_file=None, output_folder=None, item_numbers=
                     break
                 item_numbers.append(item)
     
-    if not item_numbers:
+    # Normalise and dedupe as items are read
+    try:
+        plan, item_numbers = stream_items(item_numbers)
+        first = next(item_numbers, None)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    
+    if first is None:
         print("❌ No item numbers provided")
         return
+    item_numbers = itertools.chain([first], item_numbers)
     
-    print(f"🚀 Starting scrape for {len(item_numbers)} items...")
+    print("🚀 Starting scrape...")
     print(f"📁 Results will be saved to: {folder_path}")
     
     # Set up browser and login
@@ -195,28 +193,29 @@ def scrape_with_custom_folder(input_file=None, output_folder=None, item_numbers=
             return
         
         # Scrape all items
-        results = []
-        for i, item_number in enumerate(item_numbers, 1):
-            print(f"🔍 Scraping item {i}/{len(item_numbers)}: {item_number}")
-            result = scrape_item_data(driver, item_number)
-            results.append(result)
-            
-            # Show progress
-            if result['Status'] == 'Found':
-                print(f"  ✓ {result['Product Name']} - {result['Unit Price']}")
-            else:
-                print(f"  ❌ {result['Status']}")
-        
-        # Save results to custom folder
+        def scrape_all():
+            for i, item_number in enumerate(item_numbers, 1):
+                print(f"🔍 Scraping item {i}: {item_number}")
+                result = scrape_item_data(driver, item_number)
+                
+                # Show progress
+                if result['Status'] == 'Found':
+                    print(f"  ✓ {result['Product Name']} - {result['Unit Price']}")
+                else:
+                    print(f"  ❌ {result['Status']}")
+                yield result
+        
+        # Save results to custom folder as they are scraped, one row per input row
+        results = plan.fan_out_stream(scrape_all(), lambda result, row: {**result, 'Item Number': row})
         csv_file, excel_file = save_results(results, folder_path)
         
-        print(f"\n🎉 Scraping completed!")
+        print(f"\n🎉 Scraping completed! ({plan.summary()})")
         print(f"📊 Results saved to folder: {folder_path}")
         print(f"📄 Files created:")
         print(f"   - {os.path.basename(csv_file)}")
         print(f"   - {os.path.basename(excel_file)}")
         
-        return results, folder_path
+        return (csv_file, excel_file), folder_path
         
     finally:
         driver.quit()
@@ -0,0 +1,79 @@
+"""
+pacific_cli.py
+--------------
+
+One command line entry point for the Pacific Giftware tools.
+
+Each subcommand runs the ``main`` function of an existing script with
+the remaining arguments, so ``pacific_cli.py scrape in.csv out.csv``
+behaves exactly like ``pacificgiftware_scraper.py in.csv out.csv``.
+Only the module of the chosen subcommand is imported, and those
+modules load ``pandas``, ``bs4`` and ``selenium`` only when they
+actually scrape or parse.  ``--help``, ``cache stats`` or a
+``--cache-only`` run therefore start in a fraction of a second.
+``pacific_cli.py startup`` checks that this stays true (see
+:mod:`import_budget`).
+
+Example
+-------
+::
+
+    python pacific_cli.py scrape items.csv out.csv --http --workers 8
+    python pacific_cli.py final items.csv out.csv --cache-only
+    python pacific_cli.py cache stats
+    python pacific_cli.py startup
+
+"""
+
+from __future__ import annotations
+
+import importlib
+import sys
+from typing import List, Optional
+
+# Subcommand -> (module whose main() runs it, summary line).
+COMMANDS = {
+    "scrape": ("pacificgiftware_scraper", "Scrape items with the browser, HTTP hand-off or the API."),
+    "final": ("final_scraper", "Scrape names, case quantities and prices (final_scraper)."),
+    "fill": ("comprehensive_filler", "Fill case quantity, price and URL for a sheet of items."),
+    "http": ("simple_scraper", "Scrape public product pages over plain HTTP."),
+    "async": ("async_scraper", "Scrape public product pages over HTTP, many at once."),
+    "verify": ("verify_items", "Check which URL each item number is available at."),
+    "urls": ("url_index", "Resolve item numbers to product URLs ahead of a run."),
+    "cache": ("product_cache", "Show or seed the local product cache."),
+    "selectors": ("selector_stats", "Show or reset the selector hit statistics."),
+    "host": ("browser_host", "Start or stop the long-lived browser."),
+    "startup": ("import_budget", "Check the import time of the entry points."),
+}
+
+
+def usage() -> str:
+    lines = ["usage: pacific_cli.py <command> [arguments]", "", "commands:"]
+    lines += [f"  {name:<9} {summary}" for name, (_, summary) in COMMANDS.items()]
+    lines += ["", "Run 'pacific_cli.py <command> --help' for the arguments of a command."]
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0
+    name, rest = argv[0], argv[1:]
+    if name not in COMMANDS:
+        print(f"pacific_cli.py: unknown command '{name}'\n\n{usage()}", file=sys.stderr)
+        return 2
+
+    module = importlib.import_module(COMMANDS[name][0])
+    # The scripts parse sys.argv themselves; present them the command
+    # line they would have seen if run directly.
+    sys.argv = [f"pacific_cli.py {name}", *rest]
+    try:
+        result = module.main()
+    except KeyboardInterrupt:
+        return 130
+    return result if isinstance(result, int) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -52,13 +52,27 @@ such that a user running this code locally can test each component.
 
 from __future__ import annotations
 
-import csv
+import contextlib
+import functools
+import itertools
 import os
-from dataclasses import dataclass
-from typing import List, Dict, Optional
+from dataclasses import asdict, dataclass, replace
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Tuple
 
-import pandas as pd
-from bs4 import BeautifulSoup
+from field_rules import NOTES_RULES, scanner
+from item_keys import stream_items
+
+PRODUCT_URL = "https://www.pacificgiftware.com/product/{}"
+
+# Distinct items looked up and scraped per batch while the input is
+# still being read.  Each batch starts its browsers with the saved
+# session, so this matches the default --recycle-pages.
+SCRAPE_CHUNK = 500
+
+# Most browsers started for the pages an --http run finds rendered
+# client-side.  --workers counts HTTP threads there, which is far more
+# than the Chrome sessions a machine can hold.
+HTTP_FALLBACK_BROWSERS = 4
 
 # Selenium imports.  These modules are optional until you call
 # functions that require them; importing at the top makes IDEs aware
@@ -93,7 +107,13 @@ class ProductInfo:
 
 from typing import Any
 
-def start_driver(headless: bool = False) -> Any:
+def start_driver(
+    headless: bool = False,
+    user_data_dir: str = "/tmp/chrome-user-data",
+    block: Optional[str] = None,
+    capture: bool = False,
+    attach: bool = False,
+) -> Any:
     """
     Start a Selenium WebDriver session.
 
@@ -104,6 +124,23 @@ def start_driver(headless: bool = False) -> Any:
         headless mode can be useful for automated scripts that don't
         require visual feedback.  If you're developing or debugging
         this script, set ``headless=False`` to see the browser window.
+    user_data_dir : str, optional
+        Chrome profile directory.  Chrome refuses to share a profile
+        between two running browsers, so concurrent drivers (see
+        :mod:`driver_pool`) must each pass their own directory.
+    block : str, optional
+        Name of a :mod:`request_blocking` preset (``"text+xhr"`` or
+        ``"text-only"``) used to stop images, fonts, media and trackers
+        from loading.  ``None`` or ``"none"`` loads everything.
+    capture : bool, optional
+        If ``True``, read product data from the page's JSON responses
+        (see :mod:`xhr_capture`) and fall back to the rendered DOM only
+        when no matching response is seen.
+    attach : bool, optional
+        If ``True``, connect to the long-lived browser managed by
+        :mod:`browser_host` (starting it if needed) instead of launching
+        a new one.  ``headless`` and ``user_data_dir`` are then decided
+        by the host.
 
     Returns
     -------
@@ -120,7 +157,8 @@ def start_driver(headless: bool = False) -> Any:
     # Lazy import of Selenium.  This raises ImportError only if the user
     # actually calls ``start_driver`` without Selenium installed.
     from selenium import webdriver
-    from selenium.webdriver.chrome.service import Service as ChromeService
+
+    from browser_host import apply_chrome_binary, attach_driver, chromedriver_service
 
     chrome_options = webdriver.ChromeOptions()
     if headless:
@@ -132,7 +170,11 @@ def start_driver(headless: bool = False) -> Any:
     chrome_options.add_argument("--disable-extensions")
     chrome_options.add_argument("--disable-web-security")
     chrome_options.add_argument("--allow-running-insecure-content")
-    chrome_options.add_argument("--user-data-dir=/tmp/chrome-user-data")
+    chrome_options.add_argument(f"--user-data-dir={user_data_dir}")
+    # Let pages in background tabs load at full speed (see tab_pipeline).
+    chrome_options.add_argument("--disable-background-timer-throttling")
+    chrome_options.add_argument("--disable-backgrounding-occluded-windows")
+    chrome_options.add_argument("--disable-renderer-backgrounding")
 
     # Many corporate environments block connections to websites that
     # aren't pre‑approved.  We disable the Chrome "enable automation"
@@ -142,19 +184,50 @@ def start_driver(headless: bool = False) -> Any:
     )
     chrome_options.add_experimental_option('useAutomationExtension', False)
 
-    # Specify the Chrome binary path for this environment
-    chrome_options.binary_location = "/nix/store/qa9cnw4v5xkxyip6mb9kxqfq1z4x2dx1-chromium-138.0.7204.100/bin/chromium-browser"
+    blocking = block not in (None, "none")
+    if blocking or capture:
+        from request_blocking import enable_network_log
+
+        # The performance log feeds the blocked-request statistics and
+        # the XHR capture.
+        enable_network_log(chrome_options)
+    if capture:
+        # The product JSON arrives after DOMContentLoaded; there is no
+        # need to wait for the window load event as well.
+        chrome_options.page_load_strategy = "eager"
+
+    # Use the Chrome binary found on this machine.  Discovery results
+    # are cached between runs (see :mod:`browser_host`).
+    apply_chrome_binary(chrome_options)
 
     # Initialise the ChromeDriver service.  If the chromedriver binary
     # isn't found on your PATH, this will raise a FileNotFoundError.
     try:
-        # Specify the chromedriver path explicitly
-        chromedriver_path = "/nix/store/8zj50jw4w0hby47167kqqsaqw4mm5bkd-chromedriver-unwrapped-138.0.7204.100/bin/chromedriver"
-        service = ChromeService(executable_path=chromedriver_path)
-        driver = webdriver.Chrome(service=service, options=chrome_options)
+        if attach:
+            attach_options = webdriver.ChromeOptions()
+            if blocking or capture:
+                from request_blocking import enable_network_log
+
+                enable_network_log(attach_options)
+            driver = attach_driver(options=attach_options)
+        else:
+            driver = webdriver.Chrome(service=chromedriver_service(), options=chrome_options)
     except Exception as exc:
         raise RuntimeError("Failed to start ChromeDriver. Ensure that Chrome and the matching "
                            "ChromeDriver executable are installed and on your PATH.") from exc
+
+    try:
+        if blocking:
+            from request_blocking import install
+
+            install(driver, block)
+        if capture:
+            import xhr_capture
+
+            xhr_capture.enable(driver)
+    except Exception:
+        driver.quit()
+        raise
     return driver
 
 
@@ -251,28 +324,19 @@ def extract_case_quantity_from_notes(notes_text: str) -> Optional[str]:
     """
     if not notes_text:
         return None
-    for line in notes_text.splitlines():
-        if "case pack" in line.lower():
-            # Split on colon and strip whitespace.  Some notes may be
-            # formatted as "CASE PACK: 1" while others use hyphens or
-            # different punctuation.  We normalise by splitting on
-            # non‑digit characters and extracting the first group of
-            # digits.
-            parts = line.split(":")
-            if len(parts) >= 2:
-                candidate = parts[1].strip()
-                # Extract digits from the candidate.
-                digits = "".join(ch for ch in candidate if ch.isdigit())
-                if digits:
-                    return digits
-            # Fallback: search for digits in the entire line.
-            digits = "".join(ch for ch in line if ch.isdigit())
-            if digits:
-                return digits
-    return None
-
-
-def get_product_details(driver: Any, item_number: str, timeout: int = 30) -> ProductInfo:
+    # Lines with "CASE PACK" but no digits are skipped; see
+    # field_rules._case_pack_line.
+    found = scanner(NOTES_RULES).first(notes_text, "case")
+    return found.value if found else None
+
+
+def get_product_details(
+    driver: Any,
+    item_number: str,
+    timeout: int = 30,
+    parse_pool: Optional[Any] = None,
+    parser: str = "html.parser",
+) -> ProductInfo:
     """
     Load a product page and extract details.
 
@@ -292,6 +356,11 @@ def get_product_details(driver: Any, item_number: str, timeout: int = 30) -> Pro
         The product's SKU or item number as listed on Pacific Giftware.
     timeout : int, optional
         How long to wait for the product page to load before giving up.
+    parse_pool : parse_pool.ParsePool, optional
+        Parse the page source in this process pool instead of on the
+        calling thread.
+    parser : str, optional
+        Extraction backend for :func:`parse_product_html`.
 
     Returns
     -------
@@ -303,8 +372,18 @@ def get_product_details(driver: Any, item_number: str, timeout: int = 30) -> Pro
     TimeoutError
         If the product page does not load within the specified timeout.
     """
-    url = f"https://www.pacificgiftware.com/product/{item_number}"
+    url = PRODUCT_URL.format(item_number)
     driver.get(url)
+
+    # Drivers started with ``capture=True`` read the product JSON the
+    # page downloads; the DOM below is only the fallback.
+    import xhr_capture
+
+    if xhr_capture.is_capturing(driver):
+        info = xhr_capture.product_from_network(driver, item_number, timeout=min(timeout, xhr_capture.DEFAULT_TIMEOUT))
+        if info is not None:
+            return info
+
     # Lazy import of Selenium classes used for waiting and selecting elements.
     from selenium.webdriver.common.by import By
     from selenium.webdriver.support.ui import WebDriverWait
@@ -317,7 +396,45 @@ def get_product_details(driver: Any, item_number: str, timeout: int = 30) -> Pro
     wait.until(EC.presence_of_element_located((By.TAG_NAME, "h1")))
 
     # Grab the page source once all dynamic content has been rendered.
-    html = driver.page_source
+    if parse_pool is not None:
+        return parse_pool.parse(driver.page_source, item_number)
+    return parse_product_html(driver.page_source, item_number, parser)
+
+
+def parse_product_html(html: str, item_number: str, parser: str = "html.parser") -> ProductInfo:
+    """
+    Extract product details from a rendered product page.
+
+    This is the parsing half of :func:`get_product_details`, split out
+    so that HTML fetched by other means (for example over plain HTTP
+    with a session handed off from Selenium) goes through exactly the
+    same extraction.
+
+    Parameters
+    ----------
+    html : str
+        Page source of a product page.
+    item_number : str
+        The item number the page belongs to.
+    parser : str, optional
+        Extraction backend.  ``"html.parser"`` runs the BeautifulSoup
+        code below, which is the reference; ``"lxml"`` and
+        ``"selectolax"`` are faster equivalents from
+        :mod:`product_parsers`.
+
+    Returns
+    -------
+    ProductInfo
+        An object containing the extracted details.  Fields that are
+        not present on the page are ``None`` (or empty for the name).
+    """
+    if parser != "html.parser":
+        from product_parsers import get_parser
+
+        return get_parser(parser)(html, item_number)
+
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(html, "html.parser")
 
     # Extract the product name.  We look for the first <h1> tag.
@@ -369,9 +486,10 @@ def read_item_numbers(input_path: str) -> List[str]:
     """
     Read item numbers from a CSV or Excel file.
 
-    The input file should contain a single column with item numbers.  Any
-    blank lines or additional columns are ignored.  This function uses
-    ``pandas`` to handle both CSV and Excel formats automatically.
+    The file is streamed with :func:`item_reader.iter_item_numbers`:
+    the item column is taken from the header ("Item Number", "SKU",
+    ...) or from values that look like item numbers, and otherwise the
+    first column is used.  Blank cells are skipped.
 
     Parameters
     ----------
@@ -390,64 +508,125 @@ def read_item_numbers(input_path: str) -> List[str]:
     ValueError
         If the file format is unsupported or the file is empty.
     """
-    if not os.path.exists(input_path):
-        raise FileNotFoundError(f"Input file '{input_path}' does not exist.")
-
-    # Determine file extension and use pandas accordingly.
-    _, ext = os.path.splitext(input_path)
-    ext = ext.lower()
-    if ext in {".csv", ".txt"}:
-        df = pd.read_csv(input_path, dtype=str)
-    elif ext in {".xls", ".xlsx"}:
-        df = pd.read_excel(input_path, dtype=str)
-    else:
-        raise ValueError(f"Unsupported file extension '{ext}'. Please provide a CSV or Excel file.")
-
-    # Drop completely empty rows and columns.
-    df = df.dropna(how="all")
-    df = df.dropna(axis=1, how="all")
+    from item_reader import iter_item_numbers
 
-    if df.empty:
+    items = list(iter_item_numbers(input_path, first_column_fallback=True))
+    if not items:
         raise ValueError("Input file is empty or contains no item numbers.")
-
-    # Assume the first column contains the item numbers.
-    first_col = df.columns[0]
-    items = df[first_col].astype(str).str.strip().tolist()
-
-    # Filter out any blank strings.
-    items = [item for item in items if item]
     return items
 
 
-def write_results(output_path: str, products: List[ProductInfo]) -> None:
+def write_results(output_path: str, products: Iterable[ProductInfo]) -> None:
     """
     Write product information to a CSV file.
 
+    Rows are streamed through a :mod:`result_sinks` sink, so
+    ``products`` may be a generator, and the file only replaces
+    ``output_path`` once it is complete.
+
     Parameters
     ----------
     output_path : str
-        Path to the output CSV file.  If the file already exists, it
-        will be overwritten.
-    products : List[ProductInfo]
-        A list of ProductInfo objects containing the scraped data.
+        Path to the output file.  If the file already exists, it will
+        be overwritten.  ``.jsonl`` and ``.xlsx`` paths are written in
+        those formats, any other path as CSV, and ``.gz`` paths are
+        compressed.
+    products : Iterable[ProductInfo]
+        The ProductInfo objects containing the scraped data.
     """
+    from result_sinks import open_sink
+
     fieldnames = ["Item Number", "Product Name", "Unit Price", "Case Quantity"]
-    with open(output_path, mode="w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
+    with open_sink(output_path, fieldnames) as sink:
         for product in products:
-            writer.writerow(product.to_dict())
+            sink.write(product.to_dict())
+
+
+def prompt_credentials() -> Tuple[str, str]:
+    """
+    Return the login credentials from the environment or the terminal.
+
+    ``PACIFIC_EMAIL`` and ``PACIFIC_PASSWORD`` are used when set;
+    otherwise the user is prompted, with the password read through
+    ``getpass`` where available.
+    """
+    email = os.environ.get("PACIFIC_EMAIL")
+    password = os.environ.get("PACIFIC_PASSWORD")
+    if not email:
+        email = input("Enter your Pacific Giftware email: ").strip()
+    if not password:
+        # Use getpass to hide password input if available.
+        try:
+            import getpass
+            password = getpass.getpass("Enter your Pacific Giftware password: ")
+        except Exception:
+            password = input("Enter your Pacific Giftware password: ").strip()
+    return email, password
+
 
+def scrape_item(
+    driver: Any,
+    item_number: str,
+    parse_pool: Optional[Any] = None,
+    parser: str = "html.parser",
+) -> ProductInfo:
+    """
+    Scrape a single item, never raising.
 
-def process_items(input_path: str, output_path: str, headless: bool = False) -> None:
+    Failures are reported on stdout and recorded as a ``ProductInfo``
+    with empty fields so that the output keeps one row per input item.
+    """
+    from request_blocking import collect
+
+    print(f"Processing item {item_number}...")
+    try:
+        return get_product_details(driver, item_number, parse_pool=parse_pool, parser=parser)
+    except Exception as exc:
+        print(f"Failed to process item {item_number}: {exc}")
+        return ProductInfo(
+            item_number=item_number,
+            product_name="",
+            unit_price=None,
+            case_quantity=None,
+        )
+    finally:
+        # Keep the performance log drained and the blocking stats current.
+        collect(driver)
+
+
+def process_items(
+    input_path: str,
+    output_path: str,
+    headless: bool = False,
+    workers: int = 1,
+    http: bool = False,
+    block: Optional[str] = None,
+    capture: bool = False,
+    api: bool = False,
+    api_product_path: Optional[str] = None,
+    api_batch_path: Optional[str] = None,
+    attach: bool = False,
+    recycle_pages: int = 500,
+    recycle_mb: Optional[float] = 1500,
+    tabs: int = 1,
+    parse_workers: int = 0,
+    parser: str = "html.parser",
+    cache_hours: Optional[float] = 24,
+    cache_only: bool = False,
+    resume: bool = False,
+) -> None:
     """
     Main workflow to process multiple items and save their details.
 
-    This function orchestrates the overall scraping process.  It prompts
-    the user for login credentials (unless environment variables are
-    provided), logs into the site, iterates over each item number from
-    the input file, scrapes the product details, and writes the
-    results to a CSV file.
+    This function orchestrates the overall scraping process.  It restores
+    the saved login session (see :mod:`session_store`) or prompts the
+    user for login credentials (unless environment variables are
+    provided) and logs into the site, iterates over each distinct item
+    number from the input file (see :mod:`item_keys`), scrapes the
+    product details, and writes the results to a CSV file with one
+    line per input row.  The input is streamed and scraped in batches of
+    ``SCRAPE_CHUNK`` distinct items, so on a large sheet the first rows
+    are written before the rest of the file has been read.
 
     Parameters
     ----------
@@ -457,6 +636,66 @@ def process_items(input_path: str, output_path: str, headless: bool = False) ->
         Path where the output CSV file will be written.
     headless : bool, optional
         If True, run the browser in headless mode.
+    workers : int, optional
+        Number of browser sessions to scrape with.  Values above one
+        hand the item list to a :class:`driver_pool.DriverPool`; the
+        output order still matches the input file.
+    http : bool, optional
+        If True, log in with the browser once and fetch product pages
+        over plain HTTP with :class:`http_handoff.HandoffScraper`.
+        ``workers`` then sets the number of HTTP threads.  Once a page
+        turns out to be rendered client-side, it and the items after it
+        are scraped in up to ``HTTP_FALLBACK_BROWSERS`` browsers.
+    block : str, optional
+        :mod:`request_blocking` preset applied to every browser.
+    capture : bool, optional
+        Build results from the product JSON responses (see
+        :mod:`xhr_capture`), falling back to the DOM.
+    api : bool, optional
+        Query the product JSON API directly with
+        :class:`api_client.PacificApiClient`; no pages are loaded.
+        Requires ``api_product_path``.
+    api_product_path : str, optional
+        Path of the single-product endpoint, with ``{item}`` for the
+        item number, as seen in a ``capture`` run.  There is no default:
+        a guessed path would only produce empty rows.
+    api_batch_path : str, optional
+        Path of the batch endpoint, if the backend has one.
+    attach : bool, optional
+        Scrape in the long-lived browser of :mod:`browser_host` rather
+        than a new one.  Ignored with ``workers`` above one, since
+        workers cannot share a browser.
+    recycle_pages : int, optional
+        Restart each browser after this many pages (``0`` disables).
+    recycle_mb : float, optional
+        Blank the page, then restart the browser, when its process tree
+        grows past this many MiB (``None`` disables).  See
+        :mod:`driver_recycling`.
+    tabs : int, optional
+        Number of tabs loading pages at once in the single browser (see
+        :mod:`tab_pipeline`).  Not supported together with ``capture``,
+        and ignored with ``workers`` above one.
+    parse_workers : int, optional
+        Parse pages in this many worker processes (see
+        :mod:`parse_pool`) so that parsing for several browsers or HTTP
+        threads runs on several cores.  ``0`` parses in the scraping
+        thread.
+    parser : str, optional
+        Extraction backend (see :mod:`product_parsers`):
+        ``"html.parser"``, ``"lxml"`` or ``"selectolax"``.
+    cache_hours : float, optional
+        Take items scraped within this many hours from the
+        :mod:`product_cache` and scrape only the rest.  ``0`` scrapes
+        everything but still refreshes the cache; ``None`` does not use
+        the cache at all.
+    cache_only : bool, optional
+        Do not scrape: use cached entries of any age and leave the
+        fields of uncached items empty.
+    resume : bool, optional
+        Continue an interrupted run: items recorded in the
+        :mod:`run_journal` next to ``output_path`` are not scraped
+        again, and the output is built from the journal and the newly
+        scraped items.  Without it the journal is started afresh.
 
     Raises
     ------
@@ -464,63 +703,334 @@ def process_items(input_path: str, output_path: str, headless: bool = False) ->
         If any part of the login or scraping process fails.  Errors
         are propagated so that they can be handled by the caller.
     """
-    # Read list of item numbers.
-    item_numbers = read_item_numbers(input_path)
-    if not item_numbers:
+    if tabs > 1 and capture:
+        raise ValueError("Tab pipelining cannot be combined with JSON capture.")
+    if api and not api_product_path:
+        raise ValueError("The API needs its product endpoint path (api_product_path); read it off a capture run.")
+    from result_sinks import sink_type
+
+    # Fail before scraping, not when the results are written.
+    sink_type(output_path)
+    if parser != "html.parser":
+        from product_parsers import get_parser
+
+        get_parser(parser)
+
+    # Item numbers are streamed from the file and scraped in chunks, so
+    # a large sheet is being scraped (and written) while the rest of it
+    # is still read.  Each distinct item is scraped once; the results
+    # are copied back to every row that lists it.
+    from item_reader import iter_item_numbers
+
+    plan, keys = stream_items(iter_item_numbers(input_path, first_column_fallback=True))
+    first = next(keys, None)
+    if first is None:
         print("No item numbers found in the input file.")
         return
+    keys = itertools.chain([first], keys)
+
+    # Items fresh in the product cache are not scraped again.
+    cache = None
+    if cache_hours is not None or cache_only:
+        from product_cache import ProductCache
+
+        cache = ProductCache(max_age_hours=None if cache_only else cache_hours)
+
+    # Each item is journaled as it finishes, so an interrupted run can
+    # be resumed; journaled items count as fetched.
+    journal = None
+    journaled: Dict[str, Dict[str, Any]] = {}
+    if not cache_only:
+        from run_journal import RunJournal, journal_path
+
+        journal = RunJournal(journal_path(output_path), resume=resume)
+        if resume:
+            journaled = journal.completed()
+
+    def on_result(item: str, info: ProductInfo) -> None:
+        journal.record(item, asdict(info), ok=bool(info.product_name))
+
+    # Shared by every chunk: the login prompt appears at most once and
+    # the parse processes are started once per run.
+    credentials = functools.lru_cache(maxsize=None)(prompt_credentials)
+    parse_pool = None
+    if parse_workers > 0 and not cache_only:
+        from parse_pool import ParsePool
+
+        parse_pool = ParsePool(parse_workers, parser=parser)
+
+    # Request blocking statistics of every browser the run starts.
+    from request_blocking import BlockingTotal
+
+    blocking = BlockingTotal()
+    counts = {"cached": 0, "resumed": 0, "scraped": 0}
+
+    def products() -> Iterator[ProductInfo]:
+        while True:
+            chunk = list(itertools.islice(keys, SCRAPE_CHUNK))
+            if not chunk:
+                return
+            done: Dict[str, ProductInfo] = {}
+            if cache is not None:
+                for item, product in cache.lookup(chunk).items():
+                    done[item] = ProductInfo(item, product.name, product.price, product.case_quantity)
+                counts["cached"] += len(done)
+            fetched = {item: ProductInfo(**journaled[item]) for item in chunk if item not in done and item in journaled}
+            counts["resumed"] += len(fetched)
+            todo = [item for item in chunk if item not in done and item not in fetched]
+            if todo and not cache_only:
+                scraped = _scrape(
+                    todo, on_result,
+                    credentials=credentials, headless=headless, workers=workers, http=http,
+                    block=block, capture=capture, api=(api_product_path, api_batch_path) if api else None,
+                    attach=attach, recycle_pages=recycle_pages, recycle_mb=recycle_mb, tabs=tabs,
+                    parse_pool=parse_pool, parser=parser, cache=cache, blocking=blocking,
+                )
+                fetched.update(zip(todo, scraped))
+                counts["scraped"] += len(todo)
+            if cache is not None:
+                for item, info in fetched.items():
+                    cache.put(item, info.product_name, info.unit_price, info.case_quantity, PRODUCT_URL.format(item))
+            done.update(fetched)
+            for item in chunk:
+                yield done.get(item) or ProductInfo(item, "", None, None)
 
-    # Obtain credentials from environment variables or prompt the user.
-    email = os.environ.get("PACIFIC_EMAIL")
-    password = os.environ.get("PACIFIC_PASSWORD")
-    if not email:
-        email = input("Enter your Pacific Giftware email: ").strip()
-    if not password:
-        # Use getpass to hide password input if available.
+    try:
+        with journal if journal is not None else contextlib.nullcontext():
+            write_results(output_path, plan.fan_out_stream(products(), lambda info, row: replace(info, item_number=row)))
+    finally:
+        if parse_pool is not None:
+            parse_pool.close()
+        if cache is not None:
+            cache.close()
+
+    print(f"Input: {plan.summary()}")
+    if cache is not None:
+        remaining = "not cached" if cache_only else "scraped"
+        print(f"Cache: {counts['cached']} item(s) cached, {len(plan.unique) - counts['cached']} {remaining}")
+        print(cache.report())
+    if blocking.report() is not None:
+        print(blocking.report())
+    if resume:
+        print(f"Resume: {counts['resumed']} item(s) already done, {counts['scraped']} scraped")
+    print(f"Done. Wrote {len(plan.rows)} records to {output_path}.")
+
+
+def _scrape(
+    item_numbers: List[str],
+    on_result: Optional[Callable[[str, ProductInfo], None]],
+    *,
+    credentials: Callable[[], Tuple[str, str]],
+    headless: bool,
+    workers: int,
+    http: bool,
+    block: Optional[str],
+    capture: bool,
+    api: Optional[Tuple[str, Optional[str]]],
+    attach: bool,
+    recycle_pages: int,
+    recycle_mb: Optional[float],
+    tabs: int,
+    parse_pool: Optional[Any],
+    parser: str,
+    cache: Optional[Any],
+    blocking: Optional[Any] = None,
+) -> List[ProductInfo]:
+    """
+    Scrape ``item_numbers`` the way :func:`process_items` was asked to.
+
+    ``api`` is ``(product_path, batch_path)`` to use the JSON API.
+    ``credentials`` is only called when no saved session can be
+    reused.  Browsers add their request blocking statistics to
+    ``blocking`` as they quit.
+    """
+    if api:
+        from api_client import PacificApiClient
+        from http_handoff import browser_login_session, session_from_file
+
+        session = session_from_file() or browser_login_session(credentials, headless=headless)
+        product_path, batch_path = api
+        client = PacificApiClient(product_path, session=session, batch_path=batch_path, workers=workers)
+        return client.get_products(item_numbers, on_result=on_result)
+
+    if http:
+        from http_handoff import HandoffScraper
+
+        # Pages whose HTML is only the app shell go to the browser path.
+        def in_browser(items: List[str]) -> List[ProductInfo]:
+            return _scrape(
+                items, None,
+                credentials=credentials, headless=headless, workers=min(workers, HTTP_FALLBACK_BROWSERS), http=False,
+                block=block, capture=capture, api=None, attach=attach, recycle_pages=recycle_pages,
+                recycle_mb=recycle_mb, tabs=tabs, parse_pool=parse_pool, parser=parser, cache=cache,
+                blocking=blocking,
+            )
+
+        scraper = HandoffScraper(credentials, headless=headless, parse_pool=parse_pool, parser=parser, cache=cache)
+        return scraper.scrape(item_numbers, workers=workers, on_result=on_result, fallback=in_browser)
+    elif workers > 1:
+        from driver_pool import DriverPool
+
+        pool = DriverPool(
+            workers,
+            credentials=credentials,
+            headless=headless,
+            driver_kwargs={"block": block, "capture": capture},
+            recycle_kwargs={"max_pages": recycle_pages, "max_rss_mb": recycle_mb},
+            parse_pool=parse_pool,
+            parser=parser,
+            blocking=blocking,
+        )
+        return pool.run(item_numbers, on_result=on_result)
+    else:
+        return _scrape_in_one_browser(
+            item_numbers, credentials,
+            headless=headless, block=block, capture=capture, attach=attach,
+            recycle_pages=recycle_pages, recycle_mb=recycle_mb, tabs=tabs,
+            parse_pool=parse_pool, parser=parser, on_result=on_result, blocking=blocking,
+        )
+
+
+def _scrape_in_one_browser(
+    item_numbers: List[str],
+    credentials: Callable[[], Tuple[str, str]],
+    *,
+    headless: bool,
+    block: Optional[str],
+    capture: bool,
+    attach: bool,
+    recycle_pages: int,
+    recycle_mb: Optional[float],
+    tabs: int,
+    parse_pool: Optional[Any],
+    parser: str,
+    on_result: Optional[Callable[[str, ProductInfo], None]] = None,
+    blocking: Optional[Any] = None,
+) -> List[ProductInfo]:
+    """Scrape every item with a single (recycled) browser session.
+
+    ``on_result(item, info)`` is called as each item finishes.  Each
+    browser's request blocking statistics are added to ``blocking`` (a
+    :class:`request_blocking.BlockingTotal`) before it quits.
+    """
+    from driver_recycling import RecyclingDriver
+    from session_store import restore_or_login
+    from tab_pipeline import TabPipeline
+
+    def new_session() -> Any:
+        # Start the browser, then reuse the saved session or log in.  If
+        # login fails, an exception will be raised.
+        driver = start_driver(headless=headless, block=block, capture=capture, attach=attach)
         try:
-            import getpass
-            password = getpass.getpass("Enter your Pacific Giftware password: ")
+            restore_or_login(driver, lambda: login(driver, *credentials()))
         except Exception:
-            password = input("Enter your Pacific Giftware password: ").strip()
-
-    # Start the browser.
-    driver = start_driver(headless=headless)
+            driver.quit()
+            raise
+        return driver
+
+    # The browser is restarted (with the saved session) whenever it has
+    # served too many pages or grown too large; see driver_recycling.
+    browser = RecyclingDriver(
+        new_session, max_pages=recycle_pages, max_rss_mb=recycle_mb,
+        on_quit=blocking.add if blocking is not None else None,
+    )
+    pipeline = TabPipeline(tabs, parse_pool=parse_pool, parser=parser) if tabs > 1 else None
     try:
-        # Log in.  If login fails, an exception will be raised.
-        login(driver, email=email, password=password)
-
         # Iterate through items and collect product info.
         products: List[ProductInfo] = []
-        for item in item_numbers:
-            print(f"Processing item {item}...")
-            try:
-                info = get_product_details(driver, item)
-                products.append(info)
-            except Exception as exc:
-                print(f"Failed to process item {item}: {exc}")
-                products.append(
-                    ProductInfo(
-                        item_number=item,
-                        product_name="",
-                        unit_price=None,
-                        case_quantity=None,
-                    )
-                )
-
-        # Write out the results.
-        write_results(output_path, products)
-        print(f"Done. Wrote {len(products)} records to {output_path}.")
+        if pipeline is None:
+            for item in item_numbers:
+                products.append(browser.run(lambda driver: scrape_item(driver, item, parse_pool, parser)))
+                if on_result is not None:
+                    on_result(item, products[-1])
+        else:
+            # Hand the pipeline chunks small enough for the recycling
+            # checks to run between them.
+            chunk_size = max(tabs, browser.check_every)
+            for start in range(0, len(item_numbers), chunk_size):
+                chunk = item_numbers[start:start + chunk_size]
+                products.extend(browser.run(lambda driver: pipeline.scrape(driver, chunk), pages=len(chunk)))
+                if on_result is not None:
+                    for item, info in zip(chunk, products[start:]):
+                        on_result(item, info)
+
+        print(browser.report())
+        return products
     finally:
-        # Always quit the browser to free resources.
-        driver.quit()
+        # Always quit the driver to free resources.  An attached driver
+        # only disconnects; the host browser keeps running, so close the
+        # pipeline's extra tabs in it first.
+        if pipeline is not None:
+            pipeline.close()
+        browser.quit()
 
 
-if __name__ == "__main__":
+def main(argv: Optional[List[str]] = None) -> int:
     import argparse
+
     parser = argparse.ArgumentParser(description="Scrape product details from Pacific Giftware")
     parser.add_argument("input", help="Path to the input CSV or Excel file with item numbers")
     parser.add_argument("output", help="Path to the output CSV file")
     parser.add_argument("--headless", action="store_true", help="Run browser in headless mode")
-    args = parser.parse_args()
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of browser sessions to scrape with in parallel (default: 1)")
+    parser.add_argument("--http", action="store_true",
+                        help="Log in with the browser once, then fetch product pages over plain HTTP; "
+                             "pages rendered client-side are scraped in the browser instead")
+    parser.add_argument("--block", choices=["none", "text+xhr", "text-only"], default="none",
+                        help="Stop the browser loading images, fonts, media and trackers (default: none)")
+    parser.add_argument("--capture", action="store_true",
+                        help="Read product data from the page's JSON responses instead of the rendered HTML")
+    parser.add_argument("--api", action="store_true",
+                        help="Query the product JSON API directly instead of loading pages "
+                             "(needs --api-product-path)")
+    parser.add_argument("--api-product-path", default=os.environ.get("PACIFIC_API_PRODUCT_PATH"),
+                        help="Product endpoint path for --api, with {item} for the item number, "
+                             "as seen in a --capture run (default: $PACIFIC_API_PRODUCT_PATH)")
+    parser.add_argument("--api-batch-path", default=os.environ.get("PACIFIC_API_BATCH_PATH"),
+                        help="Batch endpoint path for --api, if any (default: $PACIFIC_API_BATCH_PATH)")
+    parser.add_argument("--attach", action="store_true",
+                        help="Use the long-lived browser from browser_host.py instead of starting a new one")
+    parser.add_argument("--recycle-pages", type=int, default=500,
+                        help="Restart the browser after this many pages, 0 to never (default: 500)")
+    parser.add_argument("--recycle-mb", type=float, default=1500,
+                        help="Restart the browser when it uses more memory than this, 0 to never (default: 1500)")
+    parser.add_argument("--tabs", type=int, default=1,
+                        help="Load this many product pages at once in separate tabs (default: 1)")
+    parser.add_argument("--parse-workers", type=int, default=0,
+                        help="Parse pages in this many separate processes (default: 0, parse in place)")
+    parser.add_argument("--parser", choices=["html.parser", "lxml", "selectolax"], default="html.parser",
+                        help="HTML parser used to extract product details (default: html.parser)")
+    parser.add_argument("--cache-hours", type=float, default=24,
+                        help="Reuse products scraped within this many hours, 0 to re-scrape all (default: 24)")
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor update the product cache")
+    parser.add_argument("--cache-only", action="store_true",
+                        help="Do not scrape; write cached products only, whatever their age")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted run, skipping the items it already finished")
+    args = parser.parse_args(argv)
+    if args.api and not args.api_product_path:
+        parser.error("--api needs --api-product-path (or PACIFIC_API_PRODUCT_PATH); "
+                     "read the product endpoint off a --capture run")
+    from result_sinks import sink_type
 
-    process_items(args.input, args.output, headless=args.headless)
\ No newline at end of file
+    try:
+        sink_type(args.output)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    try:
+        process_items(args.input, args.output, headless=args.headless, workers=args.workers, http=args.http,
+                      block=args.block, capture=args.capture, api=args.api,
+                      api_product_path=args.api_product_path, api_batch_path=args.api_batch_path, attach=args.attach,
+                      recycle_pages=args.recycle_pages, recycle_mb=args.recycle_mb or None, tabs=args.tabs,
+                      parse_workers=args.parse_workers, parser=args.parser,
+                      cache_hours=None if args.no_cache else args.cache_hours, cache_only=args.cache_only,
+                      resume=args.resume)
+    except KeyboardInterrupt:
+        return 130
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
\ No newline at end of file
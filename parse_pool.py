@@ -0,0 +1,88 @@
+"""
+parse_pool.py
+-------------
+
+Parse product pages in worker processes.
+
+:func:`pacificgiftware_scraper.parse_product_html` builds a full
+BeautifulSoup tree for every page.  That is pure-Python, CPU-bound work
+which holds the GIL.  When several browser sessions
+(:mod:`driver_pool`) or HTTP threads (:mod:`http_handoff`) run in one
+process, their parsing is serialised behind the GIL, however many cores
+the machine has.
+
+:class:`ParsePool` moves that stage into a
+:class:`~concurrent.futures.ProcessPoolExecutor`.  Scraper threads hand
+it the raw HTML and get a :class:`~pacificgiftware_scraper.ProductInfo`
+back.  The synchronous :meth:`ParsePool.parse` blocks only the calling
+thread.  :meth:`ParsePool.submit` returns a future, so a caller such as
+:mod:`tab_pipeline` can keep navigating while pages are parsed.
+
+Workers are started with the ``spawn`` method.  Forking a process that
+already runs browser threads can deadlock the child on locks those
+threads held.  Each worker imports the scraper module once, when it
+starts.
+
+Example
+-------
+::
+
+    from parse_pool import ParsePool
+
+    with ParsePool(4) as parser:
+        info = parser.parse(driver.page_source, "12238")
+
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Optional
+
+
+def _parse(html: str, item_number: str, parser: str) -> Any:
+    from pacificgiftware_scraper import parse_product_html
+
+    return parse_product_html(html, item_number, parser)
+
+
+class ParsePool:
+    """
+    A process pool that turns product page HTML into ``ProductInfo``.
+
+    Parameters
+    ----------
+    workers : int, optional
+        Number of parser processes.  Defaults to the number of CPUs.
+    parser : str, optional
+        Extraction backend passed to
+        :func:`pacificgiftware_scraper.parse_product_html`.
+    """
+
+    def __init__(self, workers: Optional[int] = None, parser: str = "html.parser") -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.parser = parser
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def submit(self, html: str, item_number: str) -> "Future[Any]":
+        """Queue one page for parsing and return its future."""
+        return self._executor.submit(_parse, html, item_number, self.parser)
+
+    def parse(self, html: str, item_number: str) -> Any:
+        """Parse one page in a worker process and wait for the result."""
+        return self.submit(html, item_number).result()
+
+    def close(self) -> None:
+        """Stop the worker processes once queued pages are parsed."""
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "ParsePool":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
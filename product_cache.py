@@ -0,0 +1,413 @@
+"""
+product_cache.py
+----------------
+
+A local product cache, so that repeat runs only scrape what changed.
+
+Every run scraped every SKU from scratch, even ones fetched an hour
+earlier, and customer sheets overlap heavily.  :class:`ProductCache`
+keeps the last good result per item in a SQLite file: name, price,
+case quantity, URL and the time it was fetched.  Keys are the
+canonical item numbers of :mod:`item_keys`, so ``Y7282`` and ``7282``
+share an entry.  A small in-memory LRU tier sits in front of SQLite
+for the lookups a run repeats.
+
+The drivers read through it.  Items fetched within ``max_age_hours``
+come from the cache, and only the rest are scraped and stored.  Each
+run chooses its own freshness; ``0`` forces a full re-scrape that
+still refreshes the cache.  ``--cache-only`` never opens a browser:
+items without a cache entry come back empty.  Only products that were
+found with a price are stored.  Failed lookups, and pages scraped
+while logged out (no price, or "Login required for pricing"), are
+scraped again on the next run.
+
+The HTTP fetchers also keep each page's validators (``ETag`` and
+``Last-Modified``) here, next to the result parsed from that page.  On
+the next fetch they send ``If-None-Match`` / ``If-Modified-Since``
+(see :meth:`ProductCache.page` and :meth:`CachedPage.headers`).  A
+``304 Not Modified`` reuses the stored result, so refreshing an
+unchanged catalogue costs one exchange of headers per item, with no
+page download and no parsing.  Pages are stored per ``kind`` of
+result, because the anonymous and the logged-in fetchers parse the
+same URL differently.  The fetchers only store, and only revalidate,
+pages whose HTML itself carried the product data.  For the
+client-rendered shell the validators say nothing about the price that
+is loaded afterwards, so a 304 for it must not be trusted.
+
+Result CSVs from earlier runs can seed the cache::
+
+    python product_cache.py import Final_Authenticated_Results.csv working_results.csv
+    python product_cache.py stats
+
+The file defaults to ``.pacific_cache.sqlite`` in the working directory
+and can be moved with the ``PACIFIC_CACHE_FILE`` environment variable.
+
+Example
+-------
+::
+
+    from product_cache import ProductCache
+
+    cache = ProductCache(max_age_hours=24)
+    hits = cache.lookup(["12238", "Y7282"])
+    for item in (i for i in ["12238", "Y7282"] if i not in hits):
+        ...
+        cache.put(item, name, price, case_quantity, url)
+
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from item_keys import canonical_key
+
+DEFAULT_CACHE_FILE = os.environ.get("PACIFIC_CACHE_FILE", ".pacific_cache.sqlite")
+DEFAULT_MAX_AGE_HOURS = 24.0
+DEFAULT_MEMORY_ITEMS = 4096
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    item TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    price TEXT,
+    case_quantity TEXT,
+    url TEXT,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    result TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (url, kind)
+);
+"""
+
+# Values the legacy scrapers write when a field was not found.
+_NOT_FOUND = {
+    "", "nan", "n/a", "not found", "not available", "not specified", "error", "login required",
+    "login required for pricing", "name not found", "name not available", "price not found",
+    "case info not found", "item not found",
+}
+
+# Result CSV headers, as written by the different scrapers.
+_COLUMNS = {
+    "item": ("Item Number", "Item", "SKU"),
+    "name": ("Product Name", "Name"),
+    "price": ("Unit Price", "Price"),
+    "case_quantity": ("Case Quantity", "Case Qty"),
+    "url": ("URL",),
+}
+
+
+def _value(text: Any) -> Optional[str]:
+    """``text`` as a field value, or ``None`` for a not-found marker."""
+    if text is None:
+        return None
+    text = str(text).strip()
+    return None if text.lower() in _NOT_FOUND else text
+
+
+@dataclass(frozen=True)
+class CachedProduct:
+    """One cached product."""
+
+    item: str
+    name: str
+    price: Optional[str]
+    case_quantity: Optional[str]
+    url: Optional[str]
+    fetched_at: float
+
+    @property
+    def age_hours(self) -> float:
+        return (time.time() - self.fetched_at) / 3600
+
+
+@dataclass(frozen=True)
+class CachedPage:
+    """A fetched page's validators and the result parsed from it."""
+
+    url: str
+    kind: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    result: Dict[str, Any]
+    fetched_at: float
+
+    def headers(self) -> Dict[str, str]:
+        """Request headers that ask the server to skip an unchanged page."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def validator_headers(page: Optional[CachedPage]) -> Dict[str, str]:
+    """:meth:`CachedPage.headers`, or no headers without a cached page."""
+    return page.headers() if page is not None else {}
+
+
+class ProductCache:
+    """
+    SQLite product cache with an in-memory LRU tier.
+
+    Parameters
+    ----------
+    path : str, optional
+        Location of the SQLite file.
+    max_age_hours : float, optional
+        Entries older than this are treated as missing.  ``0`` ignores
+        the cache for reads (but still writes fresh results to it);
+        ``None`` accepts entries of any age.
+    memory_items : int, optional
+        Size of the in-memory tier.
+
+    The cache may be shared by the threads of one process.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_FILE,
+        max_age_hours: Optional[float] = DEFAULT_MAX_AGE_HOURS,
+        memory_items: int = DEFAULT_MEMORY_ITEMS,
+    ) -> None:
+        self.path = path
+        self.max_age = None if max_age_hours is None else max_age_hours * 3600
+        self.memory_items = memory_items
+        self._memory: "OrderedDict[str, CachedProduct]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    def _fresh(self, product: Optional[CachedProduct]) -> bool:
+        if product is None or self.max_age == 0:
+            return False
+        return self.max_age is None or time.time() - product.fetched_at <= self.max_age
+
+    def _remember(self, product: CachedProduct) -> None:
+        self._memory[product.item] = product
+        self._memory.move_to_end(product.item)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _read(self, keys: List[str]) -> Dict[str, CachedProduct]:
+        """Load ``keys`` from memory, then SQLite; caller holds the lock."""
+        found = {}
+        missing = []
+        for key in keys:
+            product = self._memory.get(key)
+            if product is not None:
+                self._memory.move_to_end(key)
+                found[key] = product
+            else:
+                missing.append(key)
+        # SQLite limits the number of bound parameters per statement.
+        for start in range(0, len(missing), 500):
+            chunk = missing[start:start + 500]
+            rows = self._db.execute(
+                "SELECT item, name, price, case_quantity, url, fetched_at FROM products"
+                f" WHERE item IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+            for row in rows:
+                product = CachedProduct(*row)
+                self._remember(product)
+                found[product.item] = product
+        return found
+
+    def get(self, item_number: Any) -> Optional[CachedProduct]:
+        """The fresh cached product for ``item_number``, if any."""
+        return self.lookup([item_number]).get(str(item_number))
+
+    def lookup(self, item_numbers: Iterable[Any]) -> Dict[str, CachedProduct]:
+        """
+        Return the fresh cached products of ``item_numbers``.
+
+        The result is keyed by the item numbers as given; items without
+        a fresh entry with a price are left out.
+        """
+        items = [str(item) for item in item_numbers]
+        keys = {item: canonical_key(item) for item in items}
+        with self._lock:
+            found = self._read(sorted({key for key in keys.values() if key}))
+        hits = {}
+        for item in items:
+            product = found.get(keys[item]) if keys[item] else None
+            # Entries written before prices were required are ignored.
+            if self._fresh(product) and product.price is not None:
+                hits[item] = product
+        self.hits += len(hits)
+        self.misses += len(items) - len(hits)
+        return hits
+
+    def put(
+        self,
+        item_number: Any,
+        name: Optional[str],
+        price: Optional[str] = None,
+        case_quantity: Optional[str] = None,
+        url: Optional[str] = None,
+        fetched_at: Optional[float] = None,
+    ) -> bool:
+        """
+        Store one product; returns ``False`` if it was not stored.
+
+        Not-found markers such as ``"Not found"`` or ``"Login required"``
+        are stored as empty fields.  A product without a name or a price
+        is not stored at all: without a price it was scraped logged out
+        (or the price failed to load), and the next run must scrape it
+        again.  An older ``fetched_at`` never replaces a newer entry.
+        """
+        key = canonical_key(item_number)
+        name = _value(name)
+        price = _value(price)
+        if key is None or name is None or price is None:
+            return False
+        product = CachedProduct(
+            key, name, price, _value(case_quantity), _value(url),
+            time.time() if fetched_at is None else fetched_at,
+        )
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO products VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(item) DO UPDATE SET name=excluded.name, price=excluded.price,"
+                " case_quantity=excluded.case_quantity, url=excluded.url, fetched_at=excluded.fetched_at"
+                " WHERE excluded.fetched_at >= products.fetched_at",
+                (product.item, product.name, product.price, product.case_quantity, product.url, product.fetched_at),
+            )
+            self._db.commit()
+            self._memory.pop(key, None)
+        return True
+
+    def page(self, url: str, kind: str) -> Optional[CachedPage]:
+        """The stored validators and result of ``url``, if any."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT url, kind, etag, last_modified, result, fetched_at FROM pages WHERE url = ? AND kind = ?",
+                (url, kind),
+            ).fetchone()
+        if row is None:
+            return None
+        url, kind, etag, last_modified, result, fetched_at = row
+        return CachedPage(url, kind, etag, last_modified, json.loads(result), fetched_at)
+
+    def put_page(self, url: str, kind: str, headers: Mapping[str, str], result: Dict[str, Any]) -> bool:
+        """
+        Store the validators from response ``headers`` with ``result``.
+
+        Returns ``False`` (and stores nothing) if the response carried
+        neither an ``ETag`` nor a ``Last-Modified`` header.
+        """
+        etag, last_modified = headers.get("ETag"), headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return False
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+                (url, kind, etag, last_modified, json.dumps(result), time.time()),
+            )
+            self._db.commit()
+        return True
+
+    def touch_page(self, url: str, kind: str) -> None:
+        """Record that ``url`` was confirmed unchanged (a 304)."""
+        with self._lock:
+            self._db.execute("UPDATE pages SET fetched_at = ? WHERE url = ? AND kind = ?", (time.time(), url, kind))
+            self._db.commit()
+            self.revalidated += 1
+
+    def import_csv(self, path: str) -> int:
+        """
+        Seed the cache from a result CSV written by one of the scrapers.
+
+        Rows are dated by the file's modification time.  Returns the
+        number of products stored.
+        """
+        fetched_at = os.path.getmtime(path)
+        stored = 0
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            # Headers differ in case and stray spaces between scripts.
+            headers = {name.strip().lower(): name for name in reader.fieldnames or []}
+            columns = {
+                field: next((headers[name.lower()] for name in names if name.lower() in headers), None)
+                for field, names in _COLUMNS.items()
+            }
+            if columns["item"] is None or columns["name"] is None:
+                return 0
+            for row in reader:
+                values = {field: row.get(column) if column else None for field, column in columns.items()}
+                item = values.pop("item")
+                stored += self.put(item, fetched_at=fetched_at, **values)
+        return stored
+
+    def stats(self) -> str:
+        """One-line summary of the cache contents."""
+        with self._lock:
+            count, oldest, newest = self._db.execute(
+                "SELECT COUNT(*), MIN(fetched_at), MAX(fetched_at) FROM products"
+            ).fetchone()
+        if not count:
+            return f"{self.path}: empty"
+        now = time.time()
+        return (f"{self.path}: {count} products, newest {(now - newest) / 3600:.1f}h old, "
+                f"oldest {(now - oldest) / 3600:.1f}h old")
+
+    def report(self) -> str:
+        """Hits and misses of this run."""
+        report = f"Product cache: {self.hits} hit(s), {self.misses} miss(es)"
+        if self.revalidated:
+            report += f", {self.revalidated} page(s) unchanged (304)"
+        return report
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self) -> "ProductCache":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or seed the local product cache.")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_FILE, help="Cache file (default: %(default)s).")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="Show how many products are cached.")
+    seed = commands.add_parser("import", help="Load products from earlier result CSVs.")
+    seed.add_argument("files", nargs="+")
+    args = parser.parse_args(argv)
+
+    with ProductCache(args.cache) as cache:
+        if args.command == "import":
+            for path in args.files:
+                print(f"{path}: {cache.import_csv(path)} products")
+        print(cache.stats())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
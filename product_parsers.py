@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+product_parsers.py
+------------------
+
+Interchangeable HTML backends for product page extraction.
+
+:func:`pacificgiftware_scraper.parse_product_html` builds a full
+BeautifulSoup tree with Python's ``html.parser`` and then walks every
+string in it twice (once for a ``'$'`` and once for the ``Notes:``
+label).  That code stays the reference implementation.  This module
+adds two faster backends that apply exactly the same rules:
+
+``lxml``
+    libxml2 builds the tree.  The candidate strings are selected by
+    precompiled XPath expressions evaluated in C, so Python only looks
+    at the few strings that contain ``'$'`` or ``notes:``.
+``selectolax``
+    The lexbor HTML5 parser builds the tree, and a single document-order
+    walk stops as soon as both the price and the notes label are found.
+
+Choose a backend with ``parse_product_html(html, item, parser=...)`` or
+the ``--parser`` option of ``pacificgiftware_scraper.py``.  Both fast
+backends are optional dependencies (``pip install lxml selectolax``).
+
+The rules being reproduced
+~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+* The name is the text of the first ``<h1>``, each string stripped and
+  joined with no separator.
+* The price is the first string in document order that contains
+  ``'$'``, whose parent is not ``<script>``/``<style>``, and which,
+  once stripped, starts with ``'$'`` and contains a digit.  Comments
+  count as strings.
+* The notes are the text of the element after the parent of the first
+  string that reads ``notes:`` (stripped, case-insensitive).  Each
+  string is stripped, and the non-empty ones are joined with newlines.
+* Like BeautifulSoup's ``get_text``, text inside ``<script>``,
+  ``<style>``, ``<template>``, ``<rt>`` and ``<rp>`` and in comments is
+  not part of an element's text.
+
+Different parsers can build different trees from broken markup.
+:func:`check_parity` runs every installed backend over a corpus and
+reports any page where a result differs from the reference.
+:func:`sample_pages` provides a built-in corpus modelled on the product
+page, and saved page sources can be added to it::
+
+    python product_parsers.py                      # parity on the built-in corpus
+    python product_parsers.py saved/*.html --bench 200
+
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+REFERENCE = "html.parser"
+
+# Strings inside these elements are not part of an element's text
+# (BeautifulSoup keeps them as Script, Stylesheet, TemplateString... types).
+_NON_TEXT = ("script", "style", "template", "rt", "rp")
+# A '$' string whose parent is one of these is never a price.
+_NOT_PRICE = ("script", "style")
+
+ParserFunc = Callable[[str, str], Any]
+
+
+def _product(item_number: str, name: str, price: Optional[str], notes_text: Optional[str]) -> Any:
+    from pacificgiftware_scraper import ProductInfo, extract_case_quantity_from_notes
+
+    return ProductInfo(
+        item_number=item_number,
+        product_name=name,
+        unit_price=price,
+        case_quantity=extract_case_quantity_from_notes(notes_text) if notes_text is not None else None,
+    )
+
+
+def _is_price(text: str) -> bool:
+    return text.startswith("$") and any(ch.isdigit() for ch in text)
+
+
+def parse_with_reference(html: str, item_number: str) -> Any:
+    """The ``html.parser`` + BeautifulSoup reference implementation."""
+    from pacificgiftware_scraper import parse_product_html
+
+    return parse_product_html(html, item_number)
+
+
+# -- lxml ----------------------------------------------------------------
+
+_lxml_xpaths: Dict[str, Any] = {}
+
+
+def _lxml_xpath(name: str) -> Any:
+    """Compile the XPath expressions once, on first use."""
+    if not _lxml_xpaths:
+        from lxml import etree
+
+        skip = " or ".join(f"ancestor::{tag}" for tag in _NON_TEXT)
+        _lxml_xpaths.update(
+            first_h1=etree.XPath("(//h1)[1]"),
+            dollar=etree.XPath("//text()[contains(., '$')] | //comment()[contains(., '$')]"),
+            notes=etree.XPath(
+                "//text()[contains(translate(., 'NOTES', 'notes'), 'notes:')]"
+                " | //comment()[contains(translate(., 'NOTES', 'notes'), 'notes:')]"
+            ),
+            next_element=etree.XPath("following-sibling::*[1]"),
+            text=etree.XPath(f".//text()[not({skip})]"),
+        )
+    return _lxml_xpaths[name]
+
+
+def _lxml_string(node: Any) -> Tuple[str, Any]:
+    """Return ``(text, parent element)`` of a text or comment node."""
+    if isinstance(node, str):
+        parent = node.getparent()
+        # lxml reports the element a tail belongs to, not the parent.
+        if node.is_tail:
+            parent = parent.getparent()
+        return str(node), parent
+    return node.text or "", node.getparent()
+
+
+def _lxml_text(element: Any, separator: str) -> str:
+    parts = (text.strip() for text in _lxml_xpath("text")(element))
+    return separator.join(part for part in parts if part)
+
+
+def parse_with_lxml(html: str, item_number: str) -> Any:
+    """Extract a product with lxml and precompiled XPath."""
+    from lxml import etree, html as lxml_html
+
+    try:
+        root = lxml_html.document_fromstring(html)
+    except etree.ParserError:
+        # An empty or whitespace-only page; the reference finds nothing in it.
+        return _product(item_number, "", None, None)
+
+    h1 = _lxml_xpath("first_h1")(root)
+    name = _lxml_text(h1[0], "") if h1 else ""
+
+    price = None
+    for node in _lxml_xpath("dollar")(root):
+        text, parent = _lxml_string(node)
+        if parent is not None and parent.tag in _NOT_PRICE:
+            continue
+        if _is_price(text.strip()):
+            price = text.strip()
+            break
+
+    notes_text = None
+    for node in _lxml_xpath("notes")(root):
+        text, parent = _lxml_string(node)
+        if text.strip().lower() == "notes:":
+            container = _lxml_xpath("next_element")(parent) if parent is not None else []
+            notes_text = _lxml_text(container[0], "\n") if container else ""
+            break
+
+    return _product(item_number, name, price, notes_text)
+
+
+# -- selectolax ----------------------------------------------------------
+
+def _lexbor_walk(root: Any, template: Any = None) -> Iterator[Tuple[Any, Optional[str], Any]]:
+    """
+    Yield ``(node, text, parent)`` for every node under ``root`` in
+    document order; ``text`` is ``None`` for elements.
+
+    An HTML5 parser moves ``<template>`` content out of the document,
+    while ``html.parser`` keeps it inline.  Template content is therefore
+    re-parsed and walked in place, with ``template`` as the parent of its
+    top-level nodes.
+    """
+    from selectolax.lexbor import LexborHTMLParser
+
+    for node in root.traverse(include_text=True):
+        parent = node.parent
+        if template is not None and parent is not None and parent.mem_id == root.mem_id:
+            parent = template
+        if node.is_text_node:
+            yield node, node.text_content or "", parent
+        elif node.is_comment_node:
+            yield node, node.comment_content or "", parent
+        elif node.is_element_node:
+            yield node, None, parent
+            if node.tag == "template":
+                markup = node.html or ""
+                content = markup[markup.find(">") + 1:markup.rfind("<")]
+                fragment = LexborHTMLParser(f"<body>{content}</body>").body
+                if fragment is not None:
+                    for child in _lexbor_walk(fragment, node):
+                        if child[0].mem_id != fragment.mem_id:
+                            yield child
+
+
+def _lexbor_text(element: Any, separator: str) -> str:
+    parts = []
+    for node in element.traverse(include_text=True):
+        if not node.is_text_node:
+            continue
+        ancestor, skip = node.parent, False
+        while ancestor is not None:
+            if ancestor.tag in _NON_TEXT:
+                skip = True
+                break
+            ancestor = ancestor.parent
+        text = (node.text_content or "").strip()
+        if text and not skip:
+            parts.append(text)
+    return separator.join(parts)
+
+
+def _lexbor_next_element(node: Any) -> Any:
+    sibling = node.next
+    while sibling is not None and not sibling.is_element_node:
+        sibling = sibling.next
+    return sibling
+
+
+def parse_with_selectolax(html: str, item_number: str) -> Any:
+    """Extract a product with selectolax's lexbor parser in one walk."""
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(html)
+
+    name = None
+    price = None
+    notes_text = None
+    for node, text, parent in _lexbor_walk(tree.root) if tree.root is not None else ():
+        if text is None:
+            if name is None and node.tag == "h1":
+                # An <h1> in template content has no text of its own.
+                name = _lexbor_text(node, "") if node.parser is tree else ""
+            continue
+        stripped = text.strip()
+        if price is None and "$" in text:
+            if (parent is None or parent.tag not in _NOT_PRICE) and _is_price(stripped):
+                price = stripped
+        if notes_text is None and stripped.lower() == "notes:":
+            container = _lexbor_next_element(parent) if parent is not None else None
+            notes_text = _lexbor_text(container, "\n") if container is not None else ""
+        if name is not None and price is not None and notes_text is not None:
+            break
+
+    return _product(item_number, name or "", price, notes_text)
+
+
+PARSERS: Dict[str, ParserFunc] = {
+    REFERENCE: parse_with_reference,
+    "lxml": parse_with_lxml,
+    "selectolax": parse_with_selectolax,
+}
+
+_REQUIREMENTS = {"lxml": "lxml", "selectolax": "selectolax.lexbor"}
+
+
+def available_parsers() -> List[str]:
+    """Names of the backends whose libraries are installed."""
+    import importlib.util
+
+    names = []
+    for name in PARSERS:
+        module = _REQUIREMENTS.get(name)
+        try:
+            if module is None or importlib.util.find_spec(module) is not None:
+                names.append(name)
+        except ImportError:
+            pass
+    return names
+
+
+def get_parser(name: str) -> ParserFunc:
+    """
+    Return the extraction function of backend ``name``.
+
+    Raises
+    ------
+    ValueError
+        If ``name`` is not a known backend.
+    """
+    try:
+        return PARSERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown parser '{name}'. Choose from: {', '.join(PARSERS)}") from None
+
+
+def sample_pages() -> Dict[str, str]:
+    """
+    A small built-in corpus of product pages covering the cases the
+    extraction rules distinguish: priced and unpriced pages, prices in
+    scripts and comments, nested title markup, missing or empty notes,
+    entities and non-breaking spaces.
+    """
+    def page(body: str, head: str = "") -> str:
+        return (
+            "<!DOCTYPE html><html><head><meta charset='utf-8'><title>Pacific Giftware</title>"
+            f"{head}</head><body><div id='root'>{body}</div></body></html>"
+        )
+
+    def card(title: str, price: str, notes: str) -> str:
+        return (
+            "<div class='MuiContainer-root'><div class='MuiGrid-root MuiGrid-container'>"
+            f"<div class='MuiGrid-item'><h1 class='MuiTypography-root MuiTypography-h4'>{title}</h1>"
+            f"{price}{notes}</div></div></div>"
+        )
+
+    price = "<h5 class='MuiTypography-root MuiTypography-h5'>$24.95</h5>"
+    notes = (
+        "<div class='MuiBox-root'><p class='MuiTypography-root'>Notes:</p>"
+        "<div class='MuiBox-root'><p>Hand painted resin.</p><p>CASE PACK: 12</p></div></div>"
+    )
+    return {
+        "logged_in": page(card("MEDIEVAL DRAGON STATUE 12238", price, notes)),
+        "logged_out": page(card("MEDIEVAL DRAGON STATUE 12238", "<button>Login to see price</button>", notes)),
+        "price_in_script": page(
+            card("FAIRY GARDEN HOUSE", price, notes),
+            head="<script>window.__STATE__ = {price: '$99.00'};</script><style>.x:before{content:'$1'}</style>",
+        ),
+        "price_in_comment": page("<!-- $5.00 promo -->" + card("OWL FIGURINE", price, notes)),
+        "price_with_spaces": page(card("WOLF PLAQUE", "<span>\n  $ 12.50 </span><span>$12.50</span>", notes)),
+        "dollar_without_digits": page(card("SKULL BOX", "<span>$</span><span>Price: $8</span><b>$8.00</b>", notes)),
+        "nested_title": page(card(" STEAMPUNK <b>OWL</b>\n<small>Y7282</small><script>t=1</script>", price, notes)),
+        "no_notes": page(card("GARGOYLE", price, "")),
+        "notes_without_case_pack": page(card(
+            "ANGEL", price,
+            "<div><span> NOTES: </span><div><p>Gift boxed</p></div></div>",
+        )),
+        "notes_label_last": page(card("BAST CAT", price, "<div><span>Notes:</span></div>")),
+        "notes_label_in_comment": page(card(
+            "ANUBIS", price, "<div><!--Notes:--><p>CASE PACK: 6</p></div>",
+        )),
+        "case_pack_variants": page(card(
+            "MERMAID",
+            price,
+            "<div><p>Notes:</p><div>MATERIAL: RESIN<br>CASE PACK - 24 PCS<br>CASE PACK: 36</div></div>",
+        )),
+        "entities": page(card(
+            "TREE&nbsp;OF&nbsp;LIFE &amp; MOON", "<p>&#36;7.25&nbsp;</p>",
+            "<div><p>Notes:&nbsp;</p><div><p>CASE&nbsp;PACK: 48</p></div></div>",
+        )),
+        "no_title": page("<div><p>Product not found</p></div>"),
+        "title_in_template": page("<template><h1>$1.00 TEMPLATE</h1></template>" + card("HYDRA", price, notes)),
+        "ruby_and_template": page(card(
+            "<ruby>DRAGON<rt>doragon</rt></ruby> EGG<template>$3.00</template>", price, notes,
+        )),
+    }
+
+
+def check_parity(
+    pages: Dict[str, str],
+    parsers: Optional[Iterable[str]] = None,
+    item_number: str = "0",
+) -> List[Tuple[str, str, Any, Any]]:
+    """
+    Compare every backend with the reference on ``pages``.
+
+    Returns a list of ``(page, parser, expected, actual)`` mismatches;
+    an empty list means every backend agrees on every page.
+    """
+    names = [name for name in (parsers or available_parsers()) if name != REFERENCE]
+    mismatches = []
+    for page_name, html in pages.items():
+        expected = parse_with_reference(html, item_number)
+        for name in names:
+            actual = get_parser(name)(html, item_number)
+            if actual != expected:
+                mismatches.append((page_name, name, expected, actual))
+    return mismatches
+
+
+def benchmark(pages: Dict[str, str], repeat: int = 50, parsers: Optional[Iterable[str]] = None) -> Dict[str, float]:
+    """Return the mean milliseconds per page of each backend."""
+    results = {}
+    for name in parsers or available_parsers():
+        parse = get_parser(name)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for html in pages.values():
+                parse(html, "0")
+        results[name] = (time.perf_counter() - start) * 1000 / (repeat * len(pages))
+    return results
+
+
+def main() -> None:
+    import argparse
+    import os
+    import sys
+
+    parser = argparse.ArgumentParser(description="Check that all product page parsers agree")
+    parser.add_argument("pages", nargs="*", help="Saved product page sources to add to the built-in corpus")
+    parser.add_argument("--bench", type=int, metavar="N", help="Also time each parser over N passes")
+    args = parser.parse_args()
+
+    pages = sample_pages()
+    for path in args.pages:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            pages[os.path.basename(path)] = f.read()
+
+    names = available_parsers()
+    missing = [name for name in PARSERS if name not in names]
+    print(f"Parsers: {', '.join(names)}" + (f" (not installed: {', '.join(missing)})" if missing else ""))
+
+    mismatches = check_parity(pages, names)
+    for page_name, name, expected, actual in mismatches:
+        print(f"MISMATCH {page_name} [{name}]\n  expected {expected}\n  actual   {actual}")
+    print(f"{len(pages)} pages, {len(mismatches)} mismatch(es)")
+
+    if args.bench:
+        for name, ms in benchmark(pages, args.bench, names).items():
+            print(f"{name:>12}: {ms:.3f} ms/page")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -36,7 +36,7 @@ def main():
         )
         
         if result:
-            results, folder_path = result
+            files, folder_path = result
             print(f"\n✅ Success! Results saved to: {folder_path}")
         else:
             print("❌ Scraping failed")
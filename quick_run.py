@@ -36,7 +36,7 @@ def check_credentials():
     print(f"✓ Login email set: {email}")
     return True
 
-def run_scraper(input_file, output_file):
+def run_scraper(input_file, output_file, attach=False):
     """Run the Pacific Giftware scraper"""
     
     if not os.path.exists(input_file):
@@ -48,6 +48,12 @@ def run_scraper(input_file, output_file):
     
     # Run the scraper
     cmd = f"python scripts/final_scraper.py {input_file} {output_file}"
+    if attach:
+        # Keep one browser running between runs to skip the cold start
+        from browser_host import start_host
+        state = start_host()
+        print(f"✓ Using browser host on port {state['port']}")
+        cmd += " --attach"
     print(f"Running: {cmd}")
     
     result = os.system(cmd)
@@ -140,6 +146,9 @@ def main():
         print("2. python quick_run.py your_items.csv      # Run with your CSV file")
         print("3. python quick_run.py setup               # Create sample CSV file")
         print()
+        print("Add --attach to reuse one long-running browser between runs")
+        print("(stop it with: python browser_host.py stop)")
+        print()
         print("Your CSV file should have this format:")
         print("Item Number")
         print("Y7282")
@@ -147,7 +156,12 @@ def main():
         print("8791")
         return
     
-    command = sys.argv[1]
+    attach = "--attach" in sys.argv[1:]
+    args = [arg for arg in sys.argv[1:] if arg != "--attach"]
+    if not args:
+        print("Missing command; run without arguments for usage")
+        return
+    command = args[0]
     
     if command == "setup":
         create_sample_csv()
@@ -178,7 +192,7 @@ def main():
     print()
     
     # Run the scraper
-    success = run_scraper(input_file, output_file)
+    success = run_scraper(input_file, output_file, attach=attach)
     
     if success:
         # Show results
@@ -0,0 +1,218 @@
+"""
+readiness.py
+------------
+
+Event-driven page readiness checks that replace fixed ``time.sleep``
+calls after ``driver.get``.
+
+The product page is a client-rendered Material‑UI app.  The scrapers
+used to sleep for a fixed 2–4 seconds after every navigation, which is
+far longer than a warm browser needs once the product card has
+rendered.  :func:`wait_until_ready` instead polls a set of named
+predicates, evaluated together in a single ``execute_script`` call, and
+returns as soon as all required predicates hold or the page shows a
+"not found" state.  It then calls ``window.stop()`` so that images,
+fonts and trackers still in flight do not hold up the next navigation.
+
+Predicates
+~~~~~~~~~~
+
+``title``
+    The ``<h1>`` product title has text.
+``price``
+    A Material‑UI typography element shows a dollar amount.
+``notes``
+    The "Notes:" block (or a ``CASE PACK`` line) has been rendered.
+``not_found``
+    The page reports that the product does not exist.  This one is
+    always checked and ends the wait immediately.
+
+Drivers should be created with ``page_load_strategy = "eager"`` so that
+``driver.get`` returns at ``DOMContentLoaded`` instead of waiting for
+every sub-resource; :func:`use_eager_loading` applies that to a
+``ChromeOptions`` object.
+
+Every wait is recorded in :data:`timings`, so a run can report how long
+pages actually took to become ready.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Each predicate is the body of a JavaScript function returning a boolean.
+PREDICATES: Dict[str, str] = {
+    "title": """
+        var h = document.querySelector('h1');
+        return !!(h && h.textContent.trim());
+    """,
+    "price": """
+        var els = document.querySelectorAll('.MuiTypography-h5, .MuiTypography-root');
+        for (var i = 0; i < els.length; i++) {
+            if (/\\$\\s*\\d/.test(els[i].textContent) && els[i].textContent.length < 30) return true;
+        }
+        return false;
+    """,
+    "notes": """
+        var label = document.evaluate(
+            "//*[normalize-space(text())='Notes:']", document, null,
+            XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        if (label && label.nextElementSibling && label.nextElementSibling.textContent.trim()) return true;
+        return !!document.evaluate(
+            "//*[contains(translate(text(), 'casepk', 'CASEPK'), 'CASE PACK')]", document, null,
+            XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    """,
+    "not_found": """
+        if (/not found|404/i.test(document.title)) return true;
+        var h = document.querySelector('h1');
+        return !!(h && /not found/i.test(h.textContent));
+    """,
+}
+
+# Returns "not_found", "ready" or null for the required predicate names
+# passed as ``arguments[0]``.
+_READY_SCRIPT = (
+    "var checks = {"
+    + ",".join(f"{name}: function() {{ {body} }}" for name, body in PREDICATES.items())
+    + "};"
+    """
+    if (checks.not_found()) return 'not_found';
+    var required = arguments[0];
+    for (var i = 0; i < required.length; i++) {
+        if (!checks[required[i]]()) return null;
+    }
+    return 'ready';
+    """
+)
+
+
+class WaitTimings:
+    """Thread-safe record of how long each readiness wait took."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._records: List[Tuple[str, Optional[str], float]] = []
+
+    def record(self, page_type: str, state: Optional[str], seconds: float) -> None:
+        with self._lock:
+            self._records.append((page_type, state, seconds))
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Return ``{page_type: {"count", "mean", "max", "timeouts"}}``.
+
+        ``page_type`` is the ``+``-joined list of required predicates,
+        e.g. ``"title+price"``.
+        """
+        with self._lock:
+            records = list(self._records)
+        out: Dict[str, Dict[str, float]] = {}
+        for page_type, state, seconds in records:
+            entry = out.setdefault(page_type, {"count": 0, "mean": 0.0, "max": 0.0, "timeouts": 0})
+            entry["count"] += 1
+            entry["mean"] += seconds
+            entry["max"] = max(entry["max"], seconds)
+            if state is None:
+                entry["timeouts"] += 1
+        for entry in out.values():
+            entry["mean"] /= entry["count"]
+        return out
+
+    def report(self) -> str:
+        """Human-readable one line per page type."""
+        lines = []
+        for page_type, entry in sorted(self.summary().items()):
+            lines.append(
+                f"{page_type}: {int(entry['count'])} waits, mean {entry['mean']:.2f}s, "
+                f"max {entry['max']:.2f}s, {int(entry['timeouts'])} timed out"
+            )
+        return "\n".join(lines)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
+
+
+#: Timings of every :func:`wait_until_ready` call in this process.
+timings = WaitTimings()
+
+
+def use_eager_loading(options: Any) -> Any:
+    """
+    Set the page-load strategy of ``options`` to ``"eager"``.
+
+    ``driver.get`` then returns at ``DOMContentLoaded`` and readiness is
+    decided by :func:`wait_until_ready` rather than by the last image
+    finishing.  Returns ``options`` for convenience.
+    """
+    options.page_load_strategy = "eager"
+    return options
+
+
+def wait_until_ready(
+    driver: Any,
+    require: Iterable[str] = ("title",),
+    timeout: float = 10.0,
+    poll: float = 0.1,
+    stop_loading: bool = True,
+) -> Optional[str]:
+    """
+    Wait until the current page satisfies the ``require`` predicates.
+
+    Parameters
+    ----------
+    driver : webdriver.Chrome
+        Driver that has just navigated to the page.
+    require : Iterable[str], optional
+        Names from :data:`PREDICATES` that must all hold.  The
+        ``not_found`` predicate is always checked as well.
+    timeout : float, optional
+        Maximum number of seconds to wait.  Callers replacing a fixed
+        sleep should pass the old sleep duration so the wait is never
+        slower than before.
+    poll : float, optional
+        Seconds between checks.
+    stop_loading : bool, optional
+        Call ``window.stop()`` once the page is ready so outstanding
+        sub-resources stop loading.
+
+    Returns
+    -------
+    Optional[str]
+        ``"ready"``, ``"not_found"``, or ``None`` if the timeout expired
+        first.  Timeouts are not errors: callers typically go on to
+        scrape whatever has rendered.
+
+    Raises
+    ------
+    ValueError
+        If ``require`` names an unknown predicate.
+    """
+    required = list(require)
+    unknown = [name for name in required if name not in PREDICATES]
+    if unknown:
+        raise ValueError(f"Unknown readiness predicate(s): {', '.join(unknown)}")
+
+    start = time.monotonic()
+    state: Optional[str] = None
+    while True:
+        try:
+            state = driver.execute_script(_READY_SCRIPT, required)
+        except Exception:
+            # The document can be replaced between polls while the
+            # navigation commits; treat that as "not ready yet".
+            state = None
+        if state or time.monotonic() - start >= timeout:
+            break
+        time.sleep(poll)
+    elapsed = time.monotonic() - start
+
+    if state and stop_loading:
+        try:
+            driver.execute_script("window.stop();")
+        except Exception:
+            pass
+    timings.record("+".join(required) or "none", state, elapsed)
+    return state
@@ -0,0 +1,284 @@
+"""
+request_blocking.py
+-------------------
+
+Block images, fonts, media and third-party trackers through the Chrome
+DevTools Protocol.
+
+The scrapers only ever read text, yet every product page load also
+downloads product photos, web fonts and analytics scripts.  Chrome can
+refuse those requests before they leave the browser with
+``Network.setBlockedURLs``.  That saves bandwidth and, because the
+renderer has less to decode and lay out, render time on every page.
+
+Presets
+~~~~~~~
+
+``text+xhr``
+    Blocks images, fonts, media and known trackers.  Scripts,
+    stylesheets and the XHR/fetch calls the app needs still load.
+    This is the safe default.
+``text-only``
+    Everything ``text+xhr`` blocks, plus stylesheets.  Material‑UI
+    injects its styles from JavaScript, so product text still renders,
+    but the page will look unstyled in a visible browser.
+``none``
+    Blocks nothing; useful for comparisons.
+
+Reporting
+~~~~~~~~~
+
+When the driver was created with performance logging enabled (see
+:func:`enable_network_log`), :class:`RequestBlocker` counts the blocked
+requests per resource type and the bytes that actually arrived.  Chrome
+never requests a blocked URL, so its size is unknown; the "bytes saved"
+figure is an estimate from :data:`ESTIMATED_BYTES` per resource type.
+
+Statistics belong to one driver.  Runs that restart their browsers
+(see :mod:`driver_recycling`) fold each driver's counts into a
+:class:`BlockingTotal` before it quits and report that.
+
+Example
+-------
+::
+
+    options = webdriver.ChromeOptions()
+    enable_network_log(options)
+    driver = webdriver.Chrome(options=options)
+    blocker = install(driver, "text+xhr")
+    ...
+    blocker.collect(driver)
+    print(blocker.report())
+
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import weakref
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+IMAGE_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico", "*.bmp",
+]
+FONT_PATTERNS = ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"]
+MEDIA_PATTERNS = ["*.mp4", "*.webm", "*.ogg", "*.mp3", "*.wav", "*.m4a", "*.mov"]
+STYLESHEET_PATTERNS = ["*.css"]
+TRACKER_PATTERNS = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*googleadservices.com*",
+    "*connect.facebook.net*",
+    "*facebook.com/tr*",
+    "*hotjar.com*",
+    "*clarity.ms*",
+    "*bing.com/bat*",
+    "*tiktok.com*",
+    "*klaviyo.com*",
+    "*intercom.io*",
+    "*zendesk.com*",
+    "*tawk.to*",
+]
+
+PRESETS: Dict[str, List[str]] = {
+    "none": [],
+    "text+xhr": IMAGE_PATTERNS + FONT_PATTERNS + MEDIA_PATTERNS + TRACKER_PATTERNS,
+    "text-only": IMAGE_PATTERNS + FONT_PATTERNS + MEDIA_PATTERNS + TRACKER_PATTERNS + STYLESHEET_PATTERNS,
+}
+
+# Rough transfer sizes used to estimate the bytes a blocked request
+# would have cost.  Keys are CDP ``Network.ResourceType`` values.
+ESTIMATED_BYTES: Dict[str, int] = {
+    "Image": 40_000,
+    "Font": 30_000,
+    "Media": 500_000,
+    "Stylesheet": 20_000,
+    "Script": 50_000,
+    "Other": 5_000,
+}
+
+_blockers: "weakref.WeakKeyDictionary[Any, RequestBlocker]" = weakref.WeakKeyDictionary()
+
+
+def enable_network_log(options: Any) -> Any:
+    """
+    Turn on Chrome performance logging in ``options``.
+
+    The performance log carries the DevTools ``Network.*`` events that
+    :meth:`RequestBlocker.collect` counts.  It must be enabled before
+    the driver is created.  Returns ``options`` for convenience.
+    """
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return options
+
+
+def drain_network_events(driver: Any) -> List[Dict[str, Any]]:
+    """
+    Read and clear the driver's performance log.
+
+    Returns the DevTools messages (``{"method": ..., "params": ...}``)
+    of the ``Network`` domain, oldest first.  Reading the log empties
+    it, so code that needs these events must share one drain.
+    """
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return []
+    events = []
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError, TypeError):
+            continue
+        if message.get("method", "").startswith("Network."):
+            events.append(message)
+    return events
+
+
+class RequestBlocker:
+    """
+    A URL blocklist applied to one driver, with request statistics.
+
+    Parameters
+    ----------
+    patterns : List[str]
+        URL patterns in ``Network.setBlockedURLs`` syntax, where ``*``
+        matches any run of characters.
+    name : str, optional
+        Label used in reports, usually the preset name.
+    """
+
+    def __init__(self, patterns: List[str], name: str = "custom") -> None:
+        self.patterns = list(patterns)
+        self.name = name
+        self.blocked: Counter = Counter()
+        self.allowed = 0
+        self.bytes_received = 0
+        self._types: Dict[str, str] = {}
+
+    def apply(self, driver: Any) -> None:
+        """Enable the ``Network`` domain and install the blocklist."""
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.patterns})
+
+    def update(self, events: List[Dict[str, Any]]) -> None:
+        """Fold DevTools ``Network`` events into the statistics."""
+        for event in events:
+            method = event.get("method")
+            params = event.get("params", {})
+            if method == "Network.requestWillBeSent":
+                self._types[params.get("requestId")] = params.get("type", "Other")
+            elif method == "Network.loadingFailed":
+                request_id = params.get("requestId")
+                resource_type = params.get("type") or self._types.get(request_id, "Other")
+                self._types.pop(request_id, None)
+                if params.get("blockedReason"):
+                    self.blocked[resource_type] += 1
+            elif method == "Network.loadingFinished":
+                self._types.pop(params.get("requestId"), None)
+                self.allowed += 1
+                self.bytes_received += int(params.get("encodedDataLength") or 0)
+
+    def collect(self, driver: Any) -> None:
+        """Drain the driver's performance log into the statistics."""
+        self.update(drain_network_events(driver))
+
+    @property
+    def requests_saved(self) -> int:
+        return sum(self.blocked.values())
+
+    @property
+    def estimated_bytes_saved(self) -> int:
+        return sum(ESTIMATED_BYTES.get(kind, ESTIMATED_BYTES["Other"]) * n for kind, n in self.blocked.items())
+
+    def report(self) -> str:
+        """Summarise requests and bytes saved so far."""
+        by_type = ", ".join(f"{kind} {n}" for kind, n in self.blocked.most_common()) or "none"
+        return (
+            f"Request blocking ({self.name}): {self.requests_saved} requests blocked ({by_type}); "
+            f"~{self.estimated_bytes_saved / 1e6:.1f} MB saved (estimated); "
+            f"{self.allowed} requests loaded, {self.bytes_received / 1e6:.1f} MB received"
+        )
+
+
+def install(driver: Any, preset: str = "text+xhr", extra_patterns: Optional[List[str]] = None) -> RequestBlocker:
+    """
+    Apply a blocklist preset to ``driver`` and remember it.
+
+    Parameters
+    ----------
+    driver : webdriver.Chrome
+        A Chromium-based driver (``execute_cdp_cmd`` is required).
+    preset : str, optional
+        One of :data:`PRESETS`.
+    extra_patterns : List[str], optional
+        Additional URL patterns to block.
+
+    Returns
+    -------
+    RequestBlocker
+        The installed blocker; also available via :func:`get_blocker`.
+
+    Raises
+    ------
+    ValueError
+        If ``preset`` is not a known preset name.
+    """
+    if preset not in PRESETS:
+        raise ValueError(f"Unknown blocking preset '{preset}'. Choose from: {', '.join(PRESETS)}")
+    blocker = RequestBlocker(PRESETS[preset] + list(extra_patterns or []), name=preset)
+    blocker.apply(driver)
+    _blockers[driver] = blocker
+    return blocker
+
+
+class BlockingTotal:
+    """
+    Request statistics summed over every driver of a run.
+
+    Pass :meth:`add` as the ``on_quit`` hook of a
+    :class:`driver_recycling.RecyclingDriver`, so each driver's counts
+    are kept before it is quit or restarted.  Safe to share between
+    threads.
+    """
+
+    def __init__(self) -> None:
+        self.total: Optional[RequestBlocker] = None
+        self._lock = threading.Lock()
+
+    def add(self, driver: Any) -> None:
+        """Collect ``driver``'s last events and add its statistics; no-op without a blocker."""
+        blocker = _blockers.pop(driver, None)
+        if blocker is None:
+            return
+        try:
+            blocker.collect(driver)
+        except Exception:
+            # A crashed browser has no log left to drain.
+            pass
+        with self._lock:
+            if self.total is None:
+                self.total = RequestBlocker(blocker.patterns, name=blocker.name)
+            self.total.blocked.update(blocker.blocked)
+            self.total.allowed += blocker.allowed
+            self.total.bytes_received += blocker.bytes_received
+
+    def report(self) -> Optional[str]:
+        """The summed report, or ``None`` if no driver had a blocker."""
+        with self._lock:
+            return self.total.report() if self.total is not None else None
+
+
+def get_blocker(driver: Any) -> Optional[RequestBlocker]:
+    """Return the blocker installed on ``driver``, if any."""
+    return _blockers.get(driver)
+
+
+def collect(driver: Any) -> None:
+    """Update the statistics of ``driver``'s blocker; no-op without one."""
+    blocker = get_blocker(driver)
+    if blocker is not None:
+        blocker.collect(driver)
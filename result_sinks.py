@@ -0,0 +1,289 @@
+"""
+result_sinks.py
+---------------
+
+Write result rows to disk as they are produced.
+
+The scrapers used to collect every row in a list, build a ``pandas``
+DataFrame at the end and write it in one go.  Memory grew with the
+item list, and nothing was on disk until the last item finished.
+
+A sink takes one row (a mapping of column name to value) at a time:
+
+* :class:`CsvSink` for ``.csv`` files,
+* :class:`JsonlSink` for ``.jsonl`` files, one JSON object per line,
+* :class:`XlsxSink` for ``.xlsx`` files, using the write-only mode of
+  ``openpyxl``, or the constant-memory mode of ``xlsxwriter`` when
+  ``openpyxl`` is not installed.
+
+CSV and JSON-lines output is gzip-compressed when the path ends in
+``.gz``.  Rows go to ``<path>.part`` and are flushed as they arrive,
+so a long run's progress can be watched there.  :meth:`RowSink.close`
+renames the finished file to ``path`` in one atomic step, so ``path``
+never holds a half-written file.  If the ``with`` block exits with an
+error, the ``.part`` file is left where it is.
+
+The columns are taken from the first row unless ``fieldnames`` is
+given.  :func:`open_sink` picks the sink from the file extension; any
+other extension (``out.txt``, no extension) is written as CSV, as the
+scrapers always did.  :class:`TeeSink` writes the same rows to several
+sinks.
+
+Example
+-------
+::
+
+    from result_sinks import open_sink
+
+    with open_sink("results.csv.gz") as sink:
+        for item in items:
+            sink.write(scrape(item))
+
+"""
+
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import json
+import os
+from typing import Any, Iterable, List, Mapping, Optional, Sequence
+
+# Compressed streams are flushed less often: every flush ends a
+# deflate block and costs compression.
+GZIP_FLUSH_EVERY = 100
+
+
+class RowSink:
+    """
+    Base class of the streaming writers.
+
+    Parameters
+    ----------
+    path : str
+        Final location of the file.
+    fieldnames : Sequence[str], optional
+        Column order; taken from the first row when not given.
+    """
+
+    def __init__(self, path: str, fieldnames: Optional[Sequence[str]] = None) -> None:
+        self.path = path
+        self.part_path = path + ".part"
+        self.fieldnames: Optional[List[str]] = list(fieldnames) if fieldnames is not None else None
+        self.rows = 0
+        self.closed = False
+
+    def write(self, row: Mapping[str, Any]) -> None:
+        """Append one row."""
+        if self.fieldnames is None:
+            self.fieldnames = list(row)
+        self._write(row)
+        self.rows += 1
+
+    def write_many(self, rows: Iterable[Mapping[str, Any]]) -> None:
+        for row in rows:
+            self.write(row)
+
+    def close(self) -> None:
+        """Finish the file and move it to :attr:`path`."""
+        if self.closed:
+            return
+        self.closed = True
+        self._finish()
+        os.replace(self.part_path, self.path)
+
+    def abort(self) -> None:
+        """Stop writing and leave the partial ``.part`` file."""
+        if self.closed:
+            return
+        self.closed = True
+        self._release()
+
+    def _write(self, row: Mapping[str, Any]) -> None:
+        raise NotImplementedError
+
+    def _finish(self) -> None:
+        raise NotImplementedError
+
+    def _release(self) -> None:
+        self._finish()
+
+    def __enter__(self) -> "RowSink":
+        return self
+
+    def __exit__(self, exc_type: Optional[type], *exc_info: Any) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class _TextSink(RowSink):
+    """A sink writing a text stream, gzip-compressed for ``.gz`` paths."""
+
+    def __init__(self, path: str, fieldnames: Optional[Sequence[str]] = None) -> None:
+        super().__init__(path, fieldnames)
+        if path.endswith(".gz"):
+            self._file: io.TextIOBase = gzip.open(self.part_path, "wt", encoding="utf-8", newline="")
+            self._flush_every = GZIP_FLUSH_EVERY
+        else:
+            self._file = open(self.part_path, "w", encoding="utf-8", newline="")
+            self._flush_every = 1
+
+    def write(self, row: Mapping[str, Any]) -> None:
+        super().write(row)
+        if self.rows % self._flush_every == 0:
+            self._file.flush()
+
+    def _finish(self) -> None:
+        self._file.close()
+
+
+class CsvSink(_TextSink):
+    """Stream rows to a CSV file with a header line."""
+
+    def __init__(self, path: str, fieldnames: Optional[Sequence[str]] = None) -> None:
+        super().__init__(path, fieldnames)
+        self._writer: Optional[csv.DictWriter] = None
+
+    def _write(self, row: Mapping[str, Any]) -> None:
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames)
+            self._writer.writeheader()
+        self._writer.writerow(row)
+
+    def _finish(self) -> None:
+        if self._writer is None and self.fieldnames is not None:
+            csv.DictWriter(self._file, fieldnames=self.fieldnames).writeheader()
+        super()._finish()
+
+
+class JsonlSink(_TextSink):
+    """Stream rows to a JSON-lines file."""
+
+    def _write(self, row: Mapping[str, Any]) -> None:
+        self._file.write(json.dumps({name: row.get(name) for name in self.fieldnames}) + "\n")
+
+
+class XlsxSink(RowSink):
+    """
+    Stream rows to a single-sheet Excel workbook.
+
+    Rows are kept out of memory by the writer library, but an ``.xlsx``
+    file can only be read once :meth:`close` has saved it.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fieldnames: Optional[Sequence[str]] = None,
+        sheet_name: str = "Results",
+    ) -> None:
+        super().__init__(path, fieldnames)
+        self.sheet_name = sheet_name
+        self._sheet: Any = None
+        try:
+            import openpyxl
+        except ImportError:
+            import xlsxwriter
+
+            self._book = xlsxwriter.Workbook(self.part_path, {"constant_memory": True})
+            self._openpyxl = False
+        else:
+            self._book = openpyxl.Workbook(write_only=True)
+            self._openpyxl = True
+
+    def _append(self, values: List[Any]) -> None:
+        if self._openpyxl:
+            self._sheet.append(values)
+        else:
+            self._sheet.write_row(self._next_row, 0, values)
+            self._next_row += 1
+
+    def _start(self) -> None:
+        if self._openpyxl:
+            self._sheet = self._book.create_sheet(self.sheet_name)
+        else:
+            self._sheet = self._book.add_worksheet(self.sheet_name)
+            self._next_row = 0
+        self._append(list(self.fieldnames))
+
+    def _write(self, row: Mapping[str, Any]) -> None:
+        if self._sheet is None:
+            self._start()
+        self._append([row.get(name) for name in self.fieldnames])
+
+    def _finish(self) -> None:
+        if self._sheet is None:
+            self.fieldnames = self.fieldnames or []
+            self._start()
+        if self._openpyxl:
+            self._book.save(self.part_path)
+        else:
+            self._book.close()
+
+    def _release(self) -> None:
+        # A workbook is only written on save; there is nothing partial
+        # worth keeping.
+        if not self._openpyxl:
+            self._book.close()
+
+
+class TeeSink(RowSink):
+    """Write the same rows to several sinks, e.g. CSV and Excel."""
+
+    def __init__(self, *sinks: RowSink) -> None:
+        super().__init__(sinks[0].path if sinks else "")
+        self.sinks = sinks
+
+    def write(self, row: Mapping[str, Any]) -> None:
+        for sink in self.sinks:
+            sink.write(row)
+        self.rows += 1
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            for sink in self.sinks:
+                sink.close()
+
+    def abort(self) -> None:
+        if not self.closed:
+            self.closed = True
+            for sink in self.sinks:
+                sink.abort()
+
+
+SINKS = {
+    ".csv": CsvSink,
+    ".jsonl": JsonlSink,
+    ".xlsx": XlsxSink,
+}
+
+
+def sink_type(path: str) -> type:
+    """
+    The sink class :func:`open_sink` uses for ``path``.
+
+    ``.jsonl`` and ``.xlsx`` files get their own format; everything
+    else is CSV.  ``.gz`` compresses CSV and JSON lines.  Call this
+    before a long run to reject an unusable path up front.
+
+    Raises
+    ------
+    ValueError
+        For a compressed Excel path (``.xlsx.gz``).
+    """
+    base = path[:-3] if path.endswith(".gz") else path
+    sink = SINKS.get(os.path.splitext(base)[1].lower(), CsvSink)
+    if sink is XlsxSink and base != path:
+        raise ValueError(f"Unsupported output format: {path} (Excel files cannot be gzipped)")
+    return sink
+
+
+def open_sink(path: str, fieldnames: Optional[Sequence[str]] = None) -> RowSink:
+    """
+    Open the sink matching the extension of ``path`` (see :func:`sink_type`).
+    """
+    return sink_type(path)(path, fieldnames)
@@ -13,6 +13,10 @@ from selenium.webdriver.chrome.options import Options
 import time
 import os
 
+from browser_host import apply_chrome_binary, chromedriver_service
+from field_rules import BATCH2_RULES, scanner
+from selector_stats import selector_registry
+
 def setup_chrome_driver():
     """Set up Chrome driver with enhanced options"""
     chrome_options = Options()
@@ -25,9 +29,23 @@ def setup_chrome_driver():
     chrome_options.add_argument("--disable-extensions")
     chrome_options.add_argument("--disable-plugins")
     
-    driver = webdriver.Chrome(options=chrome_options)
+    apply_chrome_binary(chrome_options)
+    driver = webdriver.Chrome(service=chromedriver_service(), options=chrome_options)
     return driver
 
+def find_by(driver, method, selector, wait=0):
+    """Find one element by a (method, selector) pair of the login lists"""
+    by, value = {
+        "ID": (By.ID, selector),
+        "NAME": (By.NAME, selector),
+        "TYPE": (By.XPATH, f"//input[@type='{selector}']"),
+        "XPATH": (By.XPATH, selector),
+        "CSS": (By.CSS_SELECTOR, selector),
+    }[method]
+    if wait:
+        return WebDriverWait(driver, wait).until(EC.presence_of_element_located((by, value)))
+    return driver.find_element(by, value)
+
 def enhanced_login(driver):
     """Enhanced login with multiple selector strategies"""
     try:
@@ -48,26 +66,12 @@ def enhanced_login(driver):
             ("CSS", "input[type='email']")
         ]
         
-        for method, selector in email_selectors:
-            try:
-                if method == "ID":
-                    email_field = WebDriverWait(driver, 10).until(
-                        EC.presence_of_element_located((By.ID, selector))
-                    )
-                elif method == "NAME":
-                    email_field = driver.find_element(By.NAME, selector)
-                elif method == "TYPE":
-                    email_field = driver.find_element(By.XPATH, f"//input[@type='{selector}']")
-                elif method == "XPATH":
-                    email_field = driver.find_element(By.XPATH, selector)
-                elif method == "CSS":
-                    email_field = driver.find_element(By.CSS_SELECTOR, selector)
-                
-                if email_field:
-                    print(f"✓ Found email field using {method}: {selector}")
-                    break
-            except:
-                continue
+        found = selector_registry().first(
+            "login.email", email_selectors,
+            lambda pair: find_by(driver, *pair, wait=10 if pair[0] == "ID" else 0))
+        if found:
+            (method, selector), email_field = found
+            print(f"✓ Found email field using {method}: {selector}")
         
         if not email_field:
             print("❌ Could not find email field")
@@ -90,24 +94,11 @@ def enhanced_login(driver):
             ("CSS", "input[type='password']")
         ]
         
-        for method, selector in password_selectors:
-            try:
-                if method == "ID":
-                    password_field = driver.find_element(By.ID, selector)
-                elif method == "NAME":
-                    password_field = driver.find_element(By.NAME, selector)
-                elif method == "TYPE":
-                    password_field = driver.find_element(By.XPATH, f"//input[@type='{selector}']")
-                elif method == "XPATH":
-                    password_field = driver.find_element(By.XPATH, selector)
-                elif method == "CSS":
-                    password_field = driver.find_element(By.CSS_SELECTOR, selector)
-                
-                if password_field:
-                    print(f"✓ Found password field using {method}: {selector}")
-                    break
-            except:
-                continue
+        found = selector_registry().first(
+            "login.password", password_selectors, lambda pair: find_by(driver, *pair))
+        if found:
+            (method, selector), password_field = found
+            print(f"✓ Found password field using {method}: {selector}")
         
         if not password_field:
             print("❌ Could not find password field")
@@ -132,18 +123,11 @@ def enhanced_login(driver):
             ("CSS", ".btn-login")
         ]
         
-        for method, selector in login_selectors:
-            try:
-                if method == "XPATH":
-                    login_button = driver.find_element(By.XPATH, selector)
-                elif method == "CSS":
-                    login_button = driver.find_element(By.CSS_SELECTOR, selector)
-                
-                if login_button:
-                    print(f"✓ Found login button using {method}: {selector}")
-                    break
-            except:
-                continue
+        found = selector_registry().first(
+            "login.submit", login_selectors, lambda pair: find_by(driver, *pair))
+        if found:
+            (method, selector), login_button = found
+            print(f"✓ Found login button using {method}: {selector}")
         
         if not login_button:
             print("❌ Could not find login button")
@@ -217,39 +201,26 @@ def scrape_item_data(driver, item_number):
             ".price"
         ]
         
-        for selector in price_selectors:
-            try:
-                elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                for element in elements:
-                    if element and '$' in element.text:
-                        unit_price = element.text.strip()
-                        print(f"    ✓ Price found: {unit_price}")
-                        break
-                if unit_price != "Price not found":
-                    break
-            except:
-                continue
+        def price_text(selector):
+            for element in driver.find_elements(By.CSS_SELECTOR, selector):
+                if element and '$' in element.text:
+                    return element.text.strip()
+        
+        found = selector_registry().first("product.price", price_selectors, price_text, by_hits=False)
+        if found:
+            unit_price = found[1]
+            print(f"    ✓ Price found: {unit_price}")
         
         # Extract case quantity from page source
         case_quantity = "Case info not found"
         try:
             page_source = driver.page_source
-            import re
             
             # Look for various case patterns
-            case_patterns = [
-                r'C/(\d+)',
-                r'Case of (\d+)',
-                r'Pack of (\d+)',
-                r'Qty[:\s]+(\d+)'
-            ]
-            
-            for pattern in case_patterns:
-                matches = re.findall(pattern, page_source, re.IGNORECASE)
-                if matches:
-                    case_quantity = matches[0]
-                    print(f"    ✓ Case quantity found: {case_quantity}")
-                    break
+            case = scanner(BATCH2_RULES).first(page_source, 'case')
+            if case:
+                case_quantity = case.value
+                print(f"    ✓ Case quantity found: {case_quantity} ({case.rule})")
         except:
             pass
         
@@ -0,0 +1,153 @@
+"""
+run_journal.py
+--------------
+
+Record each finished item as it completes, so that an interrupted run
+can be resumed.
+
+The scrapers keep their results in a list and write the output file
+once, at the end.  When Chrome crashes at item 900 of 1,000, or the
+run is stopped with Ctrl+C, all 900 results are lost.
+
+:class:`RunJournal` appends one JSON line per finished item to a
+journal file next to the output and flushes it straight away.  A run
+started with ``--resume`` reads the journal back, skips every item
+recorded as done, scrapes only the rest and builds the output from
+both.  Items that failed are journaled as well, but they are tried
+again on resume.  A run without ``--resume`` starts a fresh journal.
+
+Used as a context manager, the journal is flushed and closed on every
+exit, including ``KeyboardInterrupt``.  The CLIs turn that into exit
+status 130 and print how to resume.  A line cut short by a hard crash
+is ignored when the journal is read back, and cut off before the
+resumed run appends to the file, so the next record starts on a line
+of its own.
+
+Example
+-------
+::
+
+    from run_journal import RunJournal
+
+    with RunJournal("results.csv.journal", resume=True) as journal:
+        done = journal.completed()
+        for item in items:
+            if item not in done:
+                journal.record(item, scrape(item))
+
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+def journal_path(output_path: str) -> str:
+    """The default journal location for a run writing ``output_path``."""
+    return output_path + ".journal"
+
+
+class RunJournal:
+    """
+    Append-only JSON-lines log of finished items.
+
+    Parameters
+    ----------
+    path : str
+        Journal file.
+    resume : bool, optional
+        Keep and load an existing journal instead of starting afresh.
+
+    ``record`` may be called from several threads.
+    """
+
+    def __init__(self, path: str, resume: bool = False) -> None:
+        self.path = path
+        self.resume = resume
+        self._done: Dict[str, Dict[str, Any]] = self._load() if resume else {}
+        if resume:
+            self._trim_partial_line()
+        self._lock = threading.Lock()
+        self._file = open(path, "a" if resume else "w", encoding="utf-8")
+        self.recorded = 0
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        done: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by a crash
+                    if entry.get("ok"):
+                        done[entry["item"]] = entry["result"]
+                    else:
+                        done.pop(entry["item"], None)
+        except OSError:
+            pass
+        return done
+
+    def _trim_partial_line(self) -> None:
+        """Cut off a last line left unfinished by a crash."""
+        try:
+            with open(self.path, "rb+") as f:
+                size = f.seek(0, os.SEEK_END)
+                if size == 0:
+                    return
+                f.seek(size - 1)
+                if f.read(1) == b"\n":
+                    return
+                # Search backwards for the end of the last complete line.
+                end = size - 1
+                while end > 0:
+                    start = max(0, end - 4096)
+                    f.seek(start)
+                    newline = f.read(end - start).rfind(b"\n")
+                    if newline >= 0:
+                        f.truncate(start + newline + 1)
+                        return
+                    end = start
+                f.truncate(0)
+        except OSError:
+            pass
+
+    def completed(self) -> Dict[str, Dict[str, Any]]:
+        """Results of the items already done, by item number."""
+        return dict(self._done)
+
+    def record(self, item: str, result: Dict[str, Any], ok: bool = True) -> None:
+        """Append one finished item and flush it to disk."""
+        line = json.dumps({"item": item, "ok": ok, "result": result, "at": time.time()})
+        with self._lock:
+            if self._file.closed:
+                # A worker finishing after an interrupt closed the run.
+                return
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.recorded += 1
+            if ok:
+                self._done[item] = result
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+
+    def resume_hint(self) -> str:
+        return (f"Interrupted; {len(self._done)} finished item(s) are saved in {self.path}. "
+                "Run again with --resume to continue.")
+
+    def __enter__(self) -> "RunJournal":
+        return self
+
+    def __exit__(self, exc_type: Optional[type], *exc_info: Any) -> None:
+        self.close()
+        if exc_type is not None and issubclass(exc_type, KeyboardInterrupt):
+            print("\n" + self.resume_hint())
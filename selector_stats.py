@@ -0,0 +1,282 @@
+"""
+selector_stats.py
+-----------------
+
+Try the selectors that usually match first.
+
+The scrapers find login fields and prices by walking a list of
+fallback selectors in a fixed order.  ``final_scraper._first_present``
+polls the whole list every 0.25 s.  ``robust_batch2_scraper`` and
+``comprehensive_filler`` try every price selector on every item.  When
+the one that matches sits at the end of the list, each lookup pays for
+all the dead ones before it.
+
+:class:`SelectorRegistry` counts, per page type (``"login.email"``,
+``"product.price"``, ...), how often each selector matched and how
+many lookups it has missed since it last did.  :meth:`SelectorRegistry.order`
+sorts a selector list by those counts.  How depends on the list:
+
+* Where any selector finds the same element (the login fields),
+  ``by_hits=True``: selectors that have matched come first, the most
+  hits first.  Once one has matched, the common case costs a single
+  lookup.
+* Where several selectors can match different elements (the price
+  lists, written specific before generic), ``by_hits=False``: the
+  written priority is kept, so the result does not depend on the
+  history in the file.  Only dead selectors are skipped over.
+
+Either way, a selector that has missed ``demote_after`` lookups in a
+row goes last, even if it used to match, so after a site change a list
+falls back to its written order.  Demoted selectors are still tried
+when nothing else matches.  In priority lists, every
+``demote_after``-th lookup of a page type tries the whole list in its
+written order, so a demoted selector that matches again regains its
+place.
+
+The counts are kept in a small JSON file, saved when the process
+exits.  The file defaults to ``.pacific_selectors.json`` in the working
+directory and can be moved with the ``PACIFIC_SELECTOR_STATS``
+environment variable.  Delete it, or run
+``python selector_stats.py --reset``, to start over.
+
+Example
+-------
+::
+
+    from selector_stats import selector_registry
+
+    found = selector_registry().first(
+        "product.price", PRICE_SELECTORS,
+        lambda selector: driver.find_element(By.CSS_SELECTOR, selector),
+        by_hits=False,
+    )
+    if found:
+        selector, element = found
+
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+S = TypeVar("S")
+
+DEFAULT_STATS_FILE = os.environ.get("PACIFIC_SELECTOR_STATS", ".pacific_selectors.json")
+
+# Consecutive missed lookups after which a selector is tried last.
+DEFAULT_DEMOTE_AFTER = 10
+
+
+class SelectorRegistry:
+    """
+    Persistent hit and miss counts of selectors, by page type.
+
+    Parameters
+    ----------
+    path : str, optional
+        Location of the JSON file.
+    demote_after : int, optional
+        Consecutive missed lookups after which a selector is moved
+        behind all the others.
+    """
+
+    def __init__(self, path: str = DEFAULT_STATS_FILE, demote_after: int = DEFAULT_DEMOTE_AFTER) -> None:
+        self.path = path
+        self.demote_after = demote_after
+        self._lock = threading.Lock()
+        data = self._load()
+        self._pages: Dict[str, Dict[str, Dict[str, int]]] = data.get("pages", {})
+        self._lookups: Dict[str, int] = data.get("lookups", {})
+        self._dirty = False
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    @staticmethod
+    def key(selector: Any) -> str:
+        """The text a selector is stored under; ``(how, what)`` pairs become ``how=what``."""
+        if isinstance(selector, tuple):
+            return "=".join(str(part) for part in selector)
+        return str(selector)
+
+    def stats(self, page: str, selector: Any) -> Dict[str, int]:
+        """``hits``, ``misses`` and ``streak`` (misses since the last hit) of a selector."""
+        with self._lock:
+            return dict(self._pages.get(page, {}).get(self.key(selector), {"hits": 0, "misses": 0, "streak": 0}))
+
+    def order(self, page: str, selectors: Sequence[S], by_hits: bool = True) -> List[S]:
+        """
+        Return ``selectors`` in the order they should be tried.
+
+        With ``by_hits`` the selectors that matched most often come
+        first; without, the written order is kept.  Demoted selectors
+        go last in both cases, except on the periodic full pass of a
+        ``by_hits=False`` list.
+        """
+        with self._lock:
+            known = self._pages.get(page, {})
+            counts = [known.get(self.key(selector), {}) for selector in selectors]
+            recheck = self._lookups.get(page, 0) % self.demote_after == self.demote_after - 1
+        if not by_hits and recheck:
+            return list(selectors)
+        ranked = sorted(
+            range(len(selectors)),
+            key=lambda i: (
+                counts[i].get("streak", 0) >= self.demote_after,
+                -counts[i].get("hits", 0) if by_hits else 0,
+                i,
+            ),
+        )
+        return [selectors[i] for i in ranked]
+
+    def record(self, page: str, missed: Sequence[Any], hit: Any = None) -> None:
+        """
+        Record one lookup on a page of type ``page``.
+
+        Parameters
+        ----------
+        missed : Sequence
+            Selectors that were tried and did not match.
+        hit : optional
+            The selector that matched, if any.
+        """
+        with self._lock:
+            self._lookups[page] = self._lookups.get(page, 0) + 1
+            counts = self._pages.setdefault(page, {})
+            for selector in missed:
+                entry = counts.setdefault(self.key(selector), {"hits": 0, "misses": 0, "streak": 0})
+                entry["misses"] += 1
+                entry["streak"] += 1
+            if hit is not None:
+                entry = counts.setdefault(self.key(hit), {"hits": 0, "misses": 0, "streak": 0})
+                entry["hits"] += 1
+                entry["streak"] = 0
+            self._dirty = True
+
+    def first(
+        self,
+        page: str,
+        selectors: Sequence[S],
+        find: Callable[[S], Any],
+        by_hits: bool = True,
+    ) -> Optional[Tuple[S, Any]]:
+        """
+        Try ``selectors`` in :meth:`order` and record the outcome.
+
+        ``find(selector)`` returns the match, or something false (or
+        raises) when the selector does not match.  Pass
+        ``by_hits=False`` when several selectors can match different
+        elements and the first in written order must win.
+
+        Returns
+        -------
+        Optional[Tuple[S, Any]]
+            The selector that matched and what ``find`` returned for it,
+            or ``None`` if nothing matched.
+        """
+        missed = []
+        for selector in self.order(page, selectors, by_hits):
+            try:
+                result = find(selector)
+            except Exception:
+                result = None
+            if result:
+                self.record(page, missed, selector)
+                return selector, result
+            missed.append(selector)
+        self.record(page, missed)
+        return None
+
+    def reset(self, page: Optional[str] = None) -> None:
+        """Forget the counts of one page type, or of all of them."""
+        with self._lock:
+            if page is None:
+                self._pages.clear()
+                self._lookups.clear()
+            else:
+                self._pages.pop(page, None)
+                self._lookups.pop(page, None)
+            self._dirty = True
+
+    def save(self) -> None:
+        """Write the counts to disk if they changed, replacing the file atomically."""
+        with self._lock:
+            if not self._dirty:
+                return
+            pages = {page: {key: dict(entry) for key, entry in counts.items()} for page, counts in self._pages.items()}
+            data = {"saved_at": time.time(), "pages": pages, "lookups": dict(self._lookups)}
+            self._dirty = False
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".selectors-", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=1)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def report(self) -> str:
+        """The counts of every page type, best selectors first."""
+        lines = []
+        with self._lock:
+            pages = {page: dict(counts) for page, counts in sorted(self._pages.items())}
+        for page, counts in pages.items():
+            lines.append(page)
+            for key in self.order(page, list(counts)):
+                entry = counts[key]
+                flag = "  demoted" if entry["streak"] >= self.demote_after else ""
+                lines.append(f"  {entry['hits']:6d} hits {entry['misses']:6d} misses  {key}{flag}")
+        return "\n".join(lines) if lines else "No selector statistics recorded."
+
+
+_registry: Optional[SelectorRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def selector_registry() -> SelectorRegistry:
+    """
+    Return the registry shared by the scrapers of this process.
+
+    It is loaded from ``DEFAULT_STATS_FILE`` on first use and saved when
+    the process exits.
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = SelectorRegistry()
+            atexit.register(_registry.save)
+        return _registry
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Show or reset the selector hit statistics.")
+    parser.add_argument("--file", default=DEFAULT_STATS_FILE, help="Statistics file (default: %(default)s).")
+    parser.add_argument("--reset", nargs="?", const="", metavar="PAGE",
+                        help="Forget the counts of PAGE, or of every page type.")
+    args = parser.parse_args(argv)
+
+    registry = SelectorRegistry(args.file)
+    if args.reset is not None:
+        registry.reset(args.reset or None)
+        registry.save()
+    print(registry.report())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
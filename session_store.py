@@ -0,0 +1,215 @@
+"""
+session_store.py
+----------------
+
+Persist an authenticated Pacific Giftware browser session between runs.
+
+Filling in the Material‑UI login form costs 5–13 seconds of sleeps and
+waits on every run and for every browser in a
+:class:`driver_pool.DriverPool`.  After a successful login this module
+saves the session cookies and ``localStorage`` to a small JSON file.
+New drivers load that file instead, confirm with one cheap probe that
+the site still treats them as logged in, and only fall back to the
+form login when the probe fails.
+
+The session file grants access to the account just like the password
+does.  It is written with owner-only permissions and is ignored by git;
+delete it to force a fresh login.  The location defaults to
+``.pacific_session.json`` in the working directory and can be changed
+with the ``PACIFIC_SESSION_FILE`` environment variable.
+
+Example
+-------
+::
+
+    from session_store import restore_or_login
+
+    driver = start_driver()
+    restore_or_login(driver, lambda: login(driver, email, password))
+
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+BASE_URL = "https://www.pacificgiftware.com/"
+
+# A tiny same-origin document used to get the browser onto the site's
+# origin before setting cookies, without rendering the storefront.
+COOKIE_URL = BASE_URL + "robots.txt"
+
+DEFAULT_SESSION_FILE = os.environ.get("PACIFIC_SESSION_FILE", ".pacific_session.json")
+
+# Text that only appears in the site chrome for an authenticated user.
+# ``final_scraper.login`` uses the same markers to detect success.
+LOGGED_IN_XPATH = (
+    "//*[contains(., 'Log out') or contains(., 'Logout')]"
+    " | //a[contains(., 'Account') or contains(., 'My Account')]"
+)
+
+_VALID_SAME_SITE = {"Strict", "Lax", "None"}
+
+
+def save_session(driver: Any, path: str = DEFAULT_SESSION_FILE) -> None:
+    """
+    Write the driver's cookies and ``localStorage`` to ``path``.
+
+    The driver must currently be on a Pacific Giftware page so that the
+    cookies and storage of that origin are the ones captured.  The file
+    is replaced atomically and made readable by the owner only.
+    """
+    state = {
+        "saved_at": time.time(),
+        "url": driver.current_url,
+        "user_agent": driver.execute_script("return navigator.userAgent;"),
+        "cookies": driver.get_cookies(),
+        "local_storage": driver.execute_script(
+            "var out = {};"
+            "for (var i = 0; i < window.localStorage.length; i++) {"
+            "  var k = window.localStorage.key(i); out[k] = window.localStorage.getItem(k);"
+            "}"
+            "return out;"
+        ) or {},
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".session-", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_session(path: str = DEFAULT_SESSION_FILE) -> Optional[Dict[str, Any]]:
+    """Return the saved session state, or ``None`` if there is none."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _clean_cookie(cookie: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop cookie fields that ChromeDriver rejects in ``add_cookie``."""
+    cookie = dict(cookie)
+    if cookie.get("sameSite") not in _VALID_SAME_SITE:
+        cookie.pop("sameSite", None)
+    if "expiry" in cookie:
+        cookie["expiry"] = int(cookie["expiry"])
+    return cookie
+
+
+def load_session(driver: Any, path: str = DEFAULT_SESSION_FILE) -> bool:
+    """
+    Load a saved session into ``driver``.
+
+    Cookies can only be set for the origin the browser is on, so this
+    first loads the site's ``robots.txt``, which is far cheaper than
+    rendering the storefront.  Cookies that have already expired are
+    skipped.
+
+    Returns
+    -------
+    bool
+        ``True`` if a session file was found and applied.
+    """
+    state = read_session(path)
+    if not state or not state.get("cookies"):
+        return False
+
+    driver.get(COOKIE_URL)
+    now = time.time()
+    cookies: List[Dict[str, Any]] = state["cookies"]
+    for cookie in cookies:
+        if cookie.get("expiry") and cookie["expiry"] < now:
+            continue
+        try:
+            driver.add_cookie(_clean_cookie(cookie))
+        except Exception:
+            # A single malformed or foreign-domain cookie should not
+            # prevent the rest of the session from being restored.
+            continue
+
+    local_storage = state.get("local_storage") or {}
+    if local_storage:
+        driver.execute_script(
+            "var items = arguments[0];"
+            "for (var k in items) { window.localStorage.setItem(k, items[k]); }",
+            local_storage,
+        )
+    return True
+
+
+def session_is_valid(driver: Any, timeout: float = 5) -> bool:
+    """
+    Return ``True`` if the current browser session is logged in.
+
+    Reloads the home page so that restored cookies and storage take
+    effect, then waits at most ``timeout`` seconds for an element that
+    only authenticated users see.
+    """
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    driver.get(BASE_URL)
+    try:
+        WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located((By.XPATH, LOGGED_IN_XPATH))
+        )
+        return True
+    except TimeoutException:
+        return False
+
+
+def restore_or_login(
+    driver: Any,
+    form_login: Callable[[], Any],
+    path: str = DEFAULT_SESSION_FILE,
+    probe_timeout: float = 5,
+) -> bool:
+    """
+    Authenticate ``driver`` from the saved session, or log in and save it.
+
+    Parameters
+    ----------
+    driver : webdriver.Chrome
+        The browser to authenticate.
+    form_login : Callable[[], Any]
+        Performs the regular form login on ``driver``.  It may raise on
+        failure or return ``False``; any other return value is treated
+        as success.
+    path : str, optional
+        Location of the session file.
+    probe_timeout : float, optional
+        Seconds to wait for the logged-in marker when validating a
+        restored session.
+
+    Returns
+    -------
+    bool
+        ``True`` if the driver ends up authenticated.
+    """
+    if load_session(driver, path) and session_is_valid(driver, timeout=probe_timeout):
+        print("Reusing saved login session.")
+        return True
+
+    if form_login() is False:
+        return False
+    try:
+        save_session(driver, path)
+    except Exception as exc:
+        # Saving is an optimisation for the next run; never fail the
+        # current one because of it.
+        print(f"Could not save login session: {exc}")
+    return True
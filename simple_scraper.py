@@ -15,6 +15,8 @@ from bs4 import BeautifulSoup
 import pandas as pd
 from typing import List, Dict
 
+from product_cache import ProductCache, validator_headers
+
 def read_items_from_csv(csv_file: str) -> List[str]:
     """Read item numbers from CSV file."""
     items = []
@@ -30,83 +32,114 @@ def read_items_from_csv(csv_file: str) -> List[str]:
         print(f"Error reading CSV file: {e}")
         return []
 
-def scrape_product_basic(item_number: str) -> Dict[str, str]:
+PRODUCT_URL = "https://www.pacificgiftware.com/product/{}"
+
+# Results of parse_product_basic, as stored with their pages' validators
+PAGE_KIND = "basic"
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+def error_result(item_number: str, status: str) -> Dict[str, str]:
+    """Result row for an item that could not be fetched or parsed."""
+    return {
+        'Item Number': item_number,
+        'Product Name': 'Error',
+        'Unit Price': 'Error',
+        'Case Quantity': 'Error',
+        'Status': status
+    }
+
+def parse_product_basic(item_number: str, content) -> Dict[str, str]:
+    """
+    Extract the public product fields from a product page.
+    Shared by the blocking and the asyncio fetchers.
+    """
+    soup = BeautifulSoup(content, 'html.parser')
+    
+    # Try to extract basic product information
+    product_name = "Not found"
+    unit_price = "Login required"
+    case_quantity = "Not found"
+    
+    # Look for product title
+    title_selectors = ['h1', '.product-title', '[data-testid="product-title"]', '.pdp-product-name']
+    for selector in title_selectors:
+        element = soup.select_one(selector)
+        if element and element.get_text(strip=True):
+            product_name = element.get_text(strip=True)
+            break
+    
+    # Look for case pack information in various places
+    case_selectors = [
+        '.case-pack', '.case-quantity', '[data-testid="case-pack"]',
+        'span:contains("CASE PACK")', 'div:contains("CASE PACK")',
+        'span:contains("case pack")', 'div:contains("case pack")'
+    ]
+    
+    for selector in case_selectors:
+        if ':contains(' in selector:
+            # Handle text-based selectors
+            continue
+        element = soup.select_one(selector)
+        if element:
+            case_quantity = element.get_text(strip=True)
+            break
+    
+    # Look for case pack in text content
+    page_text = soup.get_text()
+    import re
+    case_match = re.search(r'CASE PACK[:\s]*(\d+)', page_text, re.IGNORECASE)
+    if case_match:
+        case_quantity = case_match.group(1)
+    
+    return {
+        'Item Number': item_number,
+        'Product Name': product_name,
+        'Unit Price': unit_price,
+        'Case Quantity': case_quantity,
+        'Status': 'Scraped (Basic)' if product_name != "Not found" else 'Not Found'
+    }
+
+def page_has_product(result: Dict[str, str]) -> bool:
+    """
+    True if a result was parsed from a page that showed the product.
+    Only such pages are revalidated: for the JavaScript shell, the
+    validators describe the shell, not the product data.
+    """
+    return result.get('Product Name') not in (None, '', 'Not found', 'Error')
+
+def scrape_product_basic(item_number: str, cache=None) -> Dict[str, str]:
     """
     Basic HTTP scraper for Pacific Giftware product pages.
     Note: Limited functionality since the site uses JavaScript for pricing.
+    
+    With a product_cache.ProductCache, a page that showed the product is
+    revalidated with the validators of the last fetch and a 304 reuses
+    the stored result (see page_has_product).
     """
-    url = f"https://www.pacificgiftware.com/product/{item_number}"
+    url = PRODUCT_URL.format(item_number)
     
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=10)
+        page = cache.page(url, PAGE_KIND) if cache is not None else None
+        if page is not None and not page_has_product(page.result):
+            page = None
+        response = requests.get(url, headers={**HEADERS, **validator_headers(page)}, timeout=10)
+        if response.status_code == 304 and page is not None:
+            cache.touch_page(url, PAGE_KIND)
+            return dict(page.result, **{'Item Number': item_number})
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Try to extract basic product information
-        product_name = "Not found"
-        unit_price = "Login required"
-        case_quantity = "Not found"
-        
-        # Look for product title
-        title_selectors = ['h1', '.product-title', '[data-testid="product-title"]', '.pdp-product-name']
-        for selector in title_selectors:
-            element = soup.select_one(selector)
-            if element and element.get_text(strip=True):
-                product_name = element.get_text(strip=True)
-                break
-        
-        # Look for case pack information in various places
-        case_selectors = [
-            '.case-pack', '.case-quantity', '[data-testid="case-pack"]',
-            'span:contains("CASE PACK")', 'div:contains("CASE PACK")',
-            'span:contains("case pack")', 'div:contains("case pack")'
-        ]
-        
-        for selector in case_selectors:
-            if ':contains(' in selector:
-                # Handle text-based selectors
-                continue
-            element = soup.select_one(selector)
-            if element:
-                case_quantity = element.get_text(strip=True)
-                break
-        
-        # Look for case pack in text content
-        page_text = soup.get_text()
-        import re
-        case_match = re.search(r'CASE PACK[:\s]*(\d+)', page_text, re.IGNORECASE)
-        if case_match:
-            case_quantity = case_match.group(1)
-        
-        return {
-            'Item Number': item_number,
-            'Product Name': product_name,
-            'Unit Price': unit_price,
-            'Case Quantity': case_quantity,
-            'Status': 'Scraped (Basic)' if product_name != "Not found" else 'Not Found'
-        }
+        result = parse_product_basic(item_number, response.content)
+        if cache is not None and page_has_product(result):
+            cache.put_page(url, PAGE_KIND, response.headers, result)
+        return result
         
     except requests.RequestException as e:
-        return {
-            'Item Number': item_number,
-            'Product Name': 'Error',
-            'Unit Price': 'Error',
-            'Case Quantity': 'Error',
-            'Status': f'Network Error: {str(e)}'
-        }
+        return error_result(item_number, f'Network Error: {str(e)}')
     except Exception as e:
-        return {
-            'Item Number': item_number,
-            'Product Name': 'Error',
-            'Unit Price': 'Error', 
-            'Case Quantity': 'Error',
-            'Status': f'Parse Error: {str(e)}'
-        }
+        return error_result(item_number, f'Parse Error: {str(e)}')
 
 def process_items_simple(input_file: str, output_file: str):
     """Process items using basic HTTP scraping."""
@@ -129,15 +162,20 @@ def process_items_simple(input_file: str, output_file: str):
     
     results = []
     
-    for i, item in enumerate(items, 1):
-        print(f"Processing item {i}/{len(items)}: {item}")
-        result = scrape_product_basic(item)
-        results.append(result)
-        print(f"  Status: {result['Status']}")
-        print(f"  Product: {result['Product Name']}")
-        print()
+    with ProductCache() as cache:
+        for i, item in enumerate(items, 1):
+            print(f"Processing item {i}/{len(items)}: {item}")
+            result = scrape_product_basic(item, cache)
+            results.append(result)
+            print(f"  Status: {result['Status']}")
+            print(f"  Product: {result['Product Name']}")
+            print()
+        print(cache.report())
     
-    # Save results
+    return save_results(results, output_file)
+
+def save_results(results: List[Dict[str, str]], output_file: str):
+    """Write results to CSV and print a summary."""
     try:
         df = pd.DataFrame(results)
         df.to_csv(output_file, index=False)
@@ -162,6 +200,7 @@ def main():
         print("\nThis is a basic HTTP scraper that works without browser automation.")
         print("Note: Pricing information requires login, so this scraper can only")
         print("extract product names and case quantities that are visible to anonymous users.")
+        print("\nFor large item lists, async_scraper.py fetches many pages concurrently.")
         print("\nFor full functionality including pricing, use the Selenium-based scraper locally.")
         return
     
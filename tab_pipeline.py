@@ -0,0 +1,210 @@
+"""
+tab_pipeline.py
+---------------
+
+Overlap page loads with parsing by keeping several tabs of one browser
+busy at once.
+
+:func:`pacificgiftware_scraper.get_product_details` navigates, waits
+for the page, reads the page source and parses it, and only then starts
+the next navigation.  The browser sits idle while Python parses, and
+Python sits idle while the network delivers the next page.
+
+:class:`TabPipeline` keeps ``tabs`` tabs open in the same driver.  The
+first ``tabs`` items start loading straight away, one per tab.  Items
+are then taken in order: the pipeline switches to the item's tab,
+waits until that tab shows the item's rendered title, copies the page
+source, and immediately sends the tab on to the item ``tabs`` places
+further down the list before parsing the copied HTML.  While one page
+is being parsed, the next ``tabs - 1`` pages are already loading in the
+background.  This costs a few renderer processes, not another browser.
+
+Navigations are started from a zero-delay ``setTimeout``.  That way
+ChromeDriver does not see a pending navigation in the tab and wait for
+it before returning.  :func:`pacificgiftware_scraper.start_driver`
+switches off Chrome's background-tab throttling so hidden tabs load at
+full speed.  Request blocking is applied to every tab, because
+``Network.setBlockedURLs`` only acts on the tab it is sent to.
+
+With a :class:`parse_pool.ParsePool`, pages are handed to worker
+processes as soon as they are copied, and the pipeline goes straight on
+to the next tab.  The parsed results are collected at the end of each
+batch.
+
+The JSON capture of :mod:`xhr_capture` reads response bodies through the
+current tab only, so it cannot be combined with the pipeline.
+"""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional
+
+from readiness import PREDICATES
+from request_blocking import collect, get_blocker
+
+PRODUCT_URL = "https://www.pacificgiftware.com/product/{}"
+
+# Start a navigation without making ChromeDriver wait for it.
+_NAVIGATE_SCRIPT = """
+    var url = arguments[0];
+    window.setTimeout(function () { window.location.href = url; }, 0);
+"""
+
+# True once the tab shows the rendered page of the item in arguments[0],
+# not the product it held before.
+_READY_SCRIPT = (
+    """
+    var path = decodeURIComponent(window.location.pathname).replace(/\\/+$/, '');
+    if (path.slice(-('/product/' + arguments[0]).length) !== '/product/' + arguments[0]) return false;
+    if (document.readyState === 'loading') return false;
+    return (function () {"""
+    + PREDICATES["title"]
+    + """})();
+"""
+)
+
+
+def _empty(item_number: str) -> Any:
+    from pacificgiftware_scraper import ProductInfo
+
+    return ProductInfo(item_number=item_number, product_name="", unit_price=None, case_quantity=None)
+
+
+class TabPipeline:
+    """
+    Scrape items through ``tabs`` concurrently loading tabs.
+
+    Parameters
+    ----------
+    tabs : int, optional
+        Number of tabs, i.e. how many page loads are in flight at once.
+        ``1`` behaves like the plain sequential loop.
+    timeout : float, optional
+        Seconds to wait for one page to become ready.
+    poll : float, optional
+        Seconds between readiness checks.
+    parse_pool : parse_pool.ParsePool, optional
+        Parse pages in worker processes without waiting for them.
+    parser : str, optional
+        Extraction backend (see :mod:`product_parsers`).
+    """
+
+    def __init__(
+        self,
+        tabs: int = 3,
+        timeout: float = 30,
+        poll: float = 0.1,
+        parse_pool: Optional[Any] = None,
+        parser: str = "html.parser",
+    ) -> None:
+        if tabs < 1:
+            raise ValueError("TabPipeline needs at least one tab.")
+        self.tabs = tabs
+        self.timeout = timeout
+        self.poll = poll
+        self.parse_pool = parse_pool
+        self.parser = parser
+        self._driver: Optional[Any] = None
+        self._handles: List[str] = []
+
+    def _open(self, driver: Any) -> None:
+        """Open the extra tabs in ``driver``, once per driver."""
+        if driver is self._driver:
+            return
+        self._driver = driver
+        self._handles = [driver.current_window_handle]
+        blocker = get_blocker(driver)
+        for _ in range(self.tabs - 1):
+            driver.switch_to.new_window("tab")
+            if blocker is not None:
+                blocker.apply(driver)
+            self._handles.append(driver.current_window_handle)
+
+    def _navigate(self, driver: Any, handle: str, item_number: str) -> None:
+        driver.switch_to.window(handle)
+        driver.execute_script(_NAVIGATE_SCRIPT, PRODUCT_URL.format(item_number))
+
+    def _wait_ready(self, driver: Any, item_number: str) -> None:
+        deadline = time.monotonic() + self.timeout
+        while not driver.execute_script(_READY_SCRIPT, item_number):
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Page for item {item_number} did not load within {self.timeout}s")
+            time.sleep(self.poll)
+
+    def scrape(self, driver: Any, item_numbers: List[str]) -> List[Any]:
+        """
+        Scrape ``item_numbers`` in ``driver`` and return them in order.
+
+        Like :func:`pacificgiftware_scraper.scrape_item`, this never
+        raises for a single item: a failed item is reported and comes
+        back as a ``ProductInfo`` with empty fields.
+        """
+        from pacificgiftware_scraper import parse_product_html
+
+        self._open(driver)
+        tabs = len(self._handles)
+        for index, item in enumerate(item_numbers[:tabs]):
+            self._navigate(driver, self._handles[index], item)
+
+        results = []
+        for index, item in enumerate(item_numbers):
+            print(f"Processing item {item}...")
+            handle = self._handles[index % tabs]
+            html = None
+            try:
+                driver.switch_to.window(handle)
+                self._wait_ready(driver, item)
+                html = driver.page_source
+            except Exception as exc:
+                print(f"Failed to process item {item}: {exc}")
+            # Send this tab on to its next item before parsing, so the
+            # page loads while the HTML below is being parsed.
+            upcoming = index + tabs
+            if upcoming < len(item_numbers):
+                try:
+                    self._navigate(driver, handle, item_numbers[upcoming])
+                except Exception as exc:
+                    print(f"Could not start loading item {item_numbers[upcoming]}: {exc}")
+            collect(driver)
+            if html is None:
+                results.append(None)
+            elif self.parse_pool is not None:
+                results.append(self.parse_pool.submit(html, item))
+            else:
+                results.append(self._parse(lambda: parse_product_html(html, item, self.parser), item))
+
+        products = []
+        for item, result in zip(item_numbers, results):
+            if result is None:
+                products.append(_empty(item))
+            elif isinstance(result, Future):
+                products.append(self._parse(result.result, item))
+            else:
+                products.append(result)
+        return products
+
+    @staticmethod
+    def _parse(parse: Callable[[], Any], item_number: str) -> Any:
+        """Run one parse, reporting failures like ``scrape_item``."""
+        try:
+            return parse()
+        except Exception as exc:
+            print(f"Failed to process item {item_number}: {exc}")
+            return _empty(item_number)
+
+    def close(self) -> None:
+        """Close the extra tabs and return to the first one."""
+        driver, self._driver = self._driver, None
+        handles, self._handles = self._handles, []
+        if driver is None:
+            return
+        try:
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+        except Exception:
+            # The browser may already be gone after a restart.
+            pass
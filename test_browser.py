@@ -6,11 +6,12 @@ Test browser functionality and Pacific Giftware website access
 import os
 import sys
 from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from browser_host import apply_chrome_binary, chromedriver_service
+
 def test_browser():
     """Test if browser can access Pacific Giftware"""
     print("Testing browser access to Pacific Giftware...")
@@ -25,13 +26,11 @@ def test_browser():
     chrome_options.add_argument("--window-size=1920,1080")
     chrome_options.add_argument("--user-data-dir=/tmp/chrome-user-data")
     
-    # Specify paths
-    chrome_options.binary_location = "/nix/store/qa9cnw4v5xkxyip6mb9kxqfq1z4x2dx1-chromium-138.0.7204.100/bin/chromium-browser"
-    chromedriver_path = "/nix/store/8zj50jw4w0hby47167kqqsaqw4mm5bkd-chromedriver-unwrapped-138.0.7204.100/bin/chromedriver"
+    # Locate Chrome and ChromeDriver (cached between runs)
+    apply_chrome_binary(chrome_options)
     
     try:
-        service = ChromeService(executable_path=chromedriver_path)
-        driver = webdriver.Chrome(service=service, options=chrome_options)
+        driver = webdriver.Chrome(service=chromedriver_service(), options=chrome_options)
         
         print("✓ Browser started successfully")
         
@@ -0,0 +1,122 @@
+"""
+Tests for field_rules: the single-pass scanner must return what the
+sequential ``re.findall`` loops it replaced returned.
+"""
+
+import random
+import re
+
+import pytest
+
+from field_rules import (
+    BATCH2_RULES,
+    COMPREHENSIVE_RULES,
+    NOTES_RULES,
+    PAGE_CASE_RULES,
+    FieldScanner,
+    Rule,
+    scanner,
+)
+
+RULE_LISTS = {
+    "page_case": PAGE_CASE_RULES,
+    "comprehensive": COMPREHENSIVE_RULES,
+    "batch2": BATCH2_RULES,
+}
+
+# Pieces the random texts are built from: every rule's keywords in
+# several cases, near misses, digits, prices and separators.
+PIECES = [
+    "case", "CASE", "Case", "pack", "PACK", "qty", "Qty", "QTY", "quantity", "Quantity",
+    "case pack", "Case Pack: ", "case quantity", "Case of ", "Pack of ", " per case",
+    "C/", "c/", "Price:", "price ", "Wholesale: ", "$", "$1.2", "$12.50", "$3.99",
+    "12", "6", "48", "0", ":", " ", "  ", "\n", "-", "x", "caSe", "ı", "İ",
+]
+
+
+def _sequential(rules, text, field):
+    """The old loop: try each rule of ``field`` in order with findall."""
+    for rule in rules:
+        if rule.field != field:
+            continue
+        matches = re.findall(rule.pattern, text, rule.flags)
+        if matches:
+            return matches[0]
+    return None
+
+
+def _notes_loop(notes_text):
+    """The old extract_case_quantity_from_notes line scan."""
+    for line in notes_text.splitlines():
+        if "case pack" in line.lower():
+            parts = line.split(":")
+            if len(parts) >= 2:
+                digits = "".join(ch for ch in parts[1].strip() if ch.isdigit())
+                if digits:
+                    return digits
+            digits = "".join(ch for ch in line if ch.isdigit())
+            if digits:
+                return digits
+    return None
+
+
+def _random_texts(count, seed=0):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield "".join(rng.choice(PIECES) for _ in range(rng.randint(0, 25)))
+
+
+@pytest.mark.parametrize("name", sorted(RULE_LISTS))
+def test_scanner_matches_sequential_loops(name):
+    rules = RULE_LISTS[name]
+    fields = {rule.field for rule in rules}
+    for text in _random_texts(3000):
+        found = scanner(rules).scan(text)
+        for field in fields:
+            match = found.get(field)
+            assert (match.value if match else None) == _sequential(rules, text, field), (field, text)
+
+
+def test_notes_rule_matches_line_scan():
+    for text in _random_texts(3000, seed=1):
+        match = scanner(NOTES_RULES).first(text, "case")
+        assert (match.value if match else None) == _notes_loop(text), text
+
+
+def test_higher_priority_rule_wins_over_earlier_match():
+    # "qty 3" comes first in the text, but "case pack" is tried first.
+    found = scanner(PAGE_CASE_RULES).scan("qty 3 ... Case Pack: 24")
+    assert found["case"].value == "24"
+    assert found["case"].rule == "case pack"
+
+
+def test_first_match_of_the_winning_rule_is_reported():
+    match = scanner(COMPREHENSIVE_RULES).first("C/6 and later C/12", "case")
+    assert (match.value, match.start) == ("6", 0)
+
+
+def test_fields_limit_the_scan():
+    text = "C/12 for $4.50"
+    assert set(scanner(COMPREHENSIVE_RULES).scan(text)) == {"case", "price"}
+    assert set(scanner(COMPREHENSIVE_RULES).scan(text, ["price"])) == {"price"}
+
+
+def test_price_rules_are_case_sensitive_like_the_old_loop():
+    assert scanner(COMPREHENSIVE_RULES).first("PRICE: no dollars", "price") is None
+    assert scanner(COMPREHENSIVE_RULES).first("PRICE: $2.00", "price").value == "2.00"
+
+
+def test_empty_text_finds_nothing():
+    assert scanner(COMPREHENSIVE_RULES).scan("") == {}
+    assert scanner(COMPREHENSIVE_RULES).scan(None) == {}
+
+
+def test_scanner_rejects_bad_rule_lists():
+    with pytest.raises(ValueError):
+        FieldScanner([])
+    with pytest.raises(ValueError):
+        FieldScanner([Rule("case", "bad", r"Case (\d+)", prefix="Case")])
+
+
+def test_scanner_is_cached_per_rule_list():
+    assert scanner(BATCH2_RULES) is scanner(list(BATCH2_RULES))
@@ -0,0 +1,128 @@
+"""
+Tests for item_keys: canonical keys, and planning an input column down
+to its distinct items and back.
+"""
+
+import sys
+
+import pytest
+
+from item_keys import canonical_key, canonical_keys, plan_items, stream_items
+
+SPELLINGS = ["Y7282", "#7282", " 7282 ", "7282.0", "7282", "y 7282", 7282, 7282.0]
+VALUES = ["Y7282", "", "12238", "#7282", None, "nan", "11358", "12238.0", "  ", "y7282", "ABC-1"]
+
+
+@pytest.mark.parametrize("value", SPELLINGS)
+def test_spellings_share_one_key(value):
+    assert canonical_key(value) == "7282"
+
+
+@pytest.mark.parametrize("value", ["", "   ", None, float("nan"), "nan", "None", "NULL", "<NA>", "#"])
+def test_blanks_have_no_key(value):
+    assert canonical_key(value) is None
+
+
+def test_other_keys_are_upper_cased_and_kept():
+    assert canonical_key("abc-1") == "ABC-1"
+    # Y is only a prefix when digits follow it.
+    assert canonical_key("YELLOW") == "YELLOW"
+    assert canonical_key("7282.5") == "7282.5"
+
+
+def test_vectorised_keys_match_single_keys():
+    import pandas as pd
+
+    keys = canonical_keys(VALUES + SPELLINGS)
+    expected = [canonical_key(value) for value in VALUES + SPELLINGS]
+    assert [None if pd.isna(key) else key for key in keys] == expected
+
+
+def test_stream_items_dedupes_in_order_of_first_appearance():
+    plan, keys = stream_items(VALUES)
+    assert list(keys) == ["7282", "12238", "11358", "ABC-1"]
+    assert plan.unique == ["7282", "12238", "11358", "ABC-1"]
+    assert plan.rows == ["Y7282", "12238", "#7282", "11358", "12238.0", "y7282", "ABC-1"]
+    assert plan.codes == [0, 1, 0, 2, 1, 0, 3]
+    assert plan.duplicates == 3
+
+
+def test_stream_items_reads_lazily():
+    read = []
+
+    def values():
+        for value in ["1", "2", "1", "3"]:
+            read.append(value)
+            yield value
+
+    plan, keys = stream_items(values())
+    assert read == []
+    assert next(keys) == "1"
+    assert read == ["1"]
+    assert next(keys) == "2"
+    assert plan.unique == ["1", "2"]
+
+
+@pytest.mark.parametrize("pandas_loaded", [False, True])
+def test_plan_items_agrees_with_stream_items(monkeypatch, pandas_loaded):
+    # Short lists are only planned with pandas when it is already loaded.
+    if pandas_loaded:
+        import pandas  # noqa: F401
+    else:
+        monkeypatch.delitem(sys.modules, "pandas", raising=False)
+    plan = plan_items(VALUES)
+    streamed, keys = stream_items(VALUES)
+    list(keys)
+    assert (plan.rows, plan.unique, plan.codes) == (streamed.rows, streamed.unique, streamed.codes)
+
+
+def test_plan_items_accepts_a_series():
+    import pandas as pd
+
+    plan = plan_items(pd.Series(VALUES, dtype="object"))
+    assert plan.unique == ["7282", "12238", "11358", "ABC-1"]
+
+
+def test_fan_out_copies_results_to_every_row():
+    plan = plan_items(["A1", "B2", "a1"])
+    assert plan.fan_out(["r-a", "r-b"]) == ["r-a", "r-b", "r-a"]
+    assert plan.fan_out(["r-a", "r-b"], relabel=lambda result, row: f"{row}:{result}") == [
+        "A1:r-a", "B2:r-b", "a1:r-a",
+    ]
+
+
+def test_fan_out_rejects_wrong_result_count():
+    plan = plan_items(["A1", "B2", "a1"])
+    with pytest.raises(ValueError):
+        plan.fan_out(["r-a"])
+
+
+def test_fan_out_stream_yields_rows_as_results_arrive():
+    plan, keys = stream_items(["1", "1", "2", "1", "3", "2"])
+    fetched = []
+
+    def results():
+        for key in keys:
+            fetched.append(key)
+            yield f"r{key}"
+
+    rows = plan.fan_out_stream(results())
+    # The first row is out before item 2 is fetched.
+    assert next(rows) == "r1"
+    assert fetched == ["1"]
+    assert list(rows) == ["r1", "r2", "r1", "r3", "r2"]
+    assert fetched == ["1", "2", "3"]
+
+
+def test_fan_out_stream_matches_fan_out():
+    plan = plan_items(VALUES)
+    results = [f"r{key}" for key in plan.unique]
+    assert list(plan.fan_out_stream(results)) == plan.fan_out(results)
+
+
+def test_fan_out_stream_rejects_missing_results():
+    plan = plan_items(["1", "2", "1"])
+    rows = plan.fan_out_stream(["r1"])
+    assert next(rows) == "r1"
+    with pytest.raises(ValueError):
+        next(rows)
@@ -0,0 +1,123 @@
+"""
+Tests for product_cache: expiry, what is stored, and canonical keys.
+"""
+
+import os
+import time
+
+import pytest
+
+from product_cache import ProductCache
+
+HOUR = 3600
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache.sqlite")
+
+
+def _stored(path, age_hours, max_age_hours):
+    with ProductCache(path, max_age_hours=None) as cache:
+        cache.put("12238", "DRAGON", "$24.95", "12", fetched_at=time.time() - age_hours * HOUR)
+    return ProductCache(path, max_age_hours=max_age_hours)
+
+
+def test_entry_inside_the_window_is_a_hit(path):
+    with _stored(path, age_hours=23, max_age_hours=24) as cache:
+        product = cache.get("12238")
+    assert (product.name, product.price, product.case_quantity) == ("DRAGON", "$24.95", "12")
+
+
+def test_entry_older_than_the_window_is_a_miss(path):
+    with _stored(path, age_hours=25, max_age_hours=24) as cache:
+        assert cache.get("12238") is None
+        assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_zero_max_age_always_misses(path):
+    with _stored(path, age_hours=0, max_age_hours=0) as cache:
+        assert cache.get("12238") is None
+
+
+def test_no_max_age_never_expires(path):
+    with _stored(path, age_hours=24 * 365, max_age_hours=None) as cache:
+        assert cache.get("12238") is not None
+
+
+def test_expiry_applies_to_the_memory_tier(path, monkeypatch):
+    with ProductCache(path, max_age_hours=1) as cache:
+        cache.put("12238", "DRAGON", "$24.95")
+        assert cache.get("12238") is not None
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now + 2 * HOUR)
+        assert cache.get("12238") is None
+
+
+@pytest.mark.parametrize("price", [None, "", "Login required for pricing", "Not found"])
+def test_products_without_a_price_are_not_stored(path, price):
+    with ProductCache(path) as cache:
+        assert cache.put("12238", "DRAGON", price) is False
+        assert cache.get("12238") is None
+
+
+def test_products_without_a_name_or_key_are_not_stored(path):
+    with ProductCache(path) as cache:
+        assert cache.put("12238", "Name not found", "$1.00") is False
+        assert cache.put("", "DRAGON", "$1.00") is False
+
+
+def test_priceless_legacy_entries_are_ignored(path):
+    with ProductCache(path) as cache:
+        cache._db.execute("INSERT INTO products VALUES ('12238', 'DRAGON', NULL, NULL, NULL, ?)", (time.time(),))
+        cache._db.commit()
+        assert cache.get("12238") is None
+
+
+def test_not_found_markers_are_stored_empty(path):
+    with ProductCache(path) as cache:
+        cache.put("12238", "DRAGON", "$24.95", "Case info not found", "N/A")
+        product = cache.get("12238")
+    assert (product.case_quantity, product.url) == (None, None)
+
+
+def test_older_result_never_replaces_a_newer_one(path):
+    now = time.time()
+    with ProductCache(path) as cache:
+        cache.put("12238", "NEW", "$2.00", fetched_at=now)
+        cache.put("12238", "OLD", "$1.00", fetched_at=now - HOUR)
+        assert cache.get("12238").name == "NEW"
+        cache.put("12238", "NEWER", "$3.00", fetched_at=now + 1)
+        assert cache.get("12238").name == "NEWER"
+
+
+def test_spellings_of_an_item_share_an_entry(path):
+    with ProductCache(path) as cache:
+        cache.put("Y7282", "CANDLE", "$5.00")
+        hits = cache.lookup(["7282", "#7282", "7282.0", "11358"])
+    assert set(hits) == {"7282", "#7282", "7282.0"}
+    assert {product.item for product in hits.values()} == {"7282"}
+
+
+def test_entries_persist_across_instances(path):
+    with ProductCache(path) as cache:
+        cache.put("12238", "DRAGON", "$24.95")
+    with ProductCache(path) as cache:
+        assert cache.get("12238").price == "$24.95"
+
+
+def test_import_csv_dates_rows_by_the_file(path, tmp_path):
+    results = tmp_path / "results.csv"
+    results.write_text(
+        "Item Number,Product Name,Unit Price,Case Quantity\n"
+        "12238,DRAGON,$24.95,12\n"
+        "11358,FAIRY,Login required,6\n",
+        encoding="utf-8",
+    )
+    week_ago = time.time() - 7 * 24 * HOUR
+    os.utime(results, (week_ago, week_ago))
+    with ProductCache(path, max_age_hours=None) as cache:
+        assert cache.import_csv(str(results)) == 1
+        assert cache.get("12238").fetched_at == pytest.approx(week_ago)
+    with ProductCache(path, max_age_hours=24) as cache:
+        assert cache.get("12238") is None
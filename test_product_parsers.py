@@ -0,0 +1,53 @@
+"""
+Tests for product_parsers: every installed backend must give the same
+ProductInfo as the html.parser reference.
+"""
+
+import pytest
+
+from pacificgiftware_scraper import ProductInfo
+from product_parsers import REFERENCE, available_parsers, check_parity, get_parser, parse_with_reference, sample_pages
+
+FAST_PARSERS = [name for name in available_parsers() if name != REFERENCE]
+
+
+def test_reference_reads_a_logged_in_page():
+    info = parse_with_reference(sample_pages()["logged_in"], "12238")
+    assert info == ProductInfo("12238", "MEDIEVAL DRAGON STATUE 12238", "$24.95", "12")
+
+
+def test_reference_has_no_price_when_logged_out():
+    info = parse_with_reference(sample_pages()["logged_out"], "12238")
+    assert info.product_name == "MEDIEVAL DRAGON STATUE 12238"
+    assert info.unit_price is None
+
+
+def test_reference_ignores_prices_in_scripts_and_styles():
+    info = parse_with_reference(sample_pages()["price_in_script"], "0")
+    assert info.unit_price == "$24.95"
+
+
+@pytest.mark.parametrize("name", FAST_PARSERS)
+def test_backend_matches_reference_on_sample_pages(name):
+    assert check_parity(sample_pages(), [name]) == []
+
+
+@pytest.mark.parametrize("name", FAST_PARSERS)
+def test_backend_matches_reference_without_product_markup(name):
+    # Broken markup may legitimately build different trees; these pages
+    # only exercise the price rule.
+    pages = {
+        "empty": "",
+        "fragments": "<p>$</p><p>$ 4</p><span>$5.00</span>",
+        "blank": "  \n",
+        "comment": "<html><body><!-- $9.99 --><h1>Cup</h1><p>Notes:</p><p>CASE PACK: 24</p></body></html>",
+    }
+    assert check_parity(pages, [name], item_number="1") == []
+
+
+def test_check_parity_reports_a_differing_backend(monkeypatch):
+    import product_parsers
+
+    monkeypatch.setattr(product_parsers, "get_parser", lambda name: lambda html, item: ProductInfo(item, "x", None, None))
+    mismatches = check_parity({"logged_in": sample_pages()["logged_in"]}, ["lxml"])
+    assert [(page, name) for page, name, _, _ in mismatches] == [("logged_in", "lxml")]
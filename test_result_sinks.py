@@ -0,0 +1,126 @@
+"""
+Tests for result_sinks: rows go to ``<path>.part`` and only reach
+``path`` when the sink is closed.
+"""
+
+import csv
+import gzip
+import json
+import os
+
+import pytest
+
+from result_sinks import CsvSink, JsonlSink, TeeSink, XlsxSink, open_sink, sink_type
+
+ROWS = [
+    {"Item Number": "12238", "Product Name": "DRAGON", "Unit Price": "$24.95"},
+    {"Item Number": "11358", "Product Name": "FAIRY, WINGED", "Unit Price": None},
+]
+
+
+def _read_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("out.csv", CsvSink),
+    ("out.CSV", CsvSink),
+    ("out.csv.gz", CsvSink),
+    ("out.jsonl", JsonlSink),
+    ("out.jsonl.gz", JsonlSink),
+    ("out.xlsx", XlsxSink),
+    ("out.txt", CsvSink),
+    ("out", CsvSink),
+])
+def test_sink_type_follows_the_extension(name, expected):
+    assert sink_type(name) is expected
+
+
+def test_gzipped_excel_is_rejected():
+    with pytest.raises(ValueError):
+        sink_type("out.xlsx.gz")
+
+
+def test_rows_go_to_the_part_file_until_close(tmp_path):
+    path = str(tmp_path / "out.csv")
+    sink = open_sink(path)
+    sink.write(ROWS[0])
+    assert not os.path.exists(path)
+    # Plain files are flushed row by row, so progress can be watched.
+    assert _read_csv(path + ".part") == [ROWS[0]]
+    sink.write(ROWS[1])
+    sink.close()
+    assert not os.path.exists(path + ".part")
+    assert [row["Product Name"] for row in _read_csv(path)] == ["DRAGON", "FAIRY, WINGED"]
+    assert sink.rows == 2
+
+
+def test_close_replaces_an_existing_output(tmp_path):
+    path = tmp_path / "out.csv"
+    path.write_text("old results\n", encoding="utf-8")
+    with open_sink(str(path)) as sink:
+        sink.write_many(ROWS)
+    assert len(_read_csv(str(path))) == 2
+
+
+def test_error_leaves_only_the_part_file(tmp_path):
+    path = str(tmp_path / "out.csv")
+    with pytest.raises(RuntimeError):
+        with open_sink(path) as sink:
+            sink.write(ROWS[0])
+            raise RuntimeError("browser died")
+    assert not os.path.exists(path)
+    assert len(_read_csv(path + ".part")) == 1
+
+
+def test_abort_keeps_an_earlier_output(tmp_path):
+    path = tmp_path / "out.csv"
+    path.write_text("old results\n", encoding="utf-8")
+    sink = open_sink(str(path))
+    sink.write(ROWS[0])
+    sink.abort()
+    sink.close()
+    assert path.read_text(encoding="utf-8") == "old results\n"
+
+
+def test_empty_csv_with_fieldnames_has_a_header(tmp_path):
+    path = str(tmp_path / "out.csv")
+    with open_sink(path, fieldnames=["Item Number", "Unit Price"]):
+        pass
+    with open(path, encoding="utf-8") as f:
+        assert f.read().strip() == "Item Number,Unit Price"
+
+
+def test_jsonl_gz_rows(tmp_path):
+    path = str(tmp_path / "out.jsonl.gz")
+    with open_sink(path, fieldnames=["Item Number", "Unit Price"]) as sink:
+        sink.write_many(ROWS)
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    assert rows == [
+        {"Item Number": "12238", "Unit Price": "$24.95"},
+        {"Item Number": "11358", "Unit Price": None},
+    ]
+
+
+def test_xlsx_is_saved_on_close(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    path = str(tmp_path / "out.xlsx")
+    with open_sink(path) as sink:
+        sink.write_many(ROWS)
+        assert not os.path.exists(path)
+    sheet = openpyxl.load_workbook(path).active
+    assert [cell.value for cell in sheet[1]] == list(ROWS[0])
+    assert sheet.max_row == 3
+    assert not os.path.exists(path + ".part")
+
+
+def test_tee_writes_every_sink(tmp_path):
+    paths = [str(tmp_path / "out.csv"), str(tmp_path / "out.jsonl")]
+    with TeeSink(*(open_sink(path) for path in paths)) as sink:
+        sink.write_many(ROWS)
+    assert sink.rows == 2
+    assert len(_read_csv(paths[0])) == 2
+    with open(paths[1], encoding="utf-8") as f:
+        assert len(f.readlines()) == 2
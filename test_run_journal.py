@@ -0,0 +1,104 @@
+"""
+Tests for run_journal: recording finished items and resuming from them.
+"""
+
+import json
+
+import pytest
+
+from run_journal import RunJournal, journal_path
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "results.csv.journal")
+
+
+def _lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_journal_sits_next_to_the_output():
+    assert journal_path("out/results.csv") == "out/results.csv.journal"
+
+
+def test_resume_skips_finished_items_and_retries_failed_ones(path):
+    with RunJournal(path) as journal:
+        journal.record("1", {"name": "A"})
+        journal.record("2", {"name": ""}, ok=False)
+        journal.record("3", {"name": "C"})
+    with RunJournal(path, resume=True) as journal:
+        assert journal.completed() == {"1": {"name": "A"}, "3": {"name": "C"}}
+
+
+def test_later_failure_undoes_an_earlier_success(path):
+    with RunJournal(path) as journal:
+        journal.record("1", {"name": "A"})
+        journal.record("1", {"name": ""}, ok=False)
+    with RunJournal(path, resume=True) as journal:
+        assert journal.completed() == {}
+
+
+def test_resume_appends_to_the_journal(path):
+    with RunJournal(path) as journal:
+        journal.record("1", {"name": "A"})
+    with RunJournal(path, resume=True) as journal:
+        journal.record("2", {"name": "B"})
+        assert journal.recorded == 1
+    assert [entry["item"] for entry in _lines(path)] == ["1", "2"]
+
+
+def test_fresh_run_truncates_the_journal(path):
+    with RunJournal(path) as journal:
+        journal.record("1", {"name": "A"})
+    with RunJournal(path) as journal:
+        assert journal.completed() == {}
+    with RunJournal(path, resume=True) as journal:
+        assert journal.completed() == {}
+
+
+def test_resume_without_a_journal_starts_empty(path):
+    with RunJournal(path, resume=True) as journal:
+        assert journal.completed() == {}
+        journal.record("1", {"name": "A"})
+    assert len(_lines(path)) == 1
+
+
+@pytest.mark.parametrize("tail", ['{"item": "2", "ok": tr', "{", "x" * 10000])
+def test_partial_last_line_is_trimmed_on_resume(path, tail):
+    with RunJournal(path) as journal:
+        journal.record("1", {"name": "A"})
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(tail)
+    with RunJournal(path, resume=True) as journal:
+        assert journal.completed() == {"1": {"name": "A"}}
+        journal.record("3", {"name": "C"})
+    assert [entry["item"] for entry in _lines(path)] == ["1", "3"]
+
+
+def test_journal_of_only_a_partial_line_is_emptied(path):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"item": "1"')
+    with RunJournal(path, resume=True) as journal:
+        assert journal.completed() == {}
+        journal.record("2", {"name": "B"})
+    assert [entry["item"] for entry in _lines(path)] == ["2"]
+
+
+def test_record_after_close_is_ignored(path):
+    journal = RunJournal(path)
+    journal.record("1", {"name": "A"})
+    journal.close()
+    journal.record("2", {"name": "B"})
+    journal.close()
+    assert journal.recorded == 1
+    assert len(_lines(path)) == 1
+
+
+def test_interrupt_prints_how_to_resume(path, capsys):
+    with pytest.raises(KeyboardInterrupt):
+        with RunJournal(path) as journal:
+            journal.record("1", {"name": "A"})
+            raise KeyboardInterrupt
+    assert "--resume" in capsys.readouterr().out
@@ -0,0 +1,426 @@
+"""
+url_index.py
+------------
+
+Remember which URL each item number resolves to.
+
+Item numbers reach the scrapers in several spellings (``Y7282``,
+``#123``, ``8791``) and product pages live under more than one route.
+``comprehensive_filler.extract_comprehensive_data`` loads
+``/product/{id}`` and then ``/item/{id}``, waiting for each, and
+``verify_items.test_item_formats`` tries three prefixes against three
+routes.  Every run pays for the same misses again.
+
+:class:`UrlIndex` keeps a small JSON file mapping each raw item number
+to the URL that worked, or to ``None`` when no route did.  Entries
+expire after ``ttl_days`` (found) or ``miss_ttl_days`` (not found), so
+moved or newly listed products are picked up again.
+:meth:`UrlIndex.candidates` puts the remembered URL in front of the
+usual routes.  A stale entry therefore costs one extra page load and is
+then corrected.
+
+The index can be filled ahead of a run with :meth:`UrlIndex.warm`,
+which probes many items concurrently.  The product pages are rendered
+in the browser: every route answers 200 with the same "Loading..."
+shell, so only a :class:`BrowserProbe` can tell a product from a
+missing one.  :func:`http_probe` is cheaper but judges only pages whose
+HTML already carries the product; for the shell it raises
+:class:`ProbeInconclusive`, and nothing is recorded::
+
+    python url_index.py --file items.csv --workers 4
+
+The file defaults to ``.pacific_urls.json`` in the working directory
+and can be moved with the ``PACIFIC_URL_INDEX`` environment variable.
+
+Example
+-------
+::
+
+    from url_index import UrlIndex
+
+    index = UrlIndex()
+    for url in index.candidates("Y7282"):
+        ...
+    index.put("Y7282", working_url)
+    index.save()
+
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+BASE_URL = "https://www.pacificgiftware.com"
+
+# Routes a product page may live under, most likely first.
+ROUTES = (
+    BASE_URL + "/product/{}",
+    BASE_URL + "/item/{}",
+)
+
+DEFAULT_INDEX_FILE = os.environ.get("PACIFIC_URL_INDEX", ".pacific_urls.json")
+DEFAULT_TTL_DAYS = 30.0
+DEFAULT_MISS_TTL_DAYS = 1.0
+
+_TITLE = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+_H1 = re.compile(r"<h1[^>]*>(.*?)</h1>", re.IGNORECASE | re.DOTALL)
+_TAG = re.compile(r"<[^>]+>")
+
+
+class ProbeInconclusive(Exception):
+    """Raised by a probe that cannot tell whether a URL shows a product."""
+
+
+def clean_item_number(item_number: Any) -> str:
+    """The bare number used in product URLs, e.g. ``7282`` for ``Y7282``."""
+    return str(item_number).strip().replace("Y", "").replace("#", "")
+
+
+def title_found(title: str) -> bool:
+    """``True`` unless a page title reads like an error page."""
+    title = title.lower()
+    return "not found" not in title and "error" not in title
+
+
+class UrlIndex:
+    """
+    A persistent map from raw item number to the URL that worked.
+
+    Parameters
+    ----------
+    path : str, optional
+        Location of the JSON file.
+    ttl_days : float, optional
+        How long a found URL is trusted.
+    miss_ttl_days : float, optional
+        How long an item that resolved to nothing is skipped.  ``0``
+        never remembers misses.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_INDEX_FILE,
+        ttl_days: float = DEFAULT_TTL_DAYS,
+        miss_ttl_days: float = DEFAULT_MISS_TTL_DAYS,
+    ) -> None:
+        self.path = path
+        self.ttl = ttl_days * 86400
+        self.miss_ttl = miss_ttl_days * 86400
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = self._load()
+        self._dirty = False
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data.get("items", {}) if isinstance(data, dict) else {}
+
+    @staticmethod
+    def key(item_number: Any) -> str:
+        return str(item_number).strip()
+
+    def _fresh(self, item_number: Any) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(self.key(item_number))
+        if entry is None:
+            return None
+        ttl = self.ttl if entry.get("url") else self.miss_ttl
+        if time.time() - entry.get("checked", 0) > ttl:
+            return None
+        return entry
+
+    def get(self, item_number: Any) -> Optional[str]:
+        """The remembered URL of ``item_number``, if still fresh."""
+        entry = self._fresh(item_number)
+        return entry.get("url") if entry else None
+
+    def is_missing(self, item_number: Any) -> bool:
+        """``True`` if ``item_number`` recently resolved to no page."""
+        entry = self._fresh(item_number)
+        return entry is not None and not entry.get("url")
+
+    def put(self, item_number: Any, url: Optional[str]) -> None:
+        """Record the URL that worked, or ``None`` if none did."""
+        if url is None and not self.miss_ttl:
+            return
+        with self._lock:
+            self._entries[self.key(item_number)] = {"url": url, "checked": time.time()}
+            self._dirty = True
+
+    def forget(self, item_number: Any) -> None:
+        with self._lock:
+            if self._entries.pop(self.key(item_number), None) is not None:
+                self._dirty = True
+
+    def candidates(
+        self,
+        item_number: Any,
+        routes: Sequence[str] = ROUTES,
+        variants: Optional[Sequence[str]] = None,
+    ) -> List[str]:
+        """
+        URLs to try for ``item_number``, the remembered one first.
+
+        ``variants`` are the spellings to put into each route; the
+        default is :func:`clean_item_number` alone.
+        """
+        if variants is None:
+            variants = [clean_item_number(item_number)]
+        urls = [route.format(variant) for variant in variants for route in routes]
+        known = self.get(item_number)
+        if known:
+            urls = [known] + [url for url in urls if url != known]
+        return urls
+
+    def resolve(
+        self,
+        item_number: Any,
+        probe: Callable[[str], bool],
+        routes: Sequence[str] = ROUTES,
+        variants: Optional[Sequence[str]] = None,
+        refresh: bool = False,
+    ) -> Optional[str]:
+        """
+        Return the URL of ``item_number``, probing candidates if needed.
+
+        A fresh entry is returned without probing, and a fresh miss
+        returns ``None`` straight away, unless ``refresh`` is set.
+        Otherwise candidates are tried with ``probe(url)`` until one
+        returns ``True``, and the URL is recorded.  A miss is recorded
+        only when ``probe`` returned ``False`` for every candidate; if
+        any probe raised (a timeout, a crashed browser,
+        :class:`ProbeInconclusive`), the item is left unresolved so the
+        next run tries again.
+        """
+        entry = self._fresh(item_number)
+        if entry is not None and not refresh:
+            return entry.get("url")
+        checked_all = True
+        for url in self.candidates(item_number, routes, variants):
+            try:
+                if probe(url):
+                    self.put(item_number, url)
+                    return url
+            except Exception:
+                checked_all = False
+        if checked_all:
+            self.put(item_number, None)
+        return None
+
+    def warm(
+        self,
+        item_numbers: Iterable[Any],
+        probe: Callable[[str], bool],
+        workers: int = 8,
+        routes: Sequence[str] = ROUTES,
+        variants: Optional[Callable[[str], Sequence[str]]] = None,
+        refresh: bool = False,
+    ) -> Dict[str, Optional[str]]:
+        """
+        Resolve every item that has no fresh entry, ``workers`` at once.
+
+        ``probe`` must be safe to call from several threads.
+        ``variants(item)`` gives the spellings to try for an item (see
+        :meth:`candidates`), and ``refresh`` probes items with fresh
+        entries too.  Each item stops at its first hit.  The index is
+        saved afterwards; the resolved URLs are returned by item.
+        """
+        pending = list(dict.fromkeys(
+            self.key(item) for item in item_numbers if refresh or self._fresh(item) is None
+        ))
+
+        def resolve(item: str) -> Optional[str]:
+            return self.resolve(item, probe, routes, variants(item) if variants else None, refresh)
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                list(executor.map(resolve, pending))
+            self.save()
+        return {item: self.get(item) for item in pending}
+
+    def save(self) -> None:
+        """Write the index to disk if it changed, replacing it atomically."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"saved_at": time.time(), "items": dict(self._entries)}
+            self._dirty = False
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".urls-", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _redirected(requested: str, landed: str) -> bool:
+    from urllib.parse import urlparse
+
+    return urlparse(landed).path.rstrip("/") != urlparse(requested).path.rstrip("/")
+
+
+def http_probe(session: Optional[Any] = None, timeout: float = 10) -> Callable[[str], bool]:
+    """
+    A thread-safe probe that fetches a URL over HTTP.
+
+    A URL is missing when it answers anything but 200, is redirected
+    elsewhere, or its ``<title>`` or ``<h1>`` reads like an error page
+    (see :func:`title_found`).  It is found only when the HTML already
+    shows a product title in an ``<h1>``.
+
+    Raises
+    ------
+    ProbeInconclusive
+        For the client-rendered shell, which has no ``<h1>`` (or only
+        "Loading...") whether or not the product exists.
+    """
+    import requests
+
+    session = session or requests.Session()
+
+    def probe(url: str) -> bool:
+        response = session.get(url, timeout=timeout)
+        if response.status_code != 200 or _redirected(url, response.url):
+            return False
+        title = _TITLE.search(response.text)
+        if title and not title_found(title.group(1)):
+            return False
+        heading = _H1.search(response.text)
+        text = _TAG.sub("", heading.group(1)).strip() if heading else ""
+        if not text or text.lower().startswith("loading"):
+            raise ProbeInconclusive(f"{url} is rendered in the browser; probe it with a BrowserProbe")
+        return title_found(text)
+
+    return probe
+
+
+class BrowserProbe:
+    """
+    A thread-safe probe that renders each URL in a browser.
+
+    Every thread that calls the probe gets its own browser from
+    ``make_driver(profile_dir)``, with a fresh Chrome profile directory
+    (Chrome locks its profile), so :meth:`UrlIndex.warm` runs one
+    browser per worker.  A URL is found once the product ``<h1>`` has rendered (see
+    :func:`readiness.wait_until_ready`), and missing when the page says
+    it does not exist or redirects elsewhere.  A page that has not
+    rendered within ``timeout`` raises :class:`ProbeInconclusive`.
+
+    Use it as a context manager, or call :meth:`close`, to quit the
+    browsers and remove their profiles.
+    """
+
+    def __init__(self, make_driver: Callable[[str], Any], timeout: float = 10) -> None:
+        self.make_driver = make_driver
+        self.timeout = timeout
+        self._local = threading.local()
+        self._drivers: List[Any] = []
+        self._profiles: List[str] = []
+        self._lock = threading.Lock()
+
+    def _driver(self) -> Any:
+        driver = getattr(self._local, "driver", None)
+        if driver is None:
+            profile_dir = tempfile.mkdtemp(prefix="pacific-probe-")
+            with self._lock:
+                self._profiles.append(profile_dir)
+            driver = self._local.driver = self.make_driver(profile_dir)
+            with self._lock:
+                self._drivers.append(driver)
+        return driver
+
+    def __call__(self, url: str) -> bool:
+        from readiness import wait_until_ready
+
+        driver = self._driver()
+        driver.get(url)
+        state = wait_until_ready(driver, ("title",), timeout=self.timeout)
+        if state == "not_found" or _redirected(url, driver.current_url):
+            return False
+        if state is None:
+            raise ProbeInconclusive(f"{url} did not render within {self.timeout:g}s")
+        return title_found(driver.title)
+
+    def close(self) -> None:
+        import shutil
+
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+            profiles, self._profiles = self._profiles, []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        for profile_dir in profiles:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+
+    def __enter__(self) -> "BrowserProbe":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def browser_probe(timeout: float = 10) -> BrowserProbe:
+    """A :class:`BrowserProbe` with headless, image-blocking browsers."""
+    from pacificgiftware_scraper import start_driver
+
+    return BrowserProbe(
+        lambda profile_dir: start_driver(headless=True, user_data_dir=profile_dir, block="text+xhr"), timeout
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Resolve item numbers to product URLs ahead of a run.")
+    parser.add_argument("items", nargs="*", help="Item numbers to resolve.")
+    parser.add_argument("--file", help="CSV or Excel file of item numbers (first column).")
+    parser.add_argument("--workers", type=int, default=4, help="Browsers (or, with --http, requests) at once (default: 4).")
+    parser.add_argument("--http", action="store_true",
+                        help="Probe over HTTP; only decides pages whose HTML already shows the product.")
+    parser.add_argument("--index", default=DEFAULT_INDEX_FILE, help="Index file (default: %(default)s).")
+    args = parser.parse_args(argv)
+
+    items = list(args.items)
+    if args.file:
+        from pacificgiftware_scraper import read_item_numbers
+
+        items.extend(read_item_numbers(args.file))
+    if not items:
+        parser.error("give item numbers or --file")
+
+    index = UrlIndex(args.index)
+    if args.http:
+        from http_handoff import session_from_file
+
+        resolved = index.warm(items, http_probe(session_from_file(pool_size=args.workers)), args.workers)
+    else:
+        with browser_probe() as probe:
+            resolved = index.warm(items, probe, args.workers)
+    found = sum(1 for url in resolved.values() if url)
+    missing = sum(1 for item in resolved if index.is_missing(item))
+    print(f"Resolved {len(resolved)} item(s): {found} found, {missing} not found, "
+          f"{len(resolved) - found - missing} undecided; {len(index)} in {args.index}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
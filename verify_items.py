@@ -1,123 +1,147 @@
 #!/usr/bin/env python3
 """
 Verify item access and test different formats
+
+Candidate URLs are probed in several headless browsers at once, and each
+item stops at its first working URL.  The site renders product pages in
+the browser, so a plain HTTP fetch returns the same shell for every URL;
+``--http`` only decides pages whose HTML already shows the product.
+Results go into the shared ``url_index.UrlIndex`` that the scrapers read.
 """
 
-import requests
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+import argparse
 import time
 
-def test_item_formats(item_numbers):
-    """Test different formats for item numbers"""
-    
-    base_urls = [
-        "https://www.pacificgiftware.com/item/{}",
-        "https://www.pacificgiftware.com/product/{}",
-        "https://www.pacificgiftware.com/items/{}",
-    ]
-    
-    prefixes = ["", "Y", "#"]
-    
-    print("🔍 Testing item number formats...")
-    
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    
-    driver = webdriver.Chrome(options=options)
-    
+from url_index import UrlIndex, browser_probe, http_probe
+
+# Tried in this order for every item: each prefix against each route
+BASE_URLS = [
+    "https://www.pacificgiftware.com/item/{}",
+    "https://www.pacificgiftware.com/product/{}",
+    "https://www.pacificgiftware.com/items/{}",
+]
+
+PREFIXES = ["", "Y", "#"]
+
+def item_formats(item):
+    """Spellings of an item number to try in the URL"""
+    return [f"{prefix}{item}" for prefix in PREFIXES]
+
+def make_probe(workers, http=False):
+    """Browser probe, or with ``http`` an HTTP probe using the saved login session"""
+    if not http:
+        return browser_probe()
+    from http_handoff import session_from_file
+
+    return http_probe(session_from_file(pool_size=workers))
+
+def close_probe(probe):
+    """Quit the browsers of a browser probe; HTTP probes hold nothing"""
+    close = getattr(probe, "close", None)
+    if close is not None:
+        close()
+
+def verify_item_urls(item_numbers, workers=4, url_index=None, refresh=False, probe=None):
+    """Resolve the working URL of every item, ``workers`` items at a time
+
+    Items with a fresh entry in ``url_index`` are not probed again
+    unless ``refresh`` is set.  Returns a dict of item -> URL (``None``
+    when no format worked, or the probes could not decide), in input
+    order.
+    """
+    url_index = url_index or UrlIndex()
+    own_probe = probe is None
+    probe = probe or make_probe(workers)
+
+    start = time.time()
     try:
-        for item in item_numbers:
-            print(f"\n📦 Testing item: {item}")
-            
-            for prefix in prefixes:
-                for base_url in base_urls:
-                    test_item = f"{prefix}{item}"
-                    url = base_url.format(test_item)
-                    
-                    try:
-                        driver.get(url)
-                        time.sleep(2)
-                        
-                        title = driver.title
-                        current_url = driver.current_url
-                        
-                        if "not found" not in title.lower() and "error" not in title.lower():
-                            print(f"  ✓ FOUND: {url}")
-                            print(f"    Title: {title}")
-                            
-                            # Try to get some basic info
-                            try:
-                                h1 = driver.find_element("tag name", "h1")
-                                print(f"    Product: {h1.text}")
-                            except:
-                                pass
-                            
-                            return url, test_item  # Return first working format
-                        else:
-                            print(f"  ❌ Not found: {url} (Title: {title})")
-                            
-                    except Exception as e:
-                        print(f"  ❌ Error accessing {url}: {str(e)}")
-        
-        print("\n❌ No working formats found for these items")
-        return None, None
-        
+        url_index.warm(item_numbers, probe, workers, BASE_URLS, item_formats, refresh)
     finally:
-        driver.quit()
+        if own_probe:
+            close_probe(probe)
+    print(f"  Checked {len(item_numbers)} items in {time.time() - start:.1f}s")
+
+    undecided = [item for item in item_numbers if not url_index.get(item) and not url_index.is_missing(item)]
+    if undecided:
+        print(f"  ⚠️  {len(undecided)} item(s) could not be checked; they were not recorded")
+    return {item: url_index.get(item) for item in item_numbers}
+
+def test_item_formats(item_numbers, url_index=None, workers=4, probe=None):
+    """Test different formats for item numbers"""
+
+    print("🔍 Testing item number formats...")
+
+    results = verify_item_urls(item_numbers, workers, url_index, probe=probe)
 
-def test_known_working_items():
+    for item, url in results.items():
+        if url:
+            print(f"  ✓ FOUND: {item} -> {url}")
+        else:
+            print(f"  ❌ Not found: {item}")
+
+    for item, url in results.items():
+        if url:
+            return url, url.rstrip('/').rsplit('/', 1)[-1]  # Return first working format
+
+    print("\n❌ No working formats found for these items")
+    return None, None
+
+def test_known_working_items(url_index=None, workers=4, probe=None):
     """Test with previously working items"""
     print("🧪 Testing known working items...")
-    
+
     known_items = ["12238", "11358", "Y7282"]
-    
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    
-    driver = webdriver.Chrome(options=options)
-    
-    try:
-        for item in known_items:
-            clean_item = item.replace('Y', '')
-            url = f"https://www.pacificgiftware.com/item/{clean_item}"
-            
-            print(f"\n📦 Testing known item: {item} -> {url}")
-            
-            driver.get(url)
-            time.sleep(2)
-            
-            title = driver.title
-            print(f"  Title: {title}")
-            
-            if "not found" not in title.lower():
-                print(f"  ✓ Still accessible")
-                try:
-                    h1 = driver.find_element("tag name", "h1")
-                    print(f"  Product: {h1.text}")
-                except:
-                    print("  ⚠️  No H1 found")
-            else:
-                print(f"  ❌ No longer accessible")
-    
-    finally:
-        driver.quit()
+
+    # Re-check even if the index says they resolved recently
+    results = verify_item_urls(known_items, workers, url_index, refresh=True, probe=probe)
+
+    for item, url in results.items():
+        if url:
+            print(f"  ✓ Still accessible: {item} -> {url}")
+        else:
+            print(f"  ❌ No longer accessible: {item}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Check which URL each item number is available at.")
+    parser.add_argument("items", nargs="*", help="Item numbers to verify (default: a few sample items)")
+    parser.add_argument("--file", help="CSV or Excel file of item numbers (first column)")
+    parser.add_argument("--workers", type=int, help="Items probed at once (default: 4 browsers, or 16 with --http)")
+    parser.add_argument("--http", action="store_true",
+                        help="Probe over plain HTTP; only works where the HTML already shows the product")
+    parser.add_argument("--refresh", action="store_true", help="Probe items already in the index again")
+    args = parser.parse_args()
+
     print("🔍 Pacific Giftware Item Verification")
     print("=" * 50)
-    
-    # Test known working items first
-    test_known_working_items()
-    
-    # Test new items with different formats
-    new_items = ['8990', '8773', '13841']
-    working_url, working_format = test_item_formats(new_items)
-    
+
+    url_index = UrlIndex()
+
+    items = list(args.items)
+    if args.file:
+        from pacificgiftware_scraper import read_item_numbers
+        items.extend(read_item_numbers(args.file))
+
+    workers = args.workers or (16 if args.http else 4)
+    probe = make_probe(workers, args.http)
+    try:
+        if items:
+            results = verify_item_urls(items, workers, url_index, args.refresh, probe)
+            found = sum(1 for url in results.values() if url)
+            print(f"\n✅ {found}/{len(results)} items found")
+            for item, url in results.items():
+                if not url:
+                    print(f"  ❌ {item}")
+            return
+
+        # Test known working items first
+        test_known_working_items(url_index, workers, probe)
+
+        # Test new items with different formats
+        new_items = ['8990', '8773', '13841']
+        working_url, working_format = test_item_formats(new_items, url_index, workers, probe)
+    finally:
+        close_probe(probe)
+
     if working_url:
         print(f"\n✅ Found working format: {working_format}")
         print(f"✅ Working URL pattern: {working_url}")
@@ -125,9 +149,9 @@ def main():
         print("\n❌ These items may not exist in Pacific Giftware database")
         print("   Possible reasons:")
         print("   - Items don't exist")
-        print("   - Items are discontinued") 
+        print("   - Items are discontinued")
         print("   - Items require special authentication")
         print("   - Items are in a different product category")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -12,6 +12,8 @@ import time
 import os
 import re
 
+from browser_host import apply_chrome_binary, chromedriver_service
+
 def setup_chrome_driver():
     """Set up Chrome driver"""
     chrome_options = Options()
@@ -21,7 +23,8 @@ def setup_chrome_driver():
     chrome_options.add_argument("--disable-gpu")
     chrome_options.add_argument("--window-size=1920,1080")
     
-    driver = webdriver.Chrome(options=chrome_options)
+    apply_chrome_binary(chrome_options)
+    driver = webdriver.Chrome(service=chromedriver_service(), options=chrome_options)
     return driver
 
 def scrape_item_data(driver, item_number):
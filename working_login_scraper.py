@@ -15,6 +15,11 @@ import time
 import os
 import re
 
+from browser_host import apply_chrome_binary, chromedriver_service
+from readiness import use_eager_loading, wait_until_ready
+from selector_stats import selector_registry
+from session_store import restore_or_login
+
 def setup_chrome_driver():
     """Set up Chrome driver with working configuration"""
     chrome_options = Options()
@@ -26,8 +31,10 @@ def setup_chrome_driver():
     chrome_options.add_argument("--disable-blink-features=AutomationControlled")
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option('useAutomationExtension', False)
+    use_eager_loading(chrome_options)
     
-    driver = webdriver.Chrome(options=chrome_options)
+    apply_chrome_binary(chrome_options)
+    driver = webdriver.Chrome(service=chromedriver_service(), options=chrome_options)
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
     return driver
 
@@ -124,7 +131,9 @@ def scrape_with_pricing(driver, item_number):
         # Use working URL structure
         url = f"https://www.pacificgiftware.com/product/{clean_item}"
         driver.get(url)
-        time.sleep(4)
+        # The price selectors and the page source are read after this, so
+        # let the page finish loading rather than stopping it
+        wait_until_ready(driver, ("title", "price"), timeout=4, stop_loading=False)
         
         page_title = driver.title
         print(f"    Page: {page_title}")
@@ -173,19 +182,16 @@ def scrape_with_pricing(driver, item_number):
         
         print(f"    🔍 Searching for pricing information...")
         
-        for selector in price_selectors:
-            try:
-                price_elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                for element in price_elements:
-                    text = element.text.strip()
-                    if text and '$' in text:
-                        unit_price = text
-                        print(f"    ✓ Found price using {selector}: {unit_price}")
-                        break
-                if unit_price != "Price not found":
-                    break
-            except:
-                continue
+        def price_text(selector):
+            for element in driver.find_elements(By.CSS_SELECTOR, selector):
+                text = element.text.strip()
+                if text and '$' in text:
+                    return text
+        
+        found = selector_registry().first("product.price", price_selectors, price_text, by_hits=False)
+        if found:
+            selector, unit_price = found
+            print(f"    ✓ Found price using {selector}: {unit_price}")
         
         # If no price found with selectors, search page source
         if unit_price == "Price not found":
@@ -245,8 +251,8 @@ def main():
     driver = setup_chrome_driver()
     
     try:
-        # Perform login
-        login_success = successful_login(driver)
+        # Perform login, reusing the saved session if it is still valid
+        login_success = restore_or_login(driver, lambda: successful_login(driver))
         
         if not login_success:
             print("❌ Login failed, cannot get wholesale pricing")
@@ -0,0 +1,226 @@
+"""
+xhr_capture.py
+--------------
+
+Build :class:`~pacificgiftware_scraper.ProductInfo` from the product
+JSON the page downloads, instead of from the rendered DOM.
+
+The product page is a client-rendered Material‑UI app: the name, price
+and notes arrive as JSON over XHR/fetch and are only then turned into
+HTML.  With Chrome's performance log enabled, every network response of
+a navigation is visible as DevTools ``Network.*`` events.  For each
+product page this module looks for a JSON response that contains a
+record for the requested item, reads its body with
+``Network.getResponseBody`` and maps the record's fields directly.
+
+That avoids waiting for the full render and avoids text heuristics such
+as scanning every string for ``'$'``.  The field names the backend uses
+are matched against the candidate key lists below; if no suitable
+response is seen within the timeout, :func:`product_from_network`
+returns ``None`` and the caller falls back to the DOM parser in
+:func:`pacificgiftware_scraper.parse_product_html`.  The timeout
+defaults to 1.5 s, since the product JSON arrives well before the page
+renders, and can be changed with the ``PACIFIC_CAPTURE_TIMEOUT``
+environment variable.
+
+A record is only taken for the item when one of the item-number keys
+below matches.  A bare ``id`` is not one of them: cart, analytics and
+other responses on the page carry numeric ids that can equal an item
+number.
+
+Capture is switched on per driver with
+``start_driver(capture=True)``, which enables the performance log and
+calls :func:`enable` on the new driver.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import os
+import time
+import weakref
+from typing import Any, Dict, Iterator, List, Optional
+
+from request_blocking import drain_network_events, get_blocker
+
+# Candidate JSON keys, most specific first.  Matching is case-insensitive.
+ITEM_KEYS = ["itemNumber", "item_number", "itemNo", "sku", "productCode", "code", "item"]
+NAME_KEYS = ["productName", "product_name", "name", "title"]
+PRICE_KEYS = ["unitPrice", "unit_price", "wholesalePrice", "wholesale_price", "price"]
+NOTES_KEYS = ["notes", "note", "productNotes", "description"]
+CASE_KEYS = ["casePack", "case_pack", "caseQty", "case_qty", "caseQuantity", "case_quantity"]
+
+# Seconds to wait for the product JSON before falling back to the DOM.
+DEFAULT_TIMEOUT = float(os.environ.get("PACIFIC_CAPTURE_TIMEOUT", "1.5"))
+
+_capturing: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+
+def enable(driver: Any) -> None:
+    """
+    Turn on response capture for ``driver``.
+
+    The driver must have been created with the performance log enabled
+    (see :func:`request_blocking.enable_network_log`).
+    """
+    driver.execute_cdp_cmd("Network.enable", {})
+    _capturing.add(driver)
+
+
+def is_capturing(driver: Any) -> bool:
+    """Return ``True`` if :func:`enable` was called for ``driver``."""
+    return driver in _capturing
+
+
+def _lookup(record: Dict[str, Any], keys: List[str]) -> Any:
+    """Return the first non-empty value of ``keys`` in ``record``."""
+    lowered = {str(k).lower(): v for k, v in record.items()}
+    for key in keys:
+        value = lowered.get(key.lower())
+        if value not in (None, "", [], {}):
+            return value
+    return None
+
+
+def _normalise_item(value: Any) -> str:
+    return str(value).strip().lstrip("#").upper()
+
+
+def _walk(data: Any) -> Iterator[Dict[str, Any]]:
+    """Yield every dict in a JSON document, outermost first."""
+    stack = [data]
+    while stack:
+        node = stack.pop(0)
+        if isinstance(node, dict):
+            yield node
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+
+
+def find_product_record(data: Any, item_number: str) -> Optional[Dict[str, Any]]:
+    """
+    Find the record describing ``item_number`` in a JSON document.
+
+    A record qualifies when one of :data:`ITEM_KEYS` equals the item
+    number and it also carries a name or price.
+    """
+    wanted = _normalise_item(item_number)
+    for record in _walk(data):
+        ident = _lookup(record, ITEM_KEYS)
+        if ident is None or _normalise_item(ident) != wanted:
+            continue
+        if _lookup(record, NAME_KEYS) is not None or _lookup(record, PRICE_KEYS) is not None:
+            return record
+    return None
+
+
+def _format_price(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, dict):
+        value = _lookup(value, ["amount", "value", "price"])
+        if value is None:
+            return None
+    if isinstance(value, (int, float)):
+        return f"${value:.2f}"
+    text = str(value).strip()
+    if not text:
+        return None
+    return text if text.startswith("$") else f"${text}"
+
+
+def product_from_record(record: Dict[str, Any], item_number: str) -> Any:
+    """Map a product JSON record to a :class:`ProductInfo`."""
+    from pacificgiftware_scraper import ProductInfo, extract_case_quantity_from_notes
+
+    case_quantity = _lookup(record, CASE_KEYS)
+    if case_quantity is None:
+        notes = _lookup(record, NOTES_KEYS)
+        case_quantity = extract_case_quantity_from_notes(notes) if isinstance(notes, str) else None
+    name = _lookup(record, NAME_KEYS)
+    return ProductInfo(
+        item_number=item_number,
+        product_name=str(name).strip() if name is not None else "",
+        unit_price=_format_price(_lookup(record, PRICE_KEYS)),
+        case_quantity=str(case_quantity) if case_quantity is not None else None,
+    )
+
+
+def _response_json(driver: Any, request_id: str) -> Any:
+    """Fetch and decode a response body, or ``None`` if unavailable."""
+    try:
+        result = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+    except Exception:
+        # Bodies of redirects, evicted or cancelled requests are gone.
+        return None
+    body = result.get("body", "")
+    if result.get("base64Encoded"):
+        body = base64.b64decode(body).decode("utf-8", errors="replace")
+    try:
+        return json.loads(body)
+    except ValueError:
+        return None
+
+
+def product_from_network(
+    driver: Any,
+    item_number: str,
+    timeout: float = DEFAULT_TIMEOUT,
+    poll: float = 0.1,
+) -> Any:
+    """
+    Wait for the current navigation's product JSON and parse it.
+
+    Call this right after ``driver.get`` of the product page.  Network
+    events are drained from the performance log (and forwarded to the
+    driver's :class:`request_blocking.RequestBlocker`, if any).
+
+    Parameters
+    ----------
+    driver : webdriver.Chrome
+        A driver with capture enabled.
+    item_number : str
+        The item being loaded.
+    timeout : float, optional
+        Seconds to wait for a matching response; every item without one
+        pays this in full before the DOM fallback.
+    poll : float, optional
+        Seconds between log reads.
+
+    Returns
+    -------
+    Optional[ProductInfo]
+        The product, or ``None`` if no JSON response described it.
+    """
+    blocker = get_blocker(driver)
+    json_responses: Dict[str, str] = {}
+    inspected = set()
+    deadline = time.monotonic() + timeout
+    while True:
+        events = drain_network_events(driver)
+        if blocker is not None:
+            blocker.update(events)
+        finished = []
+        for event in events:
+            params = event.get("params", {})
+            if event.get("method") == "Network.responseReceived":
+                response = params.get("response", {})
+                if "json" in (response.get("mimeType") or "").lower():
+                    json_responses[params["requestId"]] = response.get("url", "")
+            elif event.get("method") == "Network.loadingFinished":
+                finished.append(params.get("requestId"))
+
+        # Responses whose URL names the item are the likeliest match.
+        candidates = [rid for rid in finished if rid in json_responses and rid not in inspected]
+        candidates.sort(key=lambda rid: str(item_number) not in json_responses[rid])
+        for request_id in candidates:
+            inspected.add(request_id)
+            record = find_product_record(_response_json(driver, request_id), item_number)
+            if record is not None:
+                return product_from_record(record, item_number)
+
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(poll)